@@ -0,0 +1,52 @@
+"""
+Benchmark: export_multi_sheet in-memory (openpyxl) vs streaming (write-only)
+
+Usage:
+    python -m benchmarks.bench_export_excel --rows 10000 50000 200000
+"""
+import argparse
+import time
+import tracemalloc
+
+from modules.export_excel import export_multi_sheet
+from benchmarks.generators import make_dp_like_frame
+
+
+def measure(fn):
+    """
+    Time tanpa tracemalloc (overhead besar), lalu peak memory terpisah
+    """
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>10} {'time (s)':>9} {'peak (MB)':>10} {'size (MB)':>10}")
+
+    for rows in args.rows:
+        df = make_dp_like_frame(rows)
+
+        for mode, streaming in (("in-memory", False), ("streaming", True)):
+            elapsed, peak, buffer = measure(
+                lambda: export_multi_sheet({"DP_Result": df}, streaming=streaming)
+            )
+            size = buffer.getbuffer().nbytes
+            print(
+                f"{rows:>9} {mode:>10} {elapsed:>9.2f} "
+                f"{peak / 1e6:>10.1f} {size / 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
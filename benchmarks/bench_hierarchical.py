@@ -0,0 +1,66 @@
+"""
+Benchmark: hierarchical (aggregate -> disaggregate) DP vs full-horizon DP
+
+Weekly seasonal horizons are solved once with the full DP and once with
+dp_hierarchical_horizon for every block size and worker count; prints
+wall times, speedup and the relative cost gap of the hierarchical plan.
+
+Usage:
+    python -m benchmarks.bench_hierarchical
+    python -m benchmarks.bench_hierarchical --weeks 520 --max-stock 700 5000 --workers 1 4 --backend loop
+"""
+import argparse
+import json
+from pathlib import Path
+
+from benchmarks.generators import make_seasonal_fuzzy_frame
+from modules.hierarchical_dp import BLOCK_SIZES, compare_hierarchical
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--weeks", type=int, nargs="+", default=[260, 520])
+    parser.add_argument("--max-stock", type=int, nargs="+", default=[700, 5000])
+    parser.add_argument("--blocks", type=int, nargs="+", default=list(BLOCK_SIZES.values()))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--backend", default="numpy", choices=["numpy", "loop"])
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    print(f"{'weeks':>6} {'max stock':>9} {'block':>5} {'workers':>7} {'full (s)':>9} "
+          f"{'hier. (s)':>9} {'speedup':>8} {'cost gap':>9}")
+    results = []
+
+    for weeks in args.weeks:
+        df = make_seasonal_fuzzy_frame(weeks)
+        demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+
+        for max_stock in args.max_stock:
+            for block in args.blocks:
+                for workers in args.workers:
+                    r = compare_hierarchical(
+                        demand, fuzzy_import, 1.0, 5.0, max_stock, 300,
+                        block=block, workers=workers, backend=args.backend
+                    )
+                    results.append({
+                        "weeks": weeks,
+                        "max_stock": max_stock,
+                        "block": block,
+                        "workers": workers,
+                        "backend": args.backend,
+                        **{k: round(v, 6) for k, v in r.items()}
+                    })
+                    print(
+                        f"{weeks:>6} {max_stock:>9} {block:>5} {workers:>7} {r['full_seconds']:>9.3f} "
+                        f"{r['hierarchical_seconds']:>9.3f} {r['speedup']:>7.2f}x {r['cost_gap'] * 100:>8.3f}%"
+                    )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
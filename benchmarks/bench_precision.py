@@ -0,0 +1,130 @@
+"""
+Benchmark: float64 vs float32 compute mode with accuracy checks
+
+For each component (batch fuzzy inference, DP value recursion, Monte
+Carlo policy rollouts) both precisions are timed with peak memory, and
+the float32 result is checked against float64: fuzzy predictions within
+FUZZY_ATOL, DP plan unchanged and cost within COST_RTOL, rollout costs
+within COST_RTOL. Exits 1 when an accuracy check fails.
+
+Usage:
+    python -m benchmarks.bench_precision
+    python -m benchmarks.bench_precision --quick --json precision.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.generators import make_anylogic_frame, make_fuzzy_frame
+from benchmarks.suite import measure
+from modules.dp_model import rollout_policy, solve_value_function
+from modules.fuzzy_system import build_fuzzy_system, compile_fuzzy_tables, predict_import_batch
+from modules.precision import COST_RTOL, FUZZY_ATOL, verify_dp, verify_fuzzy
+
+
+def fuzzy_case(rows):
+    tables = compile_fuzzy_tables(build_fuzzy_system()[0])
+    df = make_anylogic_frame(rows)
+    inputs = (df["Demand"].to_numpy(), df["Stock"].to_numpy(), df["Production"].to_numpy())
+
+    check = verify_fuzzy(tables, *inputs)
+    return (
+        {p: (lambda p=p: predict_import_batch(tables, *inputs, precision=p)) for p in ("float64", "float32")},
+        f"max |Δ| {check['max_abs_error']:.2e} (tol {FUZZY_ATOL:g})",
+        check["ok"]
+    )
+
+
+def dp_case(T, max_stock):
+    df = make_fuzzy_frame(T)
+    demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+
+    check = verify_dp(demand, fuzzy_import, 2.0, 5.0, max_stock, 150)
+    return (
+        {
+            p: (lambda p=p: solve_value_function(demand, fuzzy_import, 2.0, 5.0, max_stock, precision=p))
+            for p in ("float64", "float32")
+        },
+        f"policy {'same' if check['policy_equal'] else 'CHANGED'}, cost rel {check['rel_error']:.1e}",
+        check["ok"]
+    )
+
+
+def rollout_case(paths, T=120, max_stock=500):
+    df = make_fuzzy_frame(T)
+    demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+    _, policy = solve_value_function(demand, fuzzy_import, 2.0, 5.0, max_stock)
+    rng = np.random.default_rng(0)
+    demand_paths = np.maximum(0, demand + rng.normal(0, 20, (paths, T))).round().astype(np.int64)
+
+    runs = {
+        p: (lambda p=p: rollout_policy(policy, demand_paths, 150, max_stock, 2.0, 5.0, precision=p))
+        for p in ("float64", "float32")
+    }
+    cost64 = runs["float64"]()["total_cost"]
+    cost32 = runs["float32"]()["total_cost"].astype(np.float64)
+    rel = float(np.max(np.abs(cost32 - cost64) / np.maximum(1.0, np.abs(cost64))))
+    return runs, f"cost rel {rel:.1e} (tol {COST_RTOL:g})", rel <= COST_RTOL
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    if args.quick:
+        cases = [
+            ("fuzzy", "rows=10,000", lambda: fuzzy_case(10_000)),
+            ("dp", "T=120, S=500", lambda: dp_case(120, 500)),
+            ("rollout", "paths=10,000", lambda: rollout_case(10_000))
+        ]
+    else:
+        cases = [
+            ("fuzzy", "rows=100,000", lambda: fuzzy_case(100_000)),
+            ("dp", "T=240, S=500", lambda: dp_case(240, 500)),
+            ("dp", "T=60, S=100,000", lambda: dp_case(60, 100_000)),
+            ("rollout", "paths=10,000", lambda: rollout_case(10_000)),
+            ("rollout", "paths=200,000", lambda: rollout_case(200_000))
+        ]
+
+    print(f"{'component':>9} {'size':>16} {'f64 (s)':>9} {'f32 (s)':>9} {'speedup':>8} "
+          f"{'f64 MB':>8} {'f32 MB':>8}  accuracy")
+    results = []
+    failed = False
+
+    for component, size, build in cases:
+        runs, accuracy, ok = build()
+        timings = {p: measure(fn, repeat=args.repeat) for p, fn in runs.items()}
+        (t64, m64), (t32, m32) = timings["float64"], timings["float32"]
+        failed |= not ok
+
+        results.append({
+            "component": component,
+            "size": size,
+            "float64_seconds": round(t64, 4),
+            "float32_seconds": round(t32, 4),
+            "float64_peak_bytes": m64,
+            "float32_peak_bytes": m32,
+            "accuracy": accuracy,
+            "ok": ok
+        })
+        print(
+            f"{component:>9} {size:>16} {t64:>9.3f} {t32:>9.3f} {t64 / t32:>7.2f}x "
+            f"{m64 / 1e6:>8.1f} {m32 / 1e6:>8.1f}  {accuracy}{'' if ok else '  FAIL'}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: multi-scenario PDF report pack by number of scenarios
+
+Synthetic runs (distinct per-period data, so every chart is different)
+are stored in a temporary run history, then the pack is built with a
+cold figure cache (serial and parallel pre-render) and again with a warm
+cache (charts reused, assembly only) written straight to a file. Peak
+Python memory of the warm build shows that streaming assembly stays flat
+as the pack grows.
+
+Usage:
+    python -m benchmarks.bench_report_pack --scenarios 10 50 200
+    python -m benchmarks.bench_report_pack --scenarios 100 --workers 1 4 --json pack.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.generators import make_dp_like_frame
+from modules.figure_cache import FIGURE_SESSION, get_figure_store
+from modules.pipeline import build_report_pack, compute_kpis
+from modules.run_store import RunStore, make_run_record
+
+
+def make_store(path, scenarios, periods=24):
+    store = RunStore(path)
+    records = []
+    for i in range(scenarios):
+        df = make_dp_like_frame(periods, seed=i)
+        df["Month"] = pd.period_range("2024-01", periods=periods, freq="M").astype(str)
+        params = {"holding_cost": 2.0, "import_cost": 5.0, "max_stock": 500, "initial_stock": i}
+        records.append(make_run_record(df, df, params, compute_kpis(df), source="bench"))
+    store.record_many(records)
+    return store
+
+
+def build(store, run_ids, workers, output=None):
+    start = time.perf_counter()
+    output = build_report_pack(run_ids, store=store, workers=workers, output=output)
+    seconds = time.perf_counter() - start
+    output.seek(0, os.SEEK_END)
+    size = output.tell()
+    output.close()
+    return seconds, size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    workers = sorted(set(args.workers))
+    figures = get_figure_store()
+
+    print(
+        f"{'scenarios':>9} " + " ".join(f"{f'cold w={w} (s)':>14}" for w in workers) +
+        f" {'warm (s)':>9} {'warm peak MB':>12} {'PDF MB':>7}"
+    )
+    results = []
+
+    for n in args.scenarios:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = make_store(str(Path(tmp) / "runs.sqlite"), n)
+            run_ids = store.query(limit=n)["id"].tolist()
+
+            cold = {}
+            for w in workers:
+                figures.drop_session(FIGURE_SESSION)
+                cold[w], size = build(store, run_ids, w)
+
+            # Warm: straight to a file on disk, so the peak is the assembly only
+            tracemalloc.start()
+            warm, _ = build(store, run_ids, workers[0], output=open(Path(tmp) / "pack.pdf", "w+b"))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            store.close()
+
+        results.append({
+            "scenarios": n,
+            "cold_seconds": {str(w): round(s, 3) for w, s in cold.items()},
+            "warm_seconds": round(warm, 3),
+            "warm_peak_bytes": peak,
+            "pdf_bytes": size
+        })
+        print(
+            f"{n:>9} " + " ".join(f"{cold[w]:>14.2f}" for w in workers) +
+            f" {warm:>9.2f} {peak / 1e6:>12.1f} {size / 1e6:>7.1f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
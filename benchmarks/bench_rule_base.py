@@ -0,0 +1,109 @@
+"""
+Benchmark: rule firing cost by rule count vs size of the term grid
+
+Synthetic rule bases (every condition set, so both methods agree) are
+compiled with compile_rule_base and fired on random inputs twice: with
+the sparse rule tensor of fire_rules (cost ~ rows × rules) and with a
+dense reference that evaluates every cell of the term grid (cost ~
+rows × terms ** inputs). The sparse time follows the rule count, the
+dense time the grid size.
+
+Usage:
+    python -m benchmarks.bench_rule_base
+    python -m benchmarks.bench_rule_base --rows 5000 --inputs 4 5 --terms 3 5 7 --rules 50 200
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.generators import synthetic_rule_base
+from modules.fuzzy_system import _fuzzify, fire_rules
+from modules.rule_base import compile_rule_base, validate_rule_base
+
+
+def dense_fire(tables, *values):
+    """
+    Output activations from the full term grid: firing strength of every
+    term combination, then the max over the combinations a rule maps to
+    each output term
+    """
+    strength = np.ones((len(values[0]), 1))
+    for var, x in zip(tables["inputs"], values):
+        membership = _fuzzify(var, np.asarray(x, dtype=float))
+        strength = np.fmin(strength[:, :, None], membership[:, None, :]).reshape(len(x), -1)
+
+    shape = [len(var["mfs"]) for var in tables["inputs"]]
+    cell_output = np.full(int(np.prod(shape)), -1)
+    cell_output[np.ravel_multi_index(tables["rule_terms"].T, shape)] = tables["rule_outputs"]
+
+    cuts = np.zeros((len(values[0]), len(tables["output_mfs"])))
+    for k in range(len(tables["output_mfs"])):
+        cells = cell_output == k
+        if cells.any():
+            cuts[:, k] = strength[:, cells].max(axis=1)
+    return cuts
+
+
+def timed(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--inputs", type=int, nargs="+", default=[3, 4])
+    parser.add_argument("--terms", type=int, nargs="+", default=[3, 5, 7])
+    parser.add_argument("--rules", type=int, nargs="+", default=[27, 100],
+                        help="rule counts; the full grid is always included too")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    print(f"{'inputs':>6} {'terms':>5} {'grid':>6} {'rules':>6} {'sparse (ms)':>11} {'dense (ms)':>10} {'speedup':>8}")
+    results = []
+    rng = np.random.default_rng(0)
+
+    for inputs in args.inputs:
+        for terms in args.terms:
+            grid = terms ** inputs
+            for rules in sorted({min(r, grid) for r in args.rules} | {grid}):
+                spec = validate_rule_base(synthetic_rule_base(inputs, terms, rules, dont_care=0.0))
+                tables = compile_rule_base(spec)
+                X = [rng.uniform(var["universe"][0], var["universe"][-1], args.rows) for var in tables["inputs"]]
+
+                sparse, cuts = timed(lambda: fire_rules(tables, *X), args.repeat)
+                dense, reference = timed(lambda: dense_fire(tables, *X), args.repeat)
+                if not np.allclose(cuts, reference, rtol=0, atol=1e-12):
+                    raise AssertionError(f"sparse and dense firing differ ({inputs} inputs, {terms} terms, {rules} rules)")
+
+                results.append({
+                    "inputs": inputs,
+                    "terms": terms,
+                    "grid": grid,
+                    "rules": rules,
+                    "rows": args.rows,
+                    "sparse_seconds": round(sparse, 6),
+                    "dense_seconds": round(dense, 6)
+                })
+                print(
+                    f"{inputs:>6} {terms:>5} {grid:>6} {rules:>6} {sparse * 1e3:>11.2f} "
+                    f"{dense * 1e3:>10.2f} {dense / sparse:>7.1f}x"
+                )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
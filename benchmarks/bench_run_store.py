@@ -0,0 +1,105 @@
+"""
+Benchmark: SQLite run history insert and query latency by store size
+
+Synthetic runs (random DP parameters, KPIs and 12-month per-period data)
+are inserted in batches, then the queries behind the Page 3 comparison
+view are timed: count, filtered + sorted page, group-by aggregate,
+filter ranges and per-period loading of a few runs.
+
+Usage:
+    python -m benchmarks.bench_run_store --runs 1000 10000 100000
+    python -m benchmarks.bench_run_store --runs 100000 --batch 5000 --json store.json
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.run_store import KPI_COLUMNS, RunStore, _encode_periods
+from benchmarks.generators import make_dp_like_frame
+
+
+def make_records(n, periods=12, seed=0):
+    rng = np.random.default_rng(seed)
+    # Data per-periode dibuat sekali lalu dipakai ulang (yang diukur SQLite)
+    blob = _encode_periods(make_dp_like_frame(periods))
+    days = rng.integers(0, 365, n)
+    return [
+        {
+            "created_at": f"2025-{1 + day // 31 % 12:02d}-{1 + day % 28:02d} 12:00:00",
+            "source": "bench",
+            "input_hash": f"{rng.integers(0, 50):032x}",
+            "params_hash": f"{i:032x}",
+            "holding_cost": float(rng.choice([1.0, 1.5, 2.0, 2.5, 3.0])),
+            "import_cost": float(rng.choice([4.0, 5.0, 6.0])),
+            "max_stock": int(rng.integers(2, 11)) * 100,
+            "initial_stock": int(rng.integers(0, 300)),
+            "periods": periods,
+            "start_month": "2024-01",
+            "end_month": "2024-12",
+            **{col: float(rng.uniform(0, 1e6)) for col in KPI_COLUMNS.values()},
+            "periods_data": blob
+        }
+        for i, day in enumerate(days)
+    ]
+
+
+def timed(fn, repeat=5):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--batch", type=int, default=1000, help="runs per insert transaction")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    filters = {"holding_cost": (1.5, 2.5), "max_stock": (300, 800), "created_at": ("2025-03-01", "2025-09-30")}
+    queries = {
+        "count": lambda store: store.count(filters),
+        "page (cost asc)": lambda store: store.query(filters, order_by="total_cost", descending=False),
+        "page (newest)": lambda store: store.query(filters),
+        "aggregate": lambda store: store.aggregate("max_stock", filters),
+        "ranges": lambda store: store.ranges(),
+        "periods (5 runs)": lambda store: store.periods([1, 2, 3, 4, 5])
+    }
+
+    print(f"{'runs':>8} {'insert (s)':>10} {'runs/s':>9} " + " ".join(f"{name:>17}" for name in queries))
+    results = []
+
+    for n in args.runs:
+        records = make_records(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = RunStore(str(Path(tmp) / "runs.sqlite"))
+
+            start = time.perf_counter()
+            store.record_many(records, batch_size=args.batch)
+            insert = time.perf_counter() - start
+
+            timings = {name: timed(lambda: query(store)) for name, query in queries.items()}
+            store.close()
+
+        results.append({"runs": n, "insert_seconds": round(insert, 3), "query_ms": timings})
+        print(
+            f"{n:>8} {insert:>10.2f} {n / insert:>9,.0f} " +
+            " ".join(f"{timings[name]:>14.1f} ms" for name in queries)
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: what-if updates from the cached value function vs a full DP
+
+For every horizon the base plan is solved once (filling the policy
+cache), then each what-if kind is timed against a fresh full-horizon
+dp_deterministic_horizon on the changed inputs: a new initial stock
+(forward rollout only), a demand spike and an import cap (periods up
+to the change re-solved). Exits 1 when a what-if update on a horizon of
+at most --standard periods exceeds the 100 ms budget.
+
+Usage:
+    python -m benchmarks.bench_what_if
+    python -m benchmarks.bench_what_if --periods 24 60 240 --max-stock 500 2000 --json what_if.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.generators import make_fuzzy_frame
+from modules.dp_model import dp_deterministic_horizon
+from modules.what_if import PolicyCache, what_if_scenario
+
+# Anggaran waktu satu pembaruan what-if (detik)
+UPDATE_BUDGET_SECONDS = 0.1
+
+
+def scenarios(T):
+    """
+    What-if kind -> (initial stock, spike, cap); spike and cap sit in the
+    middle of the horizon
+    """
+    middle = T // 2
+    return {
+        "initial stock": (120, None, None),
+        "demand spike": (150, (middle, 60), None),
+        "import cap": (150, None, (400, 0, middle))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--periods", type=int, nargs="+", default=[24, 60, 120])
+    parser.add_argument("--max-stock", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--standard", type=int, default=60, help="longest horizon held to the 100 ms budget")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    print(f"{'periods':>7} {'max stock':>9} {'what-if':>13} {'re-solved':>9} {'what-if (ms)':>12} "
+          f"{'full DP (ms)':>12} {'speedup':>8}")
+    results = []
+    failed = False
+
+    for T in args.periods:
+        df = make_fuzzy_frame(T)
+        demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+
+        for max_stock in args.max_stock:
+            cache = PolicyCache()
+            what_if_scenario(demand, fuzzy_import, 2.0, 5.0, max_stock, 150, cache=cache)
+
+            for kind, (initial_stock, spike, cap) in scenarios(T).items():
+                changed = demand.copy()
+                import_cap = None
+                if spike is not None:
+                    changed[spike[0]] += spike[1]
+                if cap is not None:
+                    import_cap = np.full(T, np.inf)
+                    import_cap[cap[1]:cap[2] + 1] = cap[0]
+
+                what_if = np.inf
+                for _ in range(args.repeat):
+                    scenario = what_if_scenario(
+                        demand, fuzzy_import, 2.0, 5.0, max_stock, initial_stock,
+                        spike=spike, cap=cap, cache=cache
+                    )
+                    what_if = min(what_if, scenario["seconds"])
+
+                full = np.inf
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    dp_deterministic_horizon(
+                        changed, fuzzy_import, 2.0, 5.0, max_stock, initial_stock, import_cap=import_cap
+                    )
+                    full = min(full, time.perf_counter() - start)
+
+                over = T <= args.standard and what_if > UPDATE_BUDGET_SECONDS
+                failed |= over
+                results.append({
+                    "periods": T,
+                    "max_stock": max_stock,
+                    "what_if": kind,
+                    "resolved_periods": scenario["resolved_periods"],
+                    "what_if_seconds": round(what_if, 6),
+                    "full_seconds": round(full, 6)
+                })
+                print(
+                    f"{T:>7} {max_stock:>9} {kind:>13} {scenario['resolved_periods']:>9} "
+                    f"{what_if * 1e3:>12.2f} {full * 1e3:>12.2f} {full / what_if:>7.1f}x"
+                    f"{'  OVER BUDGET' if over else ''}"
+                )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
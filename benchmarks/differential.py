@@ -0,0 +1,44 @@
+"""
+Differential correctness checks: every faster backend against the
+reference implementation it replaces, on synthetic inputs over several
+seeds. The checks live in tests/test_differential.py (run by pytest);
+this script prints the largest deviation per check and exits 1 when any
+check exceeds its tolerance.
+
+Usage:
+    python -m benchmarks.differential
+    python -m benchmarks.differential --seeds 0 1 2 3 4 --checks predict_import kpis
+"""
+import argparse
+import sys
+
+from tests.test_differential import CHECKS
+
+
+def run_checks(names, seeds, log=print):
+    failures = []
+    for name in names:
+        check, tolerance = CHECKS[name]
+        worst = max(check(seed) for seed in seeds)
+        ok = worst <= tolerance
+        log(f"{'PASS' if ok else 'FAIL'}  {name:<22} max deviation {worst:.3e} (tolerance {tolerance:.0e})")
+        if not ok:
+            failures.append(name)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--checks", nargs="+", choices=list(CHECKS), default=list(CHECKS))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    args = parser.parse_args()
+
+    failures = run_checks(args.checks, args.seeds)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
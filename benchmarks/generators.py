@@ -0,0 +1,210 @@
+"""
+Offline synthetic data for the benchmarks: AnyLogic-like exports, fuzzy
+and DP results of any size, and fuzzy rule bases of any rule count
+(skfuzzy systems and rule base specs).
+"""
+import numpy as np
+import pandas as pd
+
+from modules.lazy_import import lazy_import
+
+fuzz = lazy_import("skfuzzy")
+ctrl = lazy_import("skfuzzy.control")
+
+
+def _months(n):
+    # Horizon panjang: periode harian agar label tetap unik
+    freq = "M" if n <= 1200 else "D"
+    return pd.period_range("2000-01", periods=n, freq=freq).astype(str)
+
+
+def make_anylogic_frame(rows, seed=0):
+    """
+    Raw AnyLogic export (Month, Demand, Stock, Production) within the
+    fuzzy universes
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Month": _months(rows),
+        "Demand": rng.integers(200, 401, rows),
+        "Stock": rng.integers(100, 251, rows),
+        "Production": rng.integers(0, 211, rows)
+    })
+
+
+def make_fuzzy_frame(T, seed=0):
+    """
+    Fuzzy result the DP can always satisfy (Fuzzy_Import around Demand)
+    """
+    rng = np.random.default_rng(seed)
+    demand = rng.integers(200, 400, T)
+    return pd.DataFrame({
+        "Month": _months(T),
+        "Demand": demand,
+        "Initial_Stock": 150,
+        "Fuzzy_Import": demand + rng.uniform(-20, 40, T).round(2)
+    })
+
+
+def make_seasonal_fuzzy_frame(weeks, seed=0):
+    """
+    Weekly fuzzy result with yearly seasonal demand and a flat fuzzy
+    import, so stock has to be built up before every peak
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(weeks)
+    demand = np.round(300 + 90 * np.sin(2 * np.pi * t / 52) + rng.normal(0, 15, weeks)).astype(np.int64)
+    return pd.DataFrame({
+        "Month": pd.period_range("2000-01-03", periods=weeks, freq="W").astype(str),
+        "Demand": demand,
+        "Initial_Stock": 300,
+        "Fuzzy_Import": (305 + rng.uniform(-10, 30, weeks)).round(2)
+    })
+
+
+def make_dp_like_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    demand = rng.integers(200, 400, rows)
+    optimal = rng.integers(0, 450, rows)
+    ending = rng.integers(0, 500, rows)
+
+    return pd.DataFrame({
+        "Month": pd.period_range("2000-01", periods=rows, freq="D").astype(str),
+        "Demand": demand,
+        "Fuzzy_Import": rng.uniform(30, 400, rows).round(2),
+        "Optimal_Import": optimal,
+        "Starting_Stock": rng.integers(0, 500, rows),
+        "Ending_Stock": ending,
+        "Holding_Cost": ending * 2.0,
+        "Import_Cost": optimal * 5.0,
+        "Total_Cost": ending * 2.0 + optimal * 5.0,
+    })
+
+
+def make_policy_batch(scenarios, T, max_stock=500, seed=0):
+    """
+    (scenario × period) arrays in the layout of calculate_kpis_batch
+    """
+    rng = np.random.default_rng(seed)
+    ending = rng.integers(0, max_stock + 1, (scenarios, T))
+    optimal = rng.integers(0, 450, (scenarios, T))
+    return {
+        "ending_stock": ending,
+        "optimal_import": optimal,
+        "period_import_cost": optimal * 5.0,
+        "period_holding_cost": ending * 2.0,
+        "demand": rng.integers(200, 400, T),
+        "max_stock": max_stock
+    }
+
+
+def _even_terms(universe, k):
+    """
+    k triangular terms evenly over the universe (shoulders at the ends)
+    """
+    low, high = universe[0], universe[-1]
+    peaks = np.linspace(low, high, k)
+    step = peaks[1] - peaks[0]
+    return [
+        fuzz.trimf(universe, [max(low, p - step), p, min(high, p + step)])
+        for p in peaks
+    ]
+
+
+def synthetic_fuzzy_system(rules):
+    """
+    Controller with the universes of build_fuzzy_system and k terms per
+    input, k = round(rules ** (1/3)) -> k³ AND rules (every combination,
+    so some rule always fires). Returns (system, actual rule count).
+    """
+    k = max(2, int(round(rules ** (1 / 3))))
+    inputs = [
+        ctrl.Antecedent(np.arange(200, 401, 1), "market_demand"),
+        ctrl.Antecedent(np.arange(100, 251, 1), "product_stock"),
+        ctrl.Antecedent(np.arange(0, 211, 1), "production_capacity")
+    ]
+    output = ctrl.Consequent(np.arange(30, 401, 1), "product_import")
+
+    for var in inputs:
+        for j, mf in enumerate(_even_terms(var.universe, k)):
+            var[f"T{j}"] = mf
+    output["Low"] = fuzz.trapmf(output.universe, [30, 30, 90, 200])
+    output["Medium"] = fuzz.trapmf(output.universe, [90, 200, 250, 350])
+    output["High"] = fuzz.trapmf(output.universe, [250, 350, 400, 400])
+
+    # Demand naik -> impor naik; stok & kapasitas naik -> impor turun
+    labels = ["Low", "Medium", "High"]
+    rule_list = []
+    for a in range(k):
+        for b in range(k):
+            for c in range(k):
+                score = (a + (k - 1 - b) + (k - 1 - c)) / (3 * (k - 1))
+                rule_list.append(ctrl.Rule(
+                    inputs[0][f"T{a}"] & inputs[1][f"T{b}"] & inputs[2][f"T{c}"],
+                    output[labels[min(2, int(score * 3))]]
+                ))
+
+    return ctrl.ControlSystem(rule_list), k ** 3
+
+
+# Universe rule base sintetis: tiga input bawaan lalu input tambahan
+RULE_BASE_UNIVERSES = [
+    ("market_demand", [200, 400, 1]),
+    ("product_stock", [100, 250, 1]),
+    ("production_capacity", [0, 210, 1]),
+    ("lead_time", [0, 12, 0.5])
+]
+
+
+def synthetic_rule_base(inputs=4, terms=5, rules=None, dont_care=0.3, seed=0):
+    """
+    Rule base spec (modules/rule_base.py format) with `terms` triangular
+    terms per input and `rules` distinct rules drawn from the full term
+    grid (all terms ** inputs when None). Each condition is dropped with
+    probability dont_care, so rules skip inputs like hand-written ones.
+    """
+    rng = np.random.default_rng(seed)
+    variables = []
+    for i in range(inputs):
+        label, universe = RULE_BASE_UNIVERSES[i] if i < len(RULE_BASE_UNIVERSES) else (f"x{i}", [0, 100, 1])
+        low, high = universe[:2]
+        peaks = np.linspace(low, high, terms)
+        step = peaks[1] - peaks[0]
+        variables.append({
+            "label": label,
+            "universe": universe,
+            "terms": {
+                f"T{j}": {"mf": "trimf", "params": [float(max(low, p - step)), float(p), float(min(high, p + step))]}
+                for j, p in enumerate(peaks)
+            }
+        })
+
+    grid = terms ** inputs
+    picks = rng.choice(grid, size=min(rules or grid, grid), replace=False)
+    labels = ["Low", "Medium", "High"]
+    rule_list = []
+    for flat in picks:
+        combo = np.unravel_index(flat, (terms,) * inputs)
+        keep = rng.random(inputs) >= dont_care
+        keep[rng.integers(inputs)] = True
+        # Input pertama naik -> impor naik; input lain naik -> impor turun
+        score = (combo[0] + sum(terms - 1 - c for c in combo[1:])) / (inputs * (terms - 1))
+        rule_list.append({
+            "if": {variables[i]["label"]: f"T{combo[i]}" for i in range(inputs) if keep[i]},
+            "then": labels[min(2, int(score * 3))]
+        })
+
+    return {
+        "name": f"Synthetic ({inputs} inputs, {terms} terms, {len(rule_list)} rules)",
+        "inputs": variables,
+        "output": {
+            "label": "product_import",
+            "universe": [30, 400, 1],
+            "terms": {
+                "Low": {"mf": "trapmf", "params": [30, 30, 90, 200]},
+                "Medium": {"mf": "trapmf", "params": [90, 200, 250, 350]},
+                "High": {"mf": "trapmf", "params": [250, 350, 400, 400]}
+            }
+        },
+        "rules": rule_list
+    }
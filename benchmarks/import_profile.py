@@ -0,0 +1,119 @@
+"""
+Import-time profile of the cover page and each Streamlit page.
+
+The top-level imports of every page are replayed in a fresh interpreter
+under ``python -X importtime``; the report lists the total import time and
+the slowest top-level packages, and --check fails when a page exceeds its
+budget in benchmarks/startup_budget.json.
+
+Usage:
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --check --repeat 5
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "startup_budget.json"
+
+TARGETS = {
+    "cover": "app.py",
+    "fuzzy": "pages/1_Fuzzy_System.py",
+    "dp": "pages/2_DP.py",
+    "analysis": "pages/3_Analysis_And_Report.py",
+}
+
+
+def import_statements(script):
+    """
+    Source of the module-level import statements of a page script
+    """
+    source = (ROOT / script).read_text(encoding="utf-8")
+    tree = ast.parse(source)
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output into (total_us, {top-level package: self_us})
+    """
+    per_package = defaultdict(int)
+    total = 0
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        self_us = int(self_us)
+        package = name.strip().split(".")[0]
+        per_package[package] += self_us
+        total += self_us
+
+    return total, dict(per_package)
+
+
+def profile_target(script, repeat=3):
+    code = import_statements(script)
+    runs = []
+
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{script}: import failed\n{proc.stderr[-2000:]}")
+        runs.append(parse_importtime(proc.stderr))
+
+    totals = [total for total, _ in runs]
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    return statistics.median(totals) / 1000, median_run[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--check", action="store_true", help="fail if a page exceeds its budget")
+    parser.add_argument("--json", type=Path, help="write the measurements to this file")
+    args = parser.parse_args()
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    results = {}
+    over_budget = []
+
+    for name, script in TARGETS.items():
+        total_ms, packages = profile_target(script, repeat=args.repeat)
+        limit = budget.get(name)
+        results[name] = {"script": script, "total_ms": round(total_ms, 1), "budget_ms": limit}
+
+        status = ""
+        if limit is not None:
+            status = "OK" if total_ms <= limit else "OVER BUDGET"
+            if total_ms > limit:
+                over_budget.append(name)
+
+        print(f"\n{name} ({script}): {total_ms:.0f} ms  budget={limit} ms  {status}")
+        top = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        for package, self_us in top:
+            print(f"    {package:<24} {self_us / 1000:>8.1f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.check and over_budget:
+        print(f"\nOver budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
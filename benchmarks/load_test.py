@@ -0,0 +1,184 @@
+"""
+Load test for the local inference service (modules/service.py).
+
+Opens --concurrency keep-alive connections that each send requests back
+to back for --duration seconds and reports p50/p99 latency and throughput
+per endpoint. With --spawn the service is started (and stopped) here, so
+coalescing can be compared directly:
+
+    python -m benchmarks.load_test --spawn
+    python -m benchmarks.load_test --spawn --batch-window-ms 0
+    python -m benchmarks.load_test --url 127.0.0.1:8765 --endpoint optimize --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def predict_payload(rng):
+    return {
+        "demand": float(rng.uniform(200, 400)),
+        "stock": float(rng.uniform(100, 250)),
+        "capacity": float(rng.uniform(0, 210))
+    }
+
+
+def optimize_payload(rng, periods=24):
+    demand = rng.integers(200, 260, periods)
+    return {
+        "demand": demand.tolist(),
+        "fuzzy_import": (demand + rng.integers(-30, 30, periods)).tolist(),
+        "holding_cost": 2.0,
+        "import_cost": 5.0,
+        "max_stock": 500,
+        "initial_stock": 150
+    }
+
+
+PAYLOADS = {"predict": predict_payload, "optimize": optimize_payload}
+
+
+async def request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, endpoint, deadline, seed, latencies, errors):
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    make = PAYLOADS[endpoint]
+
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = await request(reader, writer, host, f"/{endpoint}", make(rng))
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, concurrency, duration):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(host, port, endpoint, start + duration, seed, latencies, errors)
+        for seed in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2) if len(ms) else None,
+        "p99_ms": round(float(np.percentile(ms, 99)), 2) if len(ms) else None
+    }
+
+
+async def wait_ready(host, port, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Service did not start")
+
+
+async def fetch_health(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /health HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    return json.loads(raw.split(b"\r\n\r\n", 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="127.0.0.1:8765", help="host:port of the service")
+    parser.add_argument("--endpoint", choices=["predict", "optimize", "both"], default="both")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--dp-concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--spawn", action="store_true", help="start the service for the test")
+    parser.add_argument("--batch-window-ms", type=float, help="passed to the spawned service")
+    parser.add_argument("--dp-workers", type=int, help="passed to the spawned service")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+
+    host, port = args.url.rsplit(":", 1)
+    port = int(port)
+
+    proc = None
+    if args.spawn:
+        cmd = [sys.executable, "-m", "modules.service", "--host", host, "--port", str(port)]
+        if args.batch_window_ms is not None:
+            cmd += ["--batch-window-ms", str(args.batch_window_ms)]
+        if args.dp_workers is not None:
+            cmd += ["--dp-workers", str(args.dp_workers)]
+        proc = subprocess.Popen(cmd, cwd=ROOT)
+
+    endpoints = ["predict", "optimize"] if args.endpoint == "both" else [args.endpoint]
+    results = []
+
+    try:
+        asyncio.run(wait_ready(host, port))
+        for endpoint in endpoints:
+            concurrency = args.dp_concurrency if endpoint == "optimize" else args.concurrency
+            result = asyncio.run(run_load(host, port, endpoint, concurrency, args.duration))
+            results.append(result)
+            print(
+                f"{endpoint:<9} c={concurrency:<4} {result['requests']:>7} req  "
+                f"{result['throughput_rps']:>8.1f} req/s  "
+                f"p50={result['p50_ms']} ms  p99={result['p99_ms']} ms  errors={result['errors']}"
+            )
+        health = asyncio.run(fetch_health(host, port))
+        print(f"service: {health}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        args.json.write_text(json.dumps({"results": results, "service": health}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+Benchmark suite for the compute hot paths.
+
+Every case times one function over a grid of synthetic input sizes
+(benchmarks/generators.py, no data files needed), per backend where a
+faster backend exists next to the reference. Best-of-N wall time and
+tracemalloc peak memory go to JSON; with a baseline the report shows the
+ratio per measurement and --check fails on regressions. The scaling
+report fits time ~ size^k per case and backend.
+
+Usage:
+    python -m benchmarks.suite --quick
+    python -m benchmarks.suite --cases dp predict_import --output bench.json
+    python -m benchmarks.suite --quick --check                # vs benchmarks/baseline.json
+    python -m benchmarks.suite --quick --save-baseline        # refresh the baseline
+    python -m benchmarks.suite --plot bench_plots/
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+# Pengukuran di bawah batas ini terlalu berisik untuk dibandingkan
+NOISE_FLOOR_SECONDS = 0.005
+
+
+# ======================================================
+# CASES
+# ======================================================
+def _fuzzy_system(rules):
+    from modules.fuzzy_system import build_fuzzy_system
+    from benchmarks.generators import synthetic_fuzzy_system
+
+    if rules is None:
+        return build_fuzzy_system()[0]
+    return synthetic_fuzzy_system(rules)[0]
+
+
+def setup_predict_import(backend, rows, rules=None):
+    from modules.fuzzy_system import compile_fuzzy_tables, predict_import, predict_import_batch
+    from modules.pipeline import prepare_anylogic_frame
+    from benchmarks.generators import make_anylogic_frame
+
+    system = _fuzzy_system(rules)
+    df = prepare_anylogic_frame(make_anylogic_frame(rows))
+    md, ps, pc = (df[c].to_numpy() for c in ("Demand", "Initial_Stock", "Production_Capacity"))
+
+    if backend == "reference":
+        return lambda: [predict_import(system, *row) for row in zip(md, ps, pc)]
+
+    tables = compile_fuzzy_tables(system)
+    precision = "float32" if backend == "batch_float32" else "float64"
+    return lambda: predict_import_batch(tables, md, ps, pc, precision=precision)
+
+
+def setup_fuzzy_surface(backend, n):
+    from modules.fuzzy_system import build_fuzzy_system
+    from modules.visualization import plot_fuzzy_surface
+    import matplotlib.pyplot as plt
+
+    system = build_fuzzy_system()[0]
+    md_range = np.linspace(200, 400, n)
+    ps_range = np.linspace(100, 250, n)
+
+    def run():
+        plt.close(plot_fuzzy_surface(system, md_range, ps_range))
+
+    return run
+
+
+def setup_dp(backend, T, max_stock=500):
+    from modules.dp_model import dp_deterministic_horizon
+    from benchmarks.generators import make_fuzzy_frame
+
+    df = make_fuzzy_frame(T)
+    demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+
+    # reference = loop asli; numpy / float32 = backend vektor
+    options = {
+        "reference": {"backend": "loop"},
+        "numpy": {"backend": "numpy", "precision": "float64"},
+        "float32": {"backend": "numpy", "precision": "float32"}
+    }[backend]
+    return lambda: dp_deterministic_horizon(demand, fuzzy_import, 2.0, 5.0, max_stock, 150, **options)
+
+
+def setup_rollout(backend, paths, T=120, max_stock=500):
+    from modules.dp_model import rollout_policy, solve_value_function
+    from benchmarks.generators import make_fuzzy_frame
+
+    df = make_fuzzy_frame(T)
+    demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+    _, policy = solve_value_function(demand, fuzzy_import, 2.0, 5.0, max_stock)
+    rng = np.random.default_rng(0)
+    demand_paths = np.maximum(0, demand + rng.normal(0, 20, (paths, T))).round().astype(np.int64)
+
+    return lambda: rollout_policy(policy, demand_paths, 150, max_stock, 2.0, 5.0, precision=backend)
+
+
+def setup_kpis(backend, scenarios, T=60):
+    import pandas as pd
+    from modules.kpi_metrics import calculate_kpis, calculate_kpis_batch
+    from benchmarks.generators import make_policy_batch
+
+    batch = make_policy_batch(scenarios, T)
+    if backend == "batch":
+        return lambda: calculate_kpis_batch(**batch)
+
+    frames = [
+        pd.DataFrame({
+            "Ending_Stock": batch["ending_stock"][i],
+            "Optimal_Import": batch["optimal_import"][i],
+            "Import_Cost": batch["period_import_cost"][i],
+            "Holding_Cost": batch["period_holding_cost"][i]
+        })
+        for i in range(scenarios)
+    ]
+    return lambda: [calculate_kpis(f, batch["demand"], 5.0, 2.0, batch["max_stock"]) for f in frames]
+
+
+def setup_export(backend, rows):
+    from modules.export_excel import export_multi_sheet
+    from benchmarks.generators import make_dp_like_frame
+
+    df = make_dp_like_frame(rows)
+    return lambda: export_multi_sheet({"DP_Result": df}, streaming=backend == "streaming")
+
+
+# name -> setup, size axis, {backend: [params, ...]} for the full and the
+# quick profile
+CASES = {
+    "predict_import": {
+        "setup": setup_predict_import,
+        "axis": "rows",
+        "full": {
+            "reference": [{"rows": n} for n in (25, 100, 400)],
+            "batch": [{"rows": n} for n in (1_000, 10_000, 100_000)],
+            "batch_float32": [{"rows": n} for n in (1_000, 10_000, 100_000)]
+        },
+        "quick": {
+            "reference": [{"rows": n} for n in (10, 40)],
+            "batch": [{"rows": n} for n in (1_000, 10_000)],
+            "batch_float32": [{"rows": n} for n in (1_000, 10_000)]
+        }
+    },
+    "predict_import_rules": {
+        "setup": setup_predict_import,
+        "axis": "rules",
+        "full": {
+            "reference": [{"rows": 25, "rules": r} for r in (8, 27, 125)],
+            "batch": [{"rows": 10_000, "rules": r} for r in (8, 27, 125, 343)]
+        },
+        "quick": {
+            "reference": [{"rows": 10, "rules": r} for r in (8, 64)],
+            "batch": [{"rows": 2_000, "rules": r} for r in (8, 64, 216)]
+        }
+    },
+    "fuzzy_surface": {
+        "setup": setup_fuzzy_surface,
+        "axis": "n",
+        "full": {"reference": [{"n": n} for n in (10, 20, 40)]},
+        "quick": {"reference": [{"n": n} for n in (5, 10)]}
+    },
+    "dp": {
+        "setup": setup_dp,
+        "axis": "T",
+        "full": {
+            "reference": [{"T": T} for T in (12, 60, 240)],
+            "numpy": [{"T": T} for T in (12, 240, 2_400)],
+            "float32": [{"T": T} for T in (12, 240, 2_400)]
+        },
+        "quick": {
+            "reference": [{"T": T} for T in (12, 36)],
+            "numpy": [{"T": T} for T in (12, 240)],
+            "float32": [{"T": T} for T in (12, 240)]
+        }
+    },
+    "dp_max_stock": {
+        "setup": setup_dp,
+        "axis": "max_stock",
+        "full": {
+            "reference": [{"T": 60, "max_stock": m} for m in (500, 1_000, 2_000)],
+            "numpy": [{"T": 60, "max_stock": m} for m in (500, 10_000, 100_000)],
+            "float32": [{"T": 60, "max_stock": m} for m in (500, 10_000, 100_000)]
+        },
+        "quick": {
+            "reference": [{"T": 12, "max_stock": m} for m in (500, 1_000)],
+            "numpy": [{"T": 12, "max_stock": m} for m in (500, 10_000)],
+            "float32": [{"T": 12, "max_stock": m} for m in (500, 10_000)]
+        }
+    },
+    "rollout": {
+        "setup": setup_rollout,
+        "axis": "paths",
+        "full": {
+            "float64": [{"paths": n} for n in (1_000, 10_000, 100_000)],
+            "float32": [{"paths": n} for n in (1_000, 10_000, 100_000)]
+        },
+        "quick": {
+            "float64": [{"paths": n} for n in (1_000, 10_000)],
+            "float32": [{"paths": n} for n in (1_000, 10_000)]
+        }
+    },
+    "calculate_kpis": {
+        "setup": setup_kpis,
+        "axis": "scenarios",
+        "full": {
+            "loop": [{"scenarios": s} for s in (10, 100, 1_000)],
+            "batch": [{"scenarios": s} for s in (100, 10_000, 100_000)]
+        },
+        "quick": {
+            "loop": [{"scenarios": s} for s in (10, 100)],
+            "batch": [{"scenarios": s} for s in (100, 10_000)]
+        }
+    },
+    "export_multi_sheet": {
+        "setup": setup_export,
+        "axis": "rows",
+        "full": {
+            "in-memory": [{"rows": n} for n in (10_000, 50_000)],
+            "streaming": [{"rows": n} for n in (10_000, 50_000, 200_000)]
+        },
+        "quick": {
+            "in-memory": [{"rows": n} for n in (1_000, 5_000)],
+            "streaming": [{"rows": n} for n in (1_000, 5_000)]
+        }
+    }
+}
+
+
+# ======================================================
+# MEASUREMENT
+# ======================================================
+def measure(fn, repeat=3, memory=True):
+    """
+    Best-of-repeat wall time (slow calls run once), then peak memory in a
+    separate traced run (tracemalloc slows the call down)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        if times[-1] > 2.0:
+            break
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return min(times), peak
+
+
+def run_suite(cases, profile="full", repeat=3, memory=True, log=print):
+    results = []
+    for name in cases:
+        case = CASES[name]
+        for backend, grid in case[profile].items():
+            for params in grid:
+                fn = case["setup"](backend, **params)
+                seconds, peak = measure(fn, repeat=repeat, memory=memory)
+                result = {
+                    "case": name,
+                    "backend": backend,
+                    "params": params,
+                    "seconds": round(seconds, 6),
+                    "peak_mb": None if peak is None else round(peak / 1e6, 3)
+                }
+                results.append(result)
+                log(_format(result))
+    return results
+
+
+def _format(result, ratio=None):
+    params = ", ".join(f"{k}={v:,}" for k, v in result["params"].items())
+    peak = "-" if result["peak_mb"] is None else f"{result['peak_mb']:.1f}"
+    line = (
+        f"{result['case']:<22} {result['backend']:<10} {params:<28} "
+        f"{result['seconds'] * 1000:>11.2f} ms {peak:>9} MB"
+    )
+    if ratio is not None:
+        line += f"  {ratio:>5.2f}x baseline"
+    return line
+
+
+def metadata(profile):
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "profile": profile,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+# ======================================================
+# BASELINE + SCALING
+# ======================================================
+def _key(result):
+    return result["case"], result["backend"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Ratio to the baseline per measurement -> (rows, regressions); a
+    regression is slower than (1 + tolerance)× above the noise floor
+    """
+    reference = {_key(r): r for r in baseline["results"]}
+    rows, regressions = [], []
+    for result in results:
+        base = reference.get(_key(result))
+        if base is None:
+            continue
+        ratio = result["seconds"] / max(base["seconds"], 1e-9)
+        rows.append((result, ratio))
+        if ratio > 1 + tolerance and result["seconds"] > NOISE_FLOOR_SECONDS:
+            regressions.append((result, ratio))
+    return rows, regressions
+
+
+def scaling(results):
+    """
+    Log-log slope of time vs the case's size axis, per case and backend
+    """
+    curves = {}
+    for result in results:
+        axis = CASES[result["case"]]["axis"]
+        curves.setdefault((result["case"], result["backend"]), []).append(
+            (result["params"][axis], result["seconds"])
+        )
+
+    report = []
+    for (case, backend), points in curves.items():
+        points.sort()
+        sizes, seconds = map(np.array, zip(*points))
+        slope = np.polyfit(np.log(sizes), np.log(seconds), 1)[0] if len(points) > 1 else np.nan
+        report.append({
+            "case": case,
+            "backend": backend,
+            "axis": CASES[case]["axis"],
+            "sizes": sizes.tolist(),
+            "seconds": seconds.tolist(),
+            "exponent": None if np.isnan(slope) else round(float(slope), 3)
+        })
+    return report
+
+
+def plot_scaling(report, directory):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for case in dict.fromkeys(curve["case"] for curve in report):
+        fig, ax = plt.subplots(figsize=(6, 4))
+        for curve in report:
+            if curve["case"] == case:
+                label = f"{curve['backend']} (~n^{curve['exponent']})"
+                ax.loglog(curve["sizes"], curve["seconds"], marker="o", label=label)
+                ax.set_xlabel(curve["axis"])
+        ax.set_ylabel("seconds")
+        ax.set_title(case)
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend()
+        fig.savefig(directory / f"{case}.png", dpi=120, bbox_inches="tight")
+        plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--quick", action="store_true", help="small sizes (CI / smoke run)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite --baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown (0.5 = 1.5x)")
+    parser.add_argument("--plot", type=Path, help="directory for scaling-curve PNGs")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    profile = "quick" if args.quick else "full"
+    results = run_suite(args.cases, profile, repeat=args.repeat, memory=not args.no_memory)
+    report = scaling(results)
+    payload = {"meta": metadata(profile), "results": results, "scaling": report}
+
+    print("\nScaling (time ~ size^k):")
+    for curve in report:
+        print(f"  {curve['case']:<22} {curve['backend']:<10} {curve['axis']:<10} k={curve['exponent']}")
+
+    failed = False
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(payload, indent=2))
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {args.baseline} ({baseline['meta']['created']}):")
+        for result, ratio in rows:
+            print("  " + _format(result, ratio))
+        for result, ratio in regressions:
+            print(f"  REGRESSION {result['case']} {result['backend']} {result['params']}: {ratio:.2f}x")
+        failed = args.check and bool(regressions)
+
+    if args.output:
+        args.output.write_text(json.dumps(payload, indent=2))
+    if args.plot:
+        plot_scaling(report, args.plot)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
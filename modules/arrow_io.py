@@ -0,0 +1,87 @@
+from functools import lru_cache
+from io import BytesIO
+
+from modules.export_excel import widen_float32
+from modules.instrumentation import instrumented
+from modules.lazy_import import lazy_import
+
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+# ======================================================
+# FUZZY RESULT CONTRACT (PAGE 1 -> PAGE 2)
+# ======================================================
+REQUIRED_FUZZY_COLUMNS = ["Month", "Demand", "Initial_Stock", "Fuzzy_Import"]
+
+
+@lru_cache(maxsize=None)
+def fuzzy_result_schema():
+    """
+    Arrow schema of the fuzzy result contract
+    """
+    return pa.schema([
+        pa.field("Month", pa.string(), nullable=False),
+        pa.field("Demand", pa.int64(), nullable=False),
+        pa.field("Initial_Stock", pa.int64(), nullable=False),
+        pa.field("Fuzzy_Import", pa.float64(), nullable=False),
+    ])
+
+PARQUET_MIME = "application/vnd.apache.parquet"
+
+
+def missing_fuzzy_columns(df):
+    """
+    Kolom kontrak yang tidak ada di DataFrame
+    """
+    return [col for col in REQUIRED_FUZZY_COLUMNS if col not in df.columns]
+
+
+def to_fuzzy_table(df):
+    """
+    Convert a fuzzy result frame to an Arrow table that follows
+    fuzzy_result_schema() (extra columns are dropped).
+    """
+    missing = missing_fuzzy_columns(df)
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {missing}")
+
+    arrays = [
+        pa.array(df["Month"].astype(str), type=pa.string()),
+        pa.array(df["Demand"]).cast(pa.int64()),
+        pa.array(df["Initial_Stock"]).cast(pa.int64()),
+        pa.array(widen_float32(df["Fuzzy_Import"].to_numpy())).cast(pa.float64()),
+    ]
+    return pa.Table.from_arrays(arrays, schema=fuzzy_result_schema())
+
+
+@instrumented("export.parquet", units=lambda df: {"rows": len(df)})
+def export_fuzzy_parquet(df):
+    """
+    Export fuzzy result ke Parquet (BytesIO)
+    """
+    output = BytesIO()
+    pq.write_table(to_fuzzy_table(df), output, compression="zstd")
+    output.seek(0)
+    return output
+
+
+def read_fuzzy_parquet(source):
+    """
+    Read a Parquet fuzzy result and validate it against the contract
+    """
+    table = pq.read_table(source)
+
+    missing = [col for col in REQUIRED_FUZZY_COLUMNS if col not in table.column_names]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {missing}")
+
+    table = table.select(REQUIRED_FUZZY_COLUMNS).cast(fuzzy_result_schema())
+    return table.to_pandas()
+
+
+def conform_fuzzy_result(df):
+    """
+    Round-trip a frame from any source (Excel, session) through the
+    Arrow schema so Page 2 always sees the same dtypes.
+    """
+    return to_fuzzy_table(df).to_pandas()
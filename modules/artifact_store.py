@@ -0,0 +1,207 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Anggaran memori global untuk seluruh sesi (byte)
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF_MIME = "application/pdf"
+
+
+# ======================================================
+# CONTENT KEY
+# ======================================================
+# Nilai skalar yang repr()-nya lengkap dan stabil
+_SCALAR_TYPES = (str, int, float, complex, type(None), np.generic, pd.Timestamp, pd.Timedelta, pd.Period)
+
+
+def _update_hash(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).values.tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(str(obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).values.tobytes())
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        h.update(str(obj.dtype).encode())
+        h.update(str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (np.ndarray, pd.Index, pd.api.extensions.ExtensionArray)):
+        # Array objek/string/kategori: tobytes() berisi pointer, repr()
+        # terpotong -> hash per nilai
+        values = obj.ravel() if isinstance(obj, np.ndarray) else obj
+        h.update(f"{type(obj).__name__}{obj.dtype}{np.shape(obj)}".encode())
+        h.update(pd.util.hash_pandas_object(pd.Series(values), index=False).values.tobytes())
+    elif isinstance(obj, bytes):
+        h.update(obj)
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            _update_hash(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            _update_hash(h, item)
+    elif isinstance(obj, _SCALAR_TYPES):
+        h.update(repr(obj).encode())
+    else:
+        raise TypeError(f"content_key cannot hash {type(obj).__name__} by content")
+    h.update(b"|")
+
+
+def content_key(*parts):
+    """
+    Stable hash of DataFrames, arrays and plain values
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+
+# ======================================================
+# ARTIFACT STORE
+# ======================================================
+class ArtifactStore:
+    """
+    In-memory store for generated files (Excel, PDF, Parquet, ...).
+
+    Entries are keyed by (session, name, content key) and share one global
+    byte budget; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id, name, key):
+        with self._lock:
+            entry_key = (session_id, name, key)
+            data = self._entries.get(entry_key)
+            if data is not None:
+                self._entries.move_to_end(entry_key)
+            return data
+
+    def put(self, session_id, name, key, data, replace=True):
+        """
+        Store bytes (or a BytesIO). With replace=True older versions of the
+        same (session, name) are dropped, keeping one file per download.
+        """
+        if hasattr(data, "getvalue"):
+            data = data.getvalue()
+        data = bytes(data)
+
+        with self._lock:
+            if replace:
+                for old_key in [k for k in self._entries if k[:2] == (session_id, name)]:
+                    self._size -= len(self._entries.pop(old_key))
+
+            old = self._entries.pop((session_id, name, key), None)
+            if old is not None:
+                self._size -= len(old)
+
+            if len(data) <= self.budget_bytes:
+                self._entries[(session_id, name, key)] = data
+                self._size += len(data)
+                self._evict()
+
+        return data
+
+    def get_or_create(self, session_id, name, key, factory, replace=True):
+        """
+        Return cached bytes, or build them with factory() on first use
+        """
+        data = self.get(session_id, name, key)
+        if data is None:
+            data = self.put(session_id, name, key, factory(), replace=replace)
+        return data
+
+    def _evict(self):
+        while self._size > self.budget_bytes and self._entries:
+            _, data = self._entries.popitem(last=False)
+            self._size -= len(data)
+
+    def usage(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "budget_bytes": self.budget_bytes
+            }
+
+    def session_bytes(self, session_id):
+        with self._lock:
+            return sum(len(data) for k, data in self._entries.items() if k[0] == session_id)
+
+
+_STORE = ArtifactStore()
+
+
+def get_artifact_store():
+    return _STORE
+
+
+def session_id():
+    """
+    Identifier unik per sesi Streamlit
+    """
+    if "_artifact_session_id" not in st.session_state:
+        st.session_state["_artifact_session_id"] = uuid.uuid4().hex
+    return st.session_state["_artifact_session_id"]
+
+
+# ======================================================
+# STREAMLIT DOWNLOAD
+# ======================================================
+# data=callable (dibuat saat tombol diklik) tersedia sejak Streamlit 1.52
+DEFERRED_DOWNLOAD_VERSION = (1, 52)
+_DEFERRED_DOWNLOAD = tuple(int(part) for part in st.__version__.split(".")[:2]) >= DEFERRED_DOWNLOAD_VERSION
+
+
+def download_file(label, fileobj, file_name, mime, **kwargs):
+    """
+    Download button for a (possibly disk-spooled) binary file object;
+    it is read when the button is clicked, or on render for Streamlit
+    versions without deferred data
+    """
+    def data():
+        fileobj.seek(0)
+        return fileobj.read()
+
+    return st.download_button(
+        label=label,
+        data=data if _DEFERRED_DOWNLOAD else data(),
+        file_name=file_name,
+        mime=mime,
+        **kwargs
+    )
+
+
+def download_artifact(label, name, key, factory, file_name, mime, **kwargs):
+    """
+    Download button backed by the artifact store.
+
+    The file is generated lazily by factory() on the first download
+    (or on first render for Streamlit versions without deferred data)
+    and served from memory afterwards.
+    """
+    store = get_artifact_store()
+    sid = session_id()
+
+    def data():
+        return store.get_or_create(sid, name, key, factory)
+
+    return st.download_button(
+        label=label,
+        data=data if _DEFERRED_DOWNLOAD else data(),
+        file_name=file_name,
+        mime=mime,
+        **kwargs
+    )
@@ -0,0 +1,308 @@
+"""
+Headless batch pipeline: AnyLogic data -> fuzzy -> DP -> KPI/validation -> reports
+
+Runs the same stage functions as the Streamlit pages (modules/pipeline.py)
+for every scenario in a JSON config, in parallel, and skips stages whose
+inputs and code (STAGE_MODULES) are unchanged since the previous run.
+
+Usage:
+    python -m modules.batch_pipeline nightly.json [--workers 8] [--force]
+
+Config:
+    {
+        "output_dir": "runs",
+        "workers": 4,
+        "defaults": {"holding_cost": 2.0, "import_cost": 5.0, "max_stock": 500},
+        "scenarios": [
+            {"name": "plant_a", "input": "data/plant_a.csv"},
+            {"name": "plant_a_high_holding", "input": "data/plant_a.csv", "holding_cost": 4.0}
+        ]
+    }
+
+Relative paths are resolved against the config file. "initial_stock" may be
+omitted to use the first Initial_Stock value, as on Page 2. "block" (e.g. 13
+for quarters of weekly data) switches a scenario to hierarchical planning
+where it beats the full DP (max stock of 1000 or more).
+"rule_base" (a JSON/YAML rule base file, see modules/rule_base.py) replaces
+the built-in fuzzy controller.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PARAMS = {
+    "holding_cost": 2.0,
+    "import_cost": 5.0,
+    "max_stock": 500,
+    "initial_stock": None
+}
+
+MANIFEST_NAME = "manifest.json"
+
+# Modul yang menentukan hasil stage; perubahan kodenya membuat cache basi
+STAGE_MODULES = {
+    "fuzzy": ["data_loader", "fuzzy_system", "pipeline", "rule_base"],
+    "dp": ["dp_model", "hierarchical_dp"]
+}
+
+# Nama file sama dengan tombol download di Page 1-3
+STAGE_OUTPUTS = {
+    "fuzzy": ["fuzzy_import_results.parquet", "fuzzy_import_results.xlsx"],
+    "dp": ["dp_result.parquet", "dp_optimization_results.xlsx"],
+    "reports": ["kpi.json", "Fuzzy_DP_Report.xlsx", "Fuzzy_DP_Summary.pdf"]
+}
+
+
+def _file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _code_digests(stage):
+    modules_dir = Path(__file__).resolve().parent
+    return [_file_digest(modules_dir / f"{name}.py") for name in STAGE_MODULES[stage]]
+
+
+def _read_fuzzy_result(out):
+    # Parquet menyimpan Month sebagai teks (kontrak Arrow); run baru
+    # memakai Period seperti prepare_anylogic_frame
+    df = pd.read_parquet(out / "fuzzy_import_results.parquet")
+    df["Month"] = pd.to_datetime(df["Month"]).dt.to_period("M")
+    return df
+
+
+def _stage_key(*parts):
+    return hashlib.blake2b(
+        json.dumps(parts, sort_keys=True, default=str).encode(),
+        digest_size=16
+    ).hexdigest()
+
+
+def load_config(path):
+    path = Path(path)
+    config = json.loads(path.read_text(encoding="utf-8"))
+    base = path.parent
+
+    defaults = {**DEFAULT_PARAMS, **config.get("defaults", {})}
+    scenarios = []
+
+    for entry in config["scenarios"]:
+        scenario = {**defaults, **entry}
+        scenario["input"] = str((base / scenario["input"]).resolve())
+        if scenario.get("rule_base"):
+            scenario["rule_base"] = str((base / scenario["rule_base"]).resolve())
+        scenarios.append(scenario)
+
+    names = [s["name"] for s in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("Scenario names must be unique")
+
+    return {
+        "output_dir": str((base / config.get("output_dir", "runs")).resolve()),
+        "workers": config.get("workers", os.cpu_count() or 1),
+        "scenarios": scenarios
+    }
+
+
+def run_scenario(scenario, output_dir, force=False):
+    """
+    Run (or reuse) every stage of one scenario; returns a summary row
+    """
+    # Import di worker agar proses utama tetap ringan
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    from modules.arrow_io import export_fuzzy_parquet
+    from modules.data_loader import load_anylogic_data
+    from modules.export_excel import export_single_sheet
+    from modules.pipeline import (
+        build_excel_report,
+        build_pdf_report,
+        prepare_anylogic_frame,
+        run_analysis_stage,
+        run_dp_stage,
+        run_fuzzy_scoring
+    )
+    from modules.rule_base import DEFAULT_RULE_BASE, load_rule_base
+
+    out = Path(output_dir) / scenario["name"]
+    out.mkdir(parents=True, exist_ok=True)
+
+    manifest_path = out / MANIFEST_NAME
+    manifest = {} if force or not manifest_path.exists() else json.loads(manifest_path.read_text())
+
+    def is_fresh(stage, key):
+        return (
+            manifest.get(stage) == key and
+            all((out / name).exists() for name in STAGE_OUTPUTS[stage])
+        )
+
+    status = {}
+    timings = {}
+
+    # ---- Fuzzy stage ----
+    rule_base_path = scenario.get("rule_base") or DEFAULT_RULE_BASE
+    fuzzy_key = _stage_key(
+        "fuzzy",
+        _file_digest(scenario["input"]),
+        _code_digests("fuzzy"),
+        _file_digest(rule_base_path)
+    )
+    df_fuzzy = None
+
+    if is_fresh("fuzzy", fuzzy_key):
+        status["fuzzy"] = "cached"
+    else:
+        start = time.perf_counter()
+        df = prepare_anylogic_frame(load_anylogic_data(scenario["input"]))
+        rule_base = load_rule_base(scenario["rule_base"]) if scenario.get("rule_base") else None
+        df_fuzzy = run_fuzzy_scoring(df, rule_base)
+
+        (out / "fuzzy_import_results.parquet").write_bytes(
+            export_fuzzy_parquet(df_fuzzy).getvalue()
+        )
+        (out / "fuzzy_import_results.xlsx").write_bytes(
+            export_single_sheet(df_fuzzy, sheet_name="Fuzzy_Result").getvalue()
+        )
+        timings["fuzzy"] = time.perf_counter() - start
+        status["fuzzy"] = "computed"
+        manifest["fuzzy"] = fuzzy_key
+
+    # ---- DP stage ----
+    dp_params = {k: scenario[k] for k in DEFAULT_PARAMS}
+    # Hanya bila dipakai, agar key stage DP skenario lain tidak berubah
+    if scenario.get("block"):
+        dp_params["block"] = int(scenario["block"])
+    dp_key = _stage_key("dp", fuzzy_key, _code_digests("dp"), dp_params)
+    df_dp = None
+
+    if is_fresh("dp", dp_key):
+        status["dp"] = "cached"
+    else:
+        start = time.perf_counter()
+        if df_fuzzy is None:
+            df_fuzzy = _read_fuzzy_result(out)
+
+        df_dp = run_dp_stage(df_fuzzy, **dp_params)
+
+        df_dp.to_parquet(out / "dp_result.parquet", index=False)
+        (out / "dp_optimization_results.xlsx").write_bytes(
+            export_single_sheet(df_dp, sheet_name="DP_Results").getvalue()
+        )
+        timings["dp"] = time.perf_counter() - start
+        status["dp"] = "computed"
+        manifest["dp"] = dp_key
+
+    # ---- KPI / validation / report stage ----
+    reports_key = _stage_key("reports", dp_key)
+
+    if is_fresh("reports", reports_key):
+        status["reports"] = "cached"
+        kpi = json.loads((out / "kpi.json").read_text())
+    else:
+        start = time.perf_counter()
+        if df_fuzzy is None:
+            df_fuzzy = _read_fuzzy_result(out)
+        if df_dp is None:
+            df_dp = pd.read_parquet(out / "dp_result.parquet")
+
+        analysis = run_analysis_stage(df_dp)
+        kpi = {k: float(v) for k, v in analysis["kpi"].items()}
+        kpi.update({
+            k: bool(v) if isinstance(v, (bool, np.bool_)) else float(v)
+            for k, v in analysis["validation"].iloc[0].items()
+        })
+        kpi["ANOVA F"] = float(analysis["anova_stat"])
+        kpi["ANOVA p-value"] = float(analysis["anova_p"])
+
+        (out / "Fuzzy_DP_Report.xlsx").write_bytes(
+            build_excel_report(df_fuzzy, df_dp, analysis).getvalue()
+        )
+        (out / "Fuzzy_DP_Summary.pdf").write_bytes(
+            build_pdf_report(df_dp, analysis).getvalue()
+        )
+        (out / "kpi.json").write_text(json.dumps(kpi, indent=2))
+        timings["reports"] = time.perf_counter() - start
+        status["reports"] = "computed"
+        manifest["reports"] = reports_key
+
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    return {
+        "Scenario": scenario["name"],
+        **{f"{stage}_status": state for stage, state in status.items()},
+        **{f"{stage}_seconds": round(sec, 3) for stage, sec in timings.items()},
+        **kpi
+    }
+
+
+def run_batch(config, workers=None, force=False):
+    """
+    Run every scenario of a loaded config; returns the summary DataFrame
+    """
+    workers = workers or config["workers"]
+    output_dir = config["output_dir"]
+    rows = []
+    failures = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_scenario, scenario, output_dir, force): scenario["name"]
+            for scenario in config["scenarios"]
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                failures.append(name)
+                print(f"[FAILED] {name}: {e}", file=sys.stderr)
+                continue
+
+            stages = ", ".join(
+                f"{k[:-7]}={v}" for k, v in row.items() if k.endswith("_status")
+            )
+            print(f"[OK] {name}: {stages}")
+            rows.append(row)
+
+    summary = pd.DataFrame(rows)
+    if not summary.empty:
+        summary = summary.sort_values("Scenario")
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        summary.to_csv(Path(output_dir) / "summary.csv", index=False)
+
+    return summary, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("config", help="JSON scenario config")
+    parser.add_argument("--workers", type=int, help="parallel scenario workers")
+    parser.add_argument("--output-dir", help="override output_dir from the config")
+    parser.add_argument("--force", action="store_true", help="recompute every stage")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.output_dir:
+        config["output_dir"] = str(Path(args.output_dir).resolve())
+
+    _, failures = run_batch(config, workers=args.workers, force=args.force)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.artifact_store import get_artifact_store, session_id
+
+# ======================================================
+# COMPACT RESULT FRAMES (SESSION STATE)
+# ======================================================
+# Anggaran memori global untuk hasil fuzzy/DP semua sesi (byte)
+RESULT_BUDGET_BYTES = int(float(os.environ.get("DSS_RESULT_BUDGET_MB", 512)) * 1024 * 1024)
+
+# Float yang bernilai bulat di atas batas ini tetap float64 (float32 tidak
+# lagi menyimpan bilangan bulat secara eksak)
+FLOAT32_EXACT_INTEGER = 2 ** 24
+
+INT32_RANGE = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+
+# Teks -> categorical hanya bila label berulang (unik <= rasio ini)
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+# Kolom yang dibulatkan DP (action_space): tetap float64 agar Page 2
+# memakai nilai yang sama dengan CLI batch
+FULL_PRECISION_COLUMNS = ("Fuzzy_Import",)
+
+
+def _compact_column(series):
+    """
+    float64 -> float32, int64 -> int32 (when in range), repeated text ->
+    categorical. Period months are already integer ordinals and stay.
+    """
+    if isinstance(series.dtype, (pd.PeriodDtype, pd.CategoricalDtype)):
+        return series.array
+
+    values = series.to_numpy()
+
+    if pd.api.types.is_bool_dtype(series):
+        return values
+    if pd.api.types.is_integer_dtype(series):
+        if len(values) and (values.min() < INT32_RANGE[0] or values.max() > INT32_RANGE[1]):
+            return values
+        return values.astype(np.int32)
+    if pd.api.types.is_float_dtype(series):
+        finite = values[np.isfinite(values)]
+        if len(finite) and np.abs(finite).max() > FLOAT32_EXACT_INTEGER and (finite == np.round(finite)).all():
+            return values
+        return values.astype(np.float32)
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        if series.nunique() <= CATEGORICAL_MAX_UNIQUE_RATIO * len(series):
+            return pd.Categorical(series)
+    return series.array
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class CompactFrame:
+    """
+    Read-only, compact copy of a result frame; FULL_PRECISION_COLUMNS
+    are copied unchanged.
+
+    frame() hands out shallow copies of one base frame: they share the
+    compact arrays, and a write copies only the touched column
+    (pandas copy-on-write; on older pandas the read-only arrays make an
+    in-place write fail instead of changing the stored result).
+    """
+
+    def __init__(self, df):
+        self.source_nbytes = frame_nbytes(df)
+        columns = {}
+        for name in df.columns:
+            if name in FULL_PRECISION_COLUMNS:
+                column = df[name].to_numpy(copy=True)
+            else:
+                column = _compact_column(df[name])
+            if isinstance(column, np.ndarray):
+                column.flags.writeable = False
+            columns[name] = column
+
+        self._base = pd.DataFrame(columns, copy=False)
+        self.nbytes = frame_nbytes(self._base)
+        self.rows = len(self._base)
+        self.columns = list(self._base.columns)
+        self.last_access = time.monotonic()
+
+    @property
+    def evicted(self):
+        return self._base is None
+
+    def frame(self):
+        self.last_access = time.monotonic()
+        if self._base is None:
+            return None
+        return self._base.copy(deep=False)
+
+    def release(self):
+        """
+        Drop the data (memory pressure); frame() returns None afterwards
+        """
+        self._base = None
+        self.nbytes = 0
+
+
+# ======================================================
+# GLOBAL REGISTRY + EVICTION
+# ======================================================
+class ResultRegistry:
+    """
+    All compact results of all sessions under one byte budget. When the
+    budget is exceeded the least recently used results of any session
+    are released (the session then sees the result as missing).
+    """
+
+    def __init__(self, budget_bytes=RESULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def put(self, session, name, compact):
+        with self._lock:
+            old = self._entries.pop((session, name), None)
+            if old is not None and old is not compact:
+                old.release()
+            self._entries[(session, name)] = compact
+            self._evict(keep=(session, name))
+        return compact
+
+    def touch(self, session, name):
+        with self._lock:
+            if (session, name) in self._entries:
+                self._entries.move_to_end((session, name))
+
+    def drop_session(self, session):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == session]:
+                self._entries.pop(key).release()
+
+    def _evict(self, keep):
+        total = sum(c.nbytes for c in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            compact = self._entries.pop(key)
+            total -= compact.nbytes
+            compact.release()
+            self.evictions += 1
+
+    def usage(self, session=None):
+        with self._lock:
+            entries = [
+                c for (s, _), c in self._entries.items()
+                if session is None or s == session
+            ]
+            return {
+                "entries": len(entries),
+                "bytes": sum(c.nbytes for c in entries),
+                "source_bytes": sum(c.source_nbytes for c in entries),
+                "budget_bytes": self.budget_bytes,
+                "evictions": self.evictions
+            }
+
+
+_REGISTRY = ResultRegistry()
+
+
+def get_result_registry():
+    return _REGISTRY
+
+
+# ======================================================
+# SESSION HELPERS
+# ======================================================
+def store_result(name, df):
+    """
+    Keep a result frame in the session in compact form
+    """
+    compact = CompactFrame(df)
+    st.session_state[name] = compact
+    _REGISTRY.put(session_id(), name, compact)
+    return compact
+
+
+def load_result(name):
+    """
+    Frame view of a session result, or None when missing or evicted.
+    Plain DataFrames (e.g. put into session_state directly) are returned
+    as they are.
+    """
+    value = st.session_state.get(name)
+    if isinstance(value, CompactFrame):
+        df = value.frame()
+        if df is None:
+            del st.session_state[name]
+            return None
+        _REGISTRY.touch(session_id(), name)
+        return df
+    return value
+
+
+def was_evicted(name):
+    value = st.session_state.get(name)
+    return isinstance(value, CompactFrame) and value.evicted
+
+
+def _value_nbytes(value):
+    if isinstance(value, CompactFrame):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return frame_nbytes(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_value_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def session_memory():
+    """
+    Approximate bytes per session_state entry plus the session's cached
+    downloads -> DataFrame sorted by size
+    """
+    rows = [
+        {"Item": str(key), "Type": type(value).__name__, "Bytes": _value_nbytes(value)}
+        for key, value in st.session_state.items()
+    ]
+    rows.append({
+        "Item": "cached downloads",
+        "Type": "ArtifactStore",
+        "Bytes": get_artifact_store().session_bytes(session_id())
+    })
+    df = pd.DataFrame(rows).sort_values("Bytes", ascending=False, ignore_index=True)
+    df["MB"] = (df["Bytes"] / 1e6).round(3)
+    return df
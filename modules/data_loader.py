@@ -1,9 +1,41 @@
 import pandas as pd
 
+from modules.arrow_io import (
+    conform_fuzzy_result,
+    read_fuzzy_parquet
+)
+from modules.instrumentation import span
+
+
+def _file_name(uploaded_file):
+    # UploadedFile (Streamlit) atau path biasa (batch CLI); ekstensi tanpa
+    # membedakan huruf besar/kecil, seperti _is_replication_file
+    return str(getattr(uploaded_file, "name", uploaded_file)).lower()
+
+
 def load_anylogic_data(uploaded_file):
-    if uploaded_file.name.endswith(".csv"):
-        return pd.read_csv(uploaded_file)
-    elif uploaded_file.name.endswith(".xlsx"):
-        return pd.read_excel(uploaded_file)
-    else:
-        raise ValueError("Format file tidak didukung")
+    with span("load.anylogic") as s:
+        if _file_name(uploaded_file).endswith(".csv"):
+            df = pd.read_csv(uploaded_file)
+        elif _file_name(uploaded_file).endswith(".xlsx"):
+            df = pd.read_excel(uploaded_file)
+        else:
+            raise ValueError("Format file tidak didukung")
+        s.set(rows=len(df))
+    return df
+
+
+def load_fuzzy_result(uploaded_file):
+    """
+    Load hasil fuzzy (Page 1) dari Parquet atau Excel,
+    divalidasi terhadap fuzzy_result_schema()
+    """
+    with span("load.fuzzy_result") as s:
+        if _file_name(uploaded_file).endswith(".parquet"):
+            df = read_fuzzy_parquet(uploaded_file)
+        elif _file_name(uploaded_file).endswith(".xlsx"):
+            df = conform_fuzzy_result(pd.read_excel(uploaded_file))
+        else:
+            raise ValueError("Format file tidak didukung")
+        s.set(rows=len(df))
+    return df
@@ -0,0 +1,395 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from modules.lazy_import import lazy_import
+
+nx = lazy_import("networkx")
+
+# ======================================================
+# DISTRIBUTION NETWORK (MIN-COST FLOW AFTER THE DP)
+# ======================================================
+# Optimal_Import masuk lewat pelabuhan (port), stok awal ada di pabrik/
+# gudang (plant), demand dibagi ke depot. Per periode: min-cost flow.
+NODE_TYPES = ["port", "plant", "depot"]
+
+MODES = ["period", "time_expanded"]
+
+# network_simplex butuh bilangan bulat: biaya dikali COST_SCALE
+COST_SCALE = 100
+
+# Biaya per unit demand yang tidak terpenuhi (jauh di atas biaya angkut)
+DEFAULT_SHORTAGE_PENALTY = 1_000.0
+
+# Simpul bantu (bukan bagian dari konfigurasi jaringan)
+IMPORT, SHORTAGE, END, DISPOSAL = "__import__", "__shortage__", "__end__", "__disposal__"
+SINK = ("__sink__", None)
+
+DEFAULT_NETWORK = {
+    "nodes": [
+        {"name": "Merak", "type": "port", "capacity": 300},
+        {"name": "Ciwandan", "type": "port", "capacity": 250},
+        {"name": "Bojonegara", "type": "port", "capacity": 150},
+        {"name": "Cilegon", "type": "plant", "storage": 300, "share": 0.6},
+        {"name": "Serang", "type": "plant", "storage": 200, "share": 0.4},
+        {"name": "Tangerang", "type": "depot", "share": 0.4},
+        {"name": "Serang Kota", "type": "depot", "share": 0.25},
+        {"name": "Pandeglang", "type": "depot", "share": 0.2},
+        {"name": "Lebak", "type": "depot", "share": 0.15}
+    ],
+    "arcs": [
+        {"from": "Merak", "to": "Cilegon", "capacity": 300, "cost": 0.4},
+        {"from": "Merak", "to": "Serang", "capacity": 200, "cost": 0.9},
+        {"from": "Ciwandan", "to": "Cilegon", "capacity": 250, "cost": 0.3},
+        {"from": "Ciwandan", "to": "Serang", "capacity": 150, "cost": 0.8},
+        {"from": "Bojonegara", "to": "Serang", "capacity": 150, "cost": 0.6},
+        {"from": "Bojonegara", "to": "Tangerang", "capacity": 80, "cost": 1.6},
+        {"from": "Cilegon", "to": "Tangerang", "capacity": 200, "cost": 1.4},
+        {"from": "Cilegon", "to": "Serang Kota", "capacity": 150, "cost": 0.5},
+        {"from": "Cilegon", "to": "Pandeglang", "capacity": 100, "cost": 1.1},
+        {"from": "Serang", "to": "Tangerang", "capacity": 150, "cost": 1.0},
+        {"from": "Serang", "to": "Serang Kota", "capacity": 150, "cost": 0.3},
+        {"from": "Serang", "to": "Pandeglang", "capacity": 100, "cost": 0.8},
+        {"from": "Serang", "to": "Lebak", "capacity": 100, "cost": 0.9}
+    ]
+}
+
+
+def load_network(source):
+    """
+    Network config from a dict, a JSON string/bytes or a path
+    """
+    if isinstance(source, dict):
+        network = source
+    elif isinstance(source, (bytes, str)) and str(source).lstrip().startswith("{"):
+        network = json.loads(source)
+    else:
+        with open(source, encoding="utf-8") as f:
+            network = json.load(f)
+    validate_network(network)
+    return network
+
+
+def validate_network(network):
+    names = [node["name"] for node in network["nodes"]]
+    if len(set(names)) != len(names):
+        raise ValueError("Node names must be unique")
+
+    for node in network["nodes"]:
+        if node.get("type") not in NODE_TYPES:
+            raise ValueError(f"Node '{node['name']}' needs a type in {NODE_TYPES}")
+
+    for arc in network["arcs"]:
+        for end in (arc["from"], arc["to"]):
+            if end not in names:
+                raise ValueError(f"Arc references unknown node '{end}'")
+
+    for kind in NODE_TYPES:
+        if not any(node["type"] == kind for node in network["nodes"]):
+            raise ValueError(f"The network needs at least one {kind}")
+
+
+def synthetic_network(n_ports, n_plants, n_depots, seed=0, density=0.3):
+    """
+    Random layered port -> plant -> depot network (benchmarks/tests)
+    """
+    rng = np.random.default_rng(seed)
+    ports = [f"port_{i}" for i in range(n_ports)]
+    plants = [f"plant_{i}" for i in range(n_plants)]
+    depots = [f"depot_{i}" for i in range(n_depots)]
+
+    nodes = (
+        [{"name": p, "type": "port", "capacity": int(rng.integers(100, 400))} for p in ports] +
+        [{"name": p, "type": "plant", "storage": int(rng.integers(50, 300))} for p in plants] +
+        [{"name": d, "type": "depot"} for d in depots]
+    )
+
+    arcs = []
+    for sources, targets in ((ports, plants), (plants, depots)):
+        for j, target in enumerate(targets):
+            # Setiap tujuan minimal punya satu jalur masuk
+            chosen = {sources[j % len(sources)]}
+            chosen |= {s for s in sources if rng.random() < density}
+            for source in sorted(chosen):
+                arcs.append({
+                    "from": source,
+                    "to": target,
+                    "capacity": int(rng.integers(50, 300)),
+                    "cost": round(float(rng.uniform(0.2, 2.0)), 2)
+                })
+
+    return {"nodes": nodes, "arcs": arcs}
+
+
+def _shares(nodes, kind):
+    """
+    Normalized 'share' of the nodes of one type (equal split if missing)
+    """
+    group = [node for node in nodes if node["type"] == kind]
+    weights = np.array([node.get("share", 1.0) for node in group], dtype=float)
+    return [node["name"] for node in group], weights / weights.sum()
+
+
+def _split(total, weights):
+    """
+    Split an integer total by weights (largest remainder, sums exactly)
+    """
+    raw = total * weights
+    parts = np.floor(raw).astype(int)
+    remainder = int(total - parts.sum())
+    if remainder > 0:
+        parts[np.argsort(raw - parts)[::-1][:remainder]] += 1
+    return parts
+
+
+def _scaled(cost):
+    return int(round(cost * COST_SCALE))
+
+
+# ======================================================
+# NETWORK CONSTRUCTION
+# ======================================================
+def _add_layer(G, network, t, penalty):
+    """
+    Nodes and arcs of one period; node keys are (name, t)
+    """
+    for node in network["nodes"]:
+        G.add_node((node["name"], t), demand=0)
+    G.add_node((END, t), demand=0)
+    G.add_node((DISPOSAL, t), demand=0)
+    G.add_edge((DISPOSAL, t), SINK, weight=0)
+
+    for node in network["nodes"]:
+        if node["type"] == "port":
+            attrs = {"weight": _scaled(node.get("cost", 0.0))}
+            if node.get("capacity") is not None:
+                attrs["capacity"] = int(node["capacity"])
+            G.add_edge((IMPORT, t), (node["name"], t), **attrs)
+        elif node["type"] == "depot":
+            G.add_edge((SHORTAGE, t), (node["name"], t), weight=_scaled(penalty))
+        if node["type"] != "depot":
+            # Sisa di atas kapasitas gudang dibuang (seperti min(max_stock) di DP)
+            G.add_edge((node["name"], t), (DISPOSAL, t), weight=_scaled(node.get("disposal_cost", 0.0)))
+
+    for arc in network["arcs"]:
+        attrs = {"weight": _scaled(arc.get("cost", 0.0))}
+        if arc.get("capacity") is not None:
+            attrs["capacity"] = int(arc["capacity"])
+        G.add_edge((arc["from"], t), (arc["to"], t), **attrs)
+
+    # Impor di atas kapasitas pelabuhan tidak bisa dibongkar (penalti)
+    G.add_edge((IMPORT, t), (DISPOSAL, t), weight=_scaled(penalty))
+
+    # Kapasitas shortage yang tidak dipakai mengalir langsung ke sink;
+    # stok akhir yang tidak muat di gudang juga dihitung shortage
+    G.add_edge((SHORTAGE, t), SINK, weight=0)
+    G.add_edge((SHORTAGE, t), (END, t), weight=_scaled(penalty))
+
+
+def _storage_arc(node):
+    attrs = {"weight": _scaled(node.get("storage_cost", 0.0))}
+    if node.get("storage") is not None:
+        attrs["capacity"] = int(node["storage"])
+    return attrs
+
+
+def _close(G):
+    """
+    The sink absorbs whatever supply is left, so the network balances
+    """
+    G.nodes[SINK]["demand"] = -sum(d for _, d in G.nodes(data="demand"))
+    return G
+
+
+def period_network(
+    network,
+    demand,
+    imports,
+    starting_stock,
+    ending_stock,
+    penalty=DEFAULT_SHORTAGE_PENALTY
+):
+    """
+    Min-cost flow network of one period. The starting stock is split over
+    the plants by 'share'; the DP's ending stock must end up in plant
+    storage (capacity 'storage'), anything beyond it is disposed of.
+    """
+    G = nx.DiGraph()
+    G.add_node(SINK, demand=0)
+    G.add_node((IMPORT, 0), demand=-int(imports))
+    G.add_node((SHORTAGE, 0), demand=-int(demand) - int(ending_stock))
+    _add_layer(G, network, 0, penalty)
+    G.nodes[(END, 0)]["demand"] = int(ending_stock)
+
+    depots, depot_shares = _shares(network["nodes"], "depot")
+    for name, part in zip(depots, _split(int(demand), depot_shares)):
+        G.nodes[(name, 0)]["demand"] += int(part)
+
+    plants, plant_shares = _shares(network["nodes"], "plant")
+    for name, part in zip(plants, _split(int(starting_stock), plant_shares)):
+        G.nodes[(name, 0)]["demand"] -= int(part)
+
+    for node in network["nodes"]:
+        if node["type"] == "plant":
+            G.add_edge((node["name"], 0), (END, 0), **_storage_arc(node))
+
+    return _close(G)
+
+
+def time_expanded_network(network, df_dp, penalty=DEFAULT_SHORTAGE_PENALTY):
+    """
+    All periods in one network: plant stock carries over to the next
+    period (capacity 'storage', cost 'storage_cost'); the initial stock
+    sits at the plants in period 0 and the DP's final ending stock must
+    remain in storage after the last period.
+    """
+    G = nx.DiGraph()
+    G.add_node(SINK, demand=0)
+    T = len(df_dp)
+    final_stock = int(df_dp["Ending_Stock"].iloc[-1])
+    depots, depot_shares = _shares(network["nodes"], "depot")
+    plants, plant_shares = _shares(network["nodes"], "plant")
+
+    for t in range(T):
+        demand = int(df_dp["Demand"].iloc[t])
+        G.add_node((IMPORT, t), demand=-int(df_dp["Optimal_Import"].iloc[t]))
+        G.add_node((SHORTAGE, t), demand=-demand - (final_stock if t == T - 1 else 0))
+        _add_layer(G, network, t, penalty)
+
+        for name, part in zip(depots, _split(demand, depot_shares)):
+            G.nodes[(name, t)]["demand"] += int(part)
+
+        for node in network["nodes"]:
+            if node["type"] == "plant":
+                target = (node["name"], t + 1) if t + 1 < T else (END, t)
+                G.add_edge((node["name"], t), target, **_storage_arc(node))
+
+    for name, part in zip(plants, _split(int(df_dp["Starting_Stock"].iloc[0]), plant_shares)):
+        G.nodes[(name, 0)]["demand"] -= int(part)
+    G.nodes[(END, T - 1)]["demand"] = final_stock
+
+    return _close(G)
+
+
+# ======================================================
+# SOLVERS
+# ======================================================
+FLOW_TYPES = {IMPORT: "import", SHORTAGE: "shortage", END: "ending stock", DISPOSAL: "disposal"}
+
+
+def _flow_rows(G, flow, months):
+    """
+    Non-zero flows -> rows; arcs into the sink are bookkeeping only.
+    Carry-over arcs count in the period they leave.
+    """
+    rows = []
+    for u, targets in flow.items():
+        for v, amount in targets.items():
+            if amount <= 0 or v == SINK:
+                continue
+            unit_cost = G.edges[u, v]["weight"] / COST_SCALE
+            if u[0] == IMPORT and v[0] == DISPOSAL:
+                kind = "unlanded import"
+            elif u[0] in FLOW_TYPES or v[0] in FLOW_TYPES:
+                kind = FLOW_TYPES.get(u[0]) or FLOW_TYPES[v[0]]
+            else:
+                kind = "carry-over" if u[0] == v[0] else "transport"
+            rows.append({
+                "Month": months[u[1]],
+                "From": FLOW_TYPES.get(u[0], u[0]),
+                "To": FLOW_TYPES.get(v[0], v[0]),
+                "Type": kind,
+                "Flow": int(amount),
+                "Unit Cost": unit_cost,
+                "Cost": unit_cost * amount
+            })
+    return rows
+
+
+def solve_period(
+    network,
+    month,
+    demand,
+    imports,
+    starting_stock,
+    ending_stock,
+    penalty=DEFAULT_SHORTAGE_PENALTY
+):
+    """
+    Min-cost flow of one period -> list of flow rows
+    """
+    G = period_network(network, demand, imports, starting_stock, ending_stock, penalty)
+    _, flow = nx.network_simplex(G)
+    return _flow_rows(G, flow, [month])
+
+
+def optimize_distribution(
+    df_dp,
+    network=None,
+    mode="period",
+    workers=1,
+    penalty=DEFAULT_SHORTAGE_PENALTY,
+    progress=None
+):
+    """
+    Allocate the DP's optimal import and stock over the network.
+
+    mode="period": one min-cost flow per month (parallel over workers
+    processes); the starting stock of each month is split over the
+    plants by 'share'. mode="time_expanded": one network over all months
+    in which plant stock carries over.
+
+    Returns (flows, summary): flows per arc and month, and per-month
+    transport/shortage totals.
+    """
+    network = load_network(network if network is not None else DEFAULT_NETWORK)
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+
+    months = df_dp["Month"].astype(str).tolist()
+
+    if mode == "time_expanded":
+        G = time_expanded_network(network, df_dp, penalty)
+        _, flow = nx.network_simplex(G)
+        rows = _flow_rows(G, flow, months)
+        if progress is not None:
+            progress(1, 1)
+    else:
+        tasks = [
+            (network, months[t], int(df_dp["Demand"].iloc[t]), int(df_dp["Optimal_Import"].iloc[t]),
+             int(df_dp["Starting_Stock"].iloc[t]), int(df_dp["Ending_Stock"].iloc[t]), penalty)
+            for t in range(len(df_dp))
+        ]
+        rows = []
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(solve_period, *task) for task in tasks]
+                for i, future in enumerate(futures, start=1):
+                    rows.extend(future.result())
+                    if progress is not None:
+                        progress(i, len(tasks))
+        else:
+            for i, task in enumerate(tasks, start=1):
+                rows.extend(solve_period(*task))
+                if progress is not None:
+                    progress(i, len(tasks))
+
+    flows = pd.DataFrame(rows, columns=["Month", "From", "To", "Type", "Flow", "Unit Cost", "Cost"])
+    return flows, summarize_distribution(flows, months)
+
+
+def summarize_distribution(flows, months):
+    """
+    Per-month totals by flow type
+    """
+    summary = flows.pivot_table(
+        index="Month", columns="Type", values="Flow", aggfunc="sum", fill_value=0
+    ).reindex(months, fill_value=0)
+    summary.columns = [f"{c.title()} Units" for c in summary.columns]
+
+    cost = flows[flows["Type"].isin(["transport", "import", "carry-over"])].groupby("Month")["Cost"].sum()
+    summary["Distribution Cost"] = cost.reindex(months, fill_value=0.0)
+    return summary.reset_index().rename(columns={"index": "Month"})
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+# ======================================================
+# SCREEN-RESOLUTION DOWNSAMPLING FOR TIME-SERIES CHARTS
+# ======================================================
+# Titik maksimum per garis (~ lebar gambar 10 inci x 100 dpi)
+MAX_POINTS = 1000
+
+# Penanda titik (marker) hanya untuk seri pendek
+MARKER_LIMIT = 60
+
+# Batang per seri sebelum batang diagregasi per bucket (nilai maksimum)
+MAX_BARS = 120
+
+
+def time_axis(months):
+    """
+    Month labels / Periods / dates -> datetime64 axis (numeric for
+    matplotlib). Labels that are not dates fall back to 0..n-1.
+    """
+    if isinstance(months, pd.PeriodIndex) or isinstance(getattr(months, "dtype", None), pd.PeriodDtype):
+        return pd.PeriodIndex(months).to_timestamp().to_numpy()
+
+    values = np.asarray(months)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values
+    if np.issubdtype(values.dtype, np.number):
+        return values
+
+    dates = pd.to_datetime(pd.Index(values.astype(str)), errors="coerce")
+    if len(dates) and not dates.isna().any():
+        return dates.to_numpy()
+    return np.arange(len(values))
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[s]").astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, threshold=MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that
+    keep the visual shape of the line (peaks, troughs, first and last)
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    every = (n - 2) / (threshold - 2)
+
+    sampled = np.empty(threshold, dtype=np.int64)
+    sampled[0] = 0
+    a = 0
+
+    for i in range(threshold - 2):
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        sampled[i + 1] = a
+
+    sampled[-1] = n - 1
+    return sampled
+
+
+def minmax_indices(y, buckets=MAX_POINTS // 2):
+    """
+    Min and max of each bucket (plus first/last point) in order; keeps
+    every spike at the cost of up to 2 points per bucket
+    """
+    n = len(y)
+    if 2 * buckets + 2 >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    picks = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        chunk = y[start:end]
+        picks.append(start + int(np.nanargmin(chunk)))
+        picks.append(start + int(np.nanargmax(chunk)))
+    return np.unique(picks)
+
+
+def downsample(x, y, max_points=MAX_POINTS, method="lttb"):
+    """
+    (x, y) reduced to at most ~max_points points for drawing
+    """
+    if len(y) <= max_points:
+        return np.asarray(x), np.asarray(y)
+    if method == "minmax":
+        idx = minmax_indices(y, max_points // 2)
+    else:
+        idx = lttb_indices(x, y, max_points)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def bucket_max(x, y, buckets=MAX_BARS):
+    """
+    Bars for long series on a numeric axis: bucket left edge, bucket
+    width and the largest value in the bucket (peaks stay visible)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    starts = np.unique(np.linspace(0, len(y), buckets + 1).astype(np.int64)[:-1])
+
+    step = (x[-1] - x[0]) / (len(x) - 1) if len(x) > 1 else 1.0
+    edges = np.append(x[starts], x[-1] + step)
+    return edges[:-1], np.diff(edges), np.maximum.reduceat(y, starts)
+
+
+def window(x, low, high):
+    """
+    Slice of a sorted axis between low and high (inclusive) for zooming
+    """
+    x = np.asarray(x)
+    return slice(np.searchsorted(x, low, side="left"), np.searchsorted(x, high, side="right"))
@@ -1,42 +1,50 @@
 import numpy as np
 import pandas as pd
 
-def dp_deterministic_horizon(
-    demand,
-    fuzzy_import,
-    holding_cost,
-    import_cost,
-    max_stock,
-    initial_stock
-):
+from modules.instrumentation import count, span
+from modules.precision import COST_RTOL, resolve_dtype
+
+# Backend rekursi nilai: "numpy" (vektor per periode) atau "loop"
+# (implementasi referensi, selalu float64)
+BACKENDS = ("numpy", "loop")
+
+
+def action_space(fuzzy_value, cap=None):
     """
-    Deterministic finite-horizon Dynamic Programming
-    Horizon: len(demand)
+    Action space dibatasi oleh fuzzy output; cap (kapasitas impor
+    periode itu, inf = tanpa batas) memotong aksi yang lebih besar
     """
+    base = int(round(fuzzy_value))
+    actions = set([
+        max(0, base - 50),
+        base,
+        base + 50
+    ])
+    if cap is not None:
+        actions = {int(min(a, cap)) for a in actions}
+    return sorted(actions)
 
-    T = len(demand)
 
-    # Action space dibatasi oleh fuzzy output
-    def action_space(fuzzy_value):
-        base = int(round(fuzzy_value))
-        return sorted(set([
-            max(0, base - 50),
-            base,
-            base + 50
-        ]))
+def _period_cap(import_cap, t):
+    return None if import_cap is None else import_cap[t]
+
+
+def _backward_loop(
+    demand, fuzzy_import, holding_cost, import_cost, max_stock, progress=None, terminal=None, import_cap=None
+):
+    T = len(demand)
 
     V = np.zeros((T + 1, max_stock + 1))
     policy = np.zeros((T, max_stock + 1))
+    if terminal is not None:
+        V[T] = terminal
 
-    # ===============================
-    # BACKWARD DP
-    # ===============================
     for t in reversed(range(T)):
         for s in range(max_stock + 1):
             best_cost = np.inf
             best_action = 0
 
-            for a in action_space(fuzzy_import[t]):
+            for a in action_space(fuzzy_import[t], _period_cap(import_cap, t)):
                 new_stock = s + a - demand[t]
 
                 if new_stock < 0:
@@ -58,34 +66,221 @@ def dp_deterministic_horizon(
             V[t, s] = best_cost
             policy[t, s] = best_action
 
-    # ===============================
-    # FORWARD SIMULATION
-    # ===============================
+        if progress is not None:
+            progress(T - t, T)
+
+    return V, policy
+
+
+def _backward_numpy(
+    demand, fuzzy_import, holding_cost, import_cost, max_stock, dtype, progress=None, terminal=None, import_cap=None
+):
+    """
+    Same recursion as _backward_loop with all stock levels of a period at
+    once; ties keep the first (smallest) action like the loop's strict '<'
+    """
+    T = len(demand)
+    states = np.arange(max_stock + 1)
+
+    V = np.zeros((T + 1, max_stock + 1), dtype=dtype)
+    policy = np.zeros((T, max_stock + 1), dtype=np.int64)
+    if terminal is not None:
+        V[T] = terminal
+
+    for t in reversed(range(T)):
+        best_cost = np.full(max_stock + 1, np.inf, dtype=dtype)
+        best_action = np.zeros(max_stock + 1, dtype=np.int64)
+
+        for a in action_space(fuzzy_import[t], _period_cap(import_cap, t)):
+            new_stock = states + (a - demand[t])
+            feasible = new_stock >= 0
+            new_stock = np.minimum(max_stock, np.maximum(new_stock, 0))
+
+            cost = (import_cost * a + holding_cost * new_stock).astype(dtype, copy=False)
+            total_cost = np.where(feasible, cost + V[t + 1, new_stock], np.inf)
+
+            better = total_cost < best_cost
+            best_cost[better] = total_cost[better]
+            best_action[better] = a
+
+        V[t] = best_cost
+        policy[t] = best_action
+
+        if progress is not None:
+            progress(T - t, T)
+
+    return V, policy
+
+
+def solve_value_function(
+    demand,
+    fuzzy_import,
+    holding_cost,
+    import_cost,
+    max_stock,
+    progress=None,
+    backend="numpy",
+    precision=None,
+    terminal=None,
+    import_cap=None
+):
+    """
+    Backward pass only -> (V, policy), both (T[+1]) × (max_stock + 1)
+
+    terminal: cost of each ending stock level (V[T]); default zero
+    import_cap: largest import per period (array, inf = no cap); default none
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend DP tidak dikenal: {backend}")
+
+    T = len(demand)
+    with span("dp.backward", cells=T * (max_stock + 1), backend=backend):
+        if backend == "loop":
+            return _backward_loop(
+                demand, fuzzy_import, holding_cost, import_cost, max_stock, progress, terminal, import_cap
+            )
+        return _backward_numpy(
+            np.asarray(demand),
+            fuzzy_import,
+            holding_cost,
+            import_cost,
+            max_stock,
+            resolve_dtype(precision),
+            progress,
+            terminal,
+            import_cap
+        )
+
+
+def forward_simulation(policy, demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock):
+    """
+    Follow the policy from initial_stock -> per-period result frame
+    """
+    T = len(demand)
     stock = initial_stock
     results = []
 
-    for t in range(T):
-        action = int(policy[t, stock])
-        new_stock = min(max_stock, stock + action - demand[t])
+    with span("dp.forward", cells=T):
+        for t in range(T):
+            action = int(policy[t, stock])
+            new_stock = min(max_stock, stock + action - demand[t])
+
+            holding_c = holding_cost * new_stock
+            import_c = import_cost * action
+            total_c = holding_c + import_c
+
+            results.append({
+                "Month": t + 1,
+                "Demand": demand[t],
+                "Impor_Fuzzy": round(float(fuzzy_import[t]), 2),
+                "Impor_Optimal": action,
+                "Stok_Awal": stock,
+                "Stok_Akhir": new_stock,
+                "Holding_Cost": holding_c,
+                "Import_Cost": import_c,
+                "Total_Cost": total_c
+            })
 
-        holding_c = holding_cost * new_stock
-        import_c = import_cost * action
-        total_c = holding_c + import_c
+            stock = new_stock
+
+    return pd.DataFrame(results)
+
+
+def dp_deterministic_horizon(
+    demand,
+    fuzzy_import,
+    holding_cost,
+    import_cost,
+    max_stock,
+    initial_stock,
+    progress=None,
+    backend="numpy",
+    precision=None,
+    fallback=True,
+    import_cap=None,
+    solve=None
+):
+    """
+    Deterministic finite-horizon Dynamic Programming
+    Horizon: len(demand)
+
+    progress(done, total) dipanggil setiap periode backward pass selesai
+
+    precision=None memakai presisi global (modules.precision). Dalam
+    float32 biaya rencana dihitung ulang dalam float64; bila selisihnya
+    dengan V melebihi COST_RTOL, DP diulang dalam float64 (fallback).
+
+    import_cap: largest import per period (see solve_value_function)
+    solve: backward pass with solve_value_function's signature, e.g. the
+    cached modules.what_if.get_policy_cache().solve
+    """
+    dtype = np.float64 if backend == "loop" else resolve_dtype(precision)
+
+    V, policy = (solve or solve_value_function)(
+        demand, fuzzy_import, holding_cost, import_cost, max_stock,
+        progress=progress, backend=backend, precision=np.dtype(dtype).name, import_cap=import_cap
+    )
+    df_result = forward_simulation(
+        policy, demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock
+    )
+    optimal_cost = float(V[0, initial_stock])
+
+    if dtype != np.float64 and np.isfinite(optimal_cost):
+        plan_cost = float(df_result["Total_Cost"].sum())
+        if abs(plan_cost - optimal_cost) > COST_RTOL * max(1.0, abs(plan_cost)):
+            count("precision.dp_fallback")
+            if fallback:
+                return dp_deterministic_horizon(
+                    demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock,
+                    progress=progress, backend=backend, precision="float64", import_cap=import_cap, solve=solve
+                )
+        optimal_cost = plan_cost
+
+    return df_result, optimal_cost
+
+
+# ======================================================
+# POLICY ROLLOUTS (MONTE CARLO DEMAND PATHS)
+# ======================================================
+def rollout_policy(
+    policy,
+    demand_paths,
+    initial_stock,
+    max_stock,
+    holding_cost,
+    import_cost,
+    precision=None
+):
+    """
+    Apply a DP policy to many demand paths at once (paths × T). Unmet
+    demand is lost (stock floors at 0) and counted as shortage.
+
+    Returns {"total_cost", "shortage"} per path and "ending_stock"
+    (paths × T); costs are accumulated in the chosen precision.
+    """
+    dtype = resolve_dtype(precision)
+    demand_paths = np.atleast_2d(demand_paths)
+    paths, T = demand_paths.shape
 
-        results.append({
-            "Month": t + 1,
-            "Demand": demand[t],
-            "Impor_Fuzzy": round(float(fuzzy_import[t]), 2),
-            "Impor_Optimal": action,
-            "Stok_Awal": stock,
-            "Stok_Akhir": new_stock,
-            "Holding_Cost": holding_c,
-            "Import_Cost": import_c,
-            "Total_Cost": total_c
-        })
+    stock = np.broadcast_to(np.asarray(initial_stock, dtype=np.int64), (paths,)).copy()
+    ending_stock = np.empty((paths, T), dtype=np.int32)
+    total_cost = np.zeros(paths, dtype=dtype)
+    shortage = np.zeros(paths, dtype=np.int64)
+    holding_cost = dtype(holding_cost)
+    import_cost = dtype(import_cost)
 
-        stock = new_stock
+    with span("dp.rollout", cells=paths * T):
+        for t in range(T):
+            action = policy[t, stock].astype(np.int64)
+            level = stock + action - demand_paths[:, t]
+            shortage += np.maximum(-level, 0)
+            stock = np.clip(level, 0, max_stock)
 
-    df_result = pd.DataFrame(results)
+            total_cost += import_cost * action.astype(dtype) + holding_cost * stock.astype(dtype)
+            ending_stock[:, t] = stock
 
-    return df_result, V[0, initial_stock]
+    return {
+        "total_cost": total_cost,
+        "shortage": shortage,
+        "ending_stock": ending_stock
+    }
@@ -1,6 +1,23 @@
+import numpy as np
 import pandas as pd
 from io import BytesIO
-from openpyxl.utils import get_column_letter
+
+from modules.instrumentation import instrumented
+from modules.lazy_import import lazy_import
+
+openpyxl = lazy_import("openpyxl")
+openpyxl_utils = lazy_import("openpyxl.utils")
+
+# Sheet dengan jumlah baris di atas ambang ini ditulis secara streaming
+STREAMING_ROW_THRESHOLD = 50_000
+
+# Jumlah baris yang dikonversi & ditulis per batch pada mode streaming
+STREAMING_CHUNK_ROWS = 10_000
+
+# Jumlah sampel baris untuk estimasi lebar kolom teks
+WIDTH_SAMPLE_ROWS = 1_000
+
+MAX_COLUMN_WIDTH = 60
 
 
 def _auto_adjust_column_width(worksheet, df):
@@ -12,14 +29,134 @@ def _auto_adjust_column_width(worksheet, df):
             df[col].astype(str).map(len).max(),
             len(col)
         ) + 2
-        worksheet.column_dimensions[get_column_letter(idx)].width = max_length
+        worksheet.column_dimensions[openpyxl_utils.get_column_letter(idx)].width = max_length
+
+
+def _estimate_column_width(series, sample_rows=WIDTH_SAMPLE_ROWS):
+    """
+    Estimate column width without formatting every cell.
+
+    Numeric columns are measured from their min/max only, datetime-like
+    columns have a fixed width, other columns are measured on a sample.
+    """
+    name_length = len(str(series.name))
+
+    if series.empty:
+        return name_length + 2
+
+    if pd.api.types.is_bool_dtype(series):
+        value_length = 5
+    elif pd.api.types.is_numeric_dtype(series):
+        values = series.dropna()
+        if values.empty:
+            value_length = 0
+        else:
+            value_length = max(len(str(values.min())), len(str(values.max())))
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        value_length = 19
+    else:
+        if len(series) > sample_rows:
+            series = series.sample(sample_rows, random_state=0)
+        value_length = series.astype(str).map(len).max()
 
+    return min(max(value_length, name_length) + 2, MAX_COLUMN_WIDTH)
 
-def export_single_sheet(df, sheet_name="Sheet1"):
+
+def widen_float32(values):
+    """
+    float32 -> float64 through the shortest decimal repr, so a compact
+    244.2 is written as 244.2 and not 244.1999969482422
+    """
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        return values
+    return values.astype(str).astype(np.float64)
+
+
+def _widen_float32_columns(df):
+    columns = [col for col in df.columns if df[col].dtype == np.float32]
+    if not columns:
+        return df
+    return df.assign(**{col: widen_float32(df[col].to_numpy()) for col in columns})
+
+
+def _column_to_cells(series):
+    """
+    Convert a column slice to plain Python values accepted by openpyxl
+    """
+    if isinstance(series.dtype, pd.PeriodDtype):
+        series = series.astype(str)
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.tz_localize(None) if series.dt.tz is not None else series
+        return [None if pd.isna(v) else v.to_pydatetime() for v in series]
+
+    if pd.api.types.is_float_dtype(series):
+        values = widen_float32(series.to_numpy())
+        return [None if np.isnan(v) else v for v in values.tolist()]
+
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.tolist()
+
+    return [
+        None if v is None or (isinstance(v, float) and np.isnan(v)) else v
+        for v in series.astype(object).tolist()
+    ]
+
+
+def _write_sheet_streaming(workbook, sheet_name, df, chunk_rows=STREAMING_CHUNK_ROWS):
+    """
+    Write one DataFrame into a write-only worksheet, chunk by chunk
+    """
+    worksheet = workbook.create_sheet(title=sheet_name)
+
+    # Lebar kolom harus diset sebelum baris pertama ditulis (write-only)
+    for idx, col in enumerate(df.columns, start=1):
+        worksheet.column_dimensions[openpyxl_utils.get_column_letter(idx)].width = (
+            _estimate_column_width(df[col])
+        )
+
+    worksheet.append([str(col) for col in df.columns])
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = [_column_to_cells(chunk[col]) for col in chunk.columns]
+
+        for row in zip(*columns):
+            worksheet.append(row)
+
+
+def _export_streaming(dfs: dict):
+    output = BytesIO()
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name, df in dfs.items():
+        _write_sheet_streaming(workbook, sheet_name, df)
+
+    workbook.save(output)
+    workbook.close()
+
+    output.seek(0)
+    return output
+
+
+def _use_streaming(dfs: dict, streaming):
+    if streaming is None:
+        return any(len(df) > STREAMING_ROW_THRESHOLD for df in dfs.values())
+    return streaming
+
+
+@instrumented("export.excel", units=lambda df, *args, **kwargs: {"rows": len(df)})
+def export_single_sheet(df, sheet_name="Sheet1", streaming=None):
     """
     Export satu DataFrame ke Excel (1 sheet)
+
+    streaming=None memilih mode write-only otomatis untuk sheet besar
     """
+    if _use_streaming({sheet_name: df}, streaming):
+        return _export_streaming({sheet_name: df})
+
     output = BytesIO()
+    df = _widen_float32_columns(df)
 
     with pd.ExcelWriter(output, engine="openpyxl") as writer:
         df.to_excel(
@@ -35,7 +172,11 @@ def export_single_sheet(df, sheet_name="Sheet1"):
     return output
 
 
-def export_multi_sheet(dfs: dict):
+@instrumented(
+    "export.excel",
+    units=lambda dfs, *args, **kwargs: {"rows": sum(len(df) for df in dfs.values())}
+)
+def export_multi_sheet(dfs: dict, streaming=None):
     """
     Export beberapa DataFrame ke Excel (multi sheet)
 
@@ -44,11 +185,18 @@ def export_multi_sheet(dfs: dict):
         'Sheet2': df2,
         ...
     }
+
+    streaming=None memilih mode write-only otomatis bila ada sheet
+    dengan baris > STREAMING_ROW_THRESHOLD; True/False memaksa mode.
     """
+    if _use_streaming(dfs, streaming):
+        return _export_streaming(dfs)
+
     output = BytesIO()
 
     with pd.ExcelWriter(output, engine="openpyxl") as writer:
         for sheet_name, df in dfs.items():
+            df = _widen_float32_columns(df)
             df.to_excel(
                 writer,
                 index=False,
@@ -1,36 +1,77 @@
-from fpdf import FPDF
+import hashlib
+import os
+import tempfile
+import zlib
+from functools import lru_cache
 from io import BytesIO
 from datetime import datetime
 
+from modules.lazy_import import lazy_import
 
-class PDFReport(FPDF):
-    def header(self):
-        self.set_font("Arial", "B", 12)
-        self.cell(
-            0, 10,
-            "Laporan Sistem Pendukung Keputusan Impor",
-            ln=True,
-            align="C"
-        )
-        self.ln(5)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", "I", 8)
-        self.cell(
-            0, 10,
-            f"Halaman {self.page_no()}",
-            align="C"
-        )
+fpdf = lazy_import("fpdf")
+Image = lazy_import("PIL.Image")
+
+REPORT_HEADER = "Laporan Sistem Pendukung Keputusan Impor"
+
+
+def _fpdf_accepts_stream():
+    # fpdf2 menerima file-like untuk gambar, PyFPDF 1.7 hanya path file
+    return int(fpdf.FPDF_VERSION.split(".")[0]) >= 2
+
+
+def _embed_png(pdf, png_bytes, w=0):
+    """
+    Place PNG bytes (e.g. from the figure cache) at the current position
+    """
+    if _fpdf_accepts_stream():
+        pdf.image(BytesIO(png_bytes), x=pdf.l_margin, w=w)
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".png")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(png_bytes)
+        pdf.image(path, x=pdf.l_margin, w=w, type="PNG")
+    finally:
+        os.remove(path)
+
+
+@lru_cache(maxsize=None)
+def _pdf_report_class():
+    """
+    PDFReport is defined on first use so fpdf is only imported for exports
+    """
+    class PDFReport(fpdf.FPDF):
+        def header(self):
+            self.set_font("Arial", "B", 12)
+            self.cell(
+                0, 10,
+                REPORT_HEADER,
+                ln=True,
+                align="C"
+            )
+            self.ln(5)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font("Arial", "I", 8)
+            self.cell(
+                0, 10,
+                f"Halaman {self.page_no()}",
+                align="C"
+            )
+
+    return PDFReport
 
 
 def export_summary_pdf(
     title: str,
     metrics: dict,
     conclusion: str,
-    method_summary: str = None
+    method_summary: str = None,
+    charts: dict = None
 ):
-    pdf = PDFReport()
+    pdf = _pdf_report_class()()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
 
@@ -106,6 +147,20 @@ def export_summary_pdf(
     pdf.set_font("Arial", "", 11)
     pdf.multi_cell(0, 7, conclusion)
 
+    # =========================
+    # LAMPIRAN GRAFIK
+    # =========================
+    if charts:
+        pdf.add_page()
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 8, "5. Lampiran Grafik", ln=True)
+
+        for caption, png_bytes in charts.items():
+            pdf.set_font("Arial", "I", 10)
+            pdf.cell(0, 7, caption, ln=True)
+            _embed_png(pdf, png_bytes, w=pdf.w - pdf.l_margin - pdf.r_margin)
+            pdf.ln(4)
+
     # =========================
     # EXPORT KE BYTES
     # =========================
@@ -119,3 +174,331 @@ def export_summary_pdf(
 
     buffer.seek(0)
     return buffer
+
+
+# ======================================================
+# STREAMING MULTI-PAGE REPORT (REPORT PACK)
+# ======================================================
+# A4 dalam point (1/72 inci)
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+PAGE_MARGIN = 42
+
+# Font standar PDF (tanpa embedding) -> (nama resource, BaseFont)
+FONTS = {
+    "regular": ("F1", "Helvetica"),
+    "bold": ("F2", "Helvetica-Bold"),
+    "italic": ("F3", "Helvetica-Oblique")
+}
+
+# Lebar glyph Helvetica (1/1000 em) untuk ASCII 32..126
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+
+# Helvetica-Bold rata-rata sedikit lebih lebar
+_BOLD_FACTOR = 1.06
+
+
+def text_width(text, size, style="regular"):
+    units = sum(
+        _HELVETICA_WIDTHS[ord(c) - 32] if 32 <= ord(c) <= 126 else 556
+        for c in str(text)
+    )
+    return units * size / 1000 * (_BOLD_FACTOR if style == "bold" else 1.0)
+
+
+def _pdf_string(text):
+    data = str(text).encode("cp1252", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class StreamingPDF:
+    """
+    Minimal PDF writer for long reports: every finished page (and every
+    image, once) is written to the file object immediately, so memory
+    holds one page plus the object offsets, not the whole document.
+
+    Layout is top-down from a cursor `y` with automatic page breaks,
+    header and page-number footer like PDFReport.
+    """
+
+    def __init__(self, fileobj, header=REPORT_HEADER):
+        self.header = header
+        self.y = 0.0
+        self._file = fileobj
+        self._pos = 0
+        self._offsets = {}
+        self._page_ids = []
+        self._images = {}
+        self._ops = None
+        self._page_images = set()
+
+        # 1 = catalog, 2 = page tree, lalu font
+        self._fonts = {alias: 3 + i for i, (alias, _) in enumerate(FONTS.values())}
+        self._next_id = 3 + len(FONTS)
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for alias, base in FONTS.values():
+            self._object(
+                self._fonts[alias],
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>"
+            )
+
+    @property
+    def content_width(self):
+        return PAGE_WIDTH - 2 * PAGE_MARGIN
+
+    @property
+    def pages(self):
+        return len(self._page_ids) + (self._ops is not None)
+
+    # --------------------------------------------------
+    # LOW-LEVEL OUTPUT
+    # --------------------------------------------------
+    def _write(self, data):
+        self._file.write(data)
+        self._pos += len(data)
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _object(self, obj_id, dictionary, stream=None):
+        self._offsets[obj_id] = self._pos
+        if stream is None:
+            self._write(f"{obj_id} 0 obj\n{dictionary}\nendobj\n".encode("latin-1"))
+            return
+        self._write(f"{obj_id} 0 obj\n<< {dictionary} /Length {len(stream)} >>\nstream\n".encode("latin-1"))
+        self._write(stream)
+        self._write(b"\nendstream\nendobj\n")
+
+    # --------------------------------------------------
+    # PAGES
+    # --------------------------------------------------
+    def add_page(self):
+        if self._ops is not None:
+            self._finish_page()
+        self._ops = []
+        self._page_images = set()
+
+        self.y = PAGE_MARGIN - 12
+        self.text(self.header, size=12, style="bold", align="C")
+        self.y += 8
+
+    def _finish_page(self):
+        page_no = len(self._page_ids) + 1
+        self.y = PAGE_HEIGHT - PAGE_MARGIN + 10
+        self.text(f"Halaman {page_no}", size=8, style="italic", align="C")
+
+        content_id, page_id = self._new_id(), self._new_id()
+        self._object(content_id, "/Filter /FlateDecode", zlib.compress(b"\n".join(self._ops)))
+
+        fonts = " ".join(f"/{alias} {obj} 0 R" for alias, obj in self._fonts.items())
+        images = " ".join(f"/Im{obj} {obj} 0 R" for obj in sorted(self._page_images))
+        self._object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> /XObject << {images} >> >> /Contents {content_id} 0 R >>"
+        )
+        self._page_ids.append(page_id)
+        self._ops = None
+
+    def ensure_space(self, height):
+        if self._ops is None or self.y + height > PAGE_HEIGHT - PAGE_MARGIN - 8:
+            self.add_page()
+
+    # --------------------------------------------------
+    # CONTENT
+    # --------------------------------------------------
+    def text(self, text, x=None, size=10, style="regular", align="L", width=None):
+        """
+        One line of text at the cursor (no line advance); align L/C/R
+        within [x, x + width]
+        """
+        x = PAGE_MARGIN if x is None else x
+        width = self.content_width if width is None else width
+        if align != "L":
+            slack = width - text_width(text, size, style)
+            x += slack / 2 if align == "C" else slack
+
+        font = FONTS[style][0]
+        baseline = PAGE_HEIGHT - self.y - size
+        self._ops.append(
+            f"BT /{font} {size} Tf {x:.2f} {baseline:.2f} Td ".encode("latin-1") +
+            _pdf_string(text) + b" Tj ET"
+        )
+
+    def heading(self, text, size=13):
+        self.ensure_space(size + 30)
+        self.text(text, size=size, style="bold")
+        self.y += size + 8
+
+    def paragraph(self, text, size=10, style="regular"):
+        line_height = size * 1.45
+        line = ""
+        for word in str(text).split():
+            candidate = f"{line} {word}".strip()
+            if line and text_width(candidate, size, style) > self.content_width:
+                self.ensure_space(line_height)
+                self.text(line, size=size, style=style)
+                self.y += line_height
+                candidate = word
+            line = candidate
+        if line:
+            self.ensure_space(line_height)
+            self.text(line, size=size, style=style)
+            self.y += line_height
+        self.y += 4
+
+    def rule(self, gray=0.75):
+        y = PAGE_HEIGHT - self.y
+        self._ops.append(
+            f"{gray} G 0.5 w {PAGE_MARGIN:.2f} {y:.2f} m {PAGE_WIDTH - PAGE_MARGIN:.2f} {y:.2f} l S".encode("latin-1")
+        )
+
+    def table(self, columns, rows, widths=None, size=9):
+        """
+        Simple grid: bold header (repeated after page breaks), first
+        column left-aligned, the others right-aligned
+        """
+        widths = widths or [self.content_width / len(columns)] * len(columns)
+        row_height = size + 6
+
+        def header():
+            self.ensure_space(2 * row_height)
+            self._row(columns, widths, size, "bold")
+            self.y += row_height - 3
+            self.rule()
+            self.y += 3
+
+        header()
+        for row in rows:
+            if self.y + row_height > PAGE_HEIGHT - PAGE_MARGIN - 8:
+                self.add_page()
+                header()
+            self._row(row, widths, size, "regular")
+            self.y += row_height
+        self.y += 6
+
+    def _row(self, cells, widths, size, style):
+        x = PAGE_MARGIN
+        for i, (cell, width) in enumerate(zip(cells, widths)):
+            self.text(cell, x=x + 2, size=size, style=style, align="L" if i == 0 else "R", width=width - 4)
+            x += width
+
+    def image(self, png_bytes, caption=None, width=None):
+        """
+        Embed PNG bytes scaled to width (default: full content width),
+        centred.
+        Identical images are written to the file once and reused.
+        """
+        obj, px_w, px_h = self._register_image(png_bytes)
+        width = width or self.content_width
+        height = width * px_h / px_w
+
+        self.ensure_space(height + (16 if caption else 0))
+        if caption:
+            self.text(caption, size=9, style="italic")
+            self.y += 14
+
+        left = PAGE_MARGIN + (self.content_width - width) / 2
+        bottom = PAGE_HEIGHT - self.y - height
+        self._ops.append(
+            f"q {width:.2f} 0 0 {height:.2f} {left:.2f} {bottom:.2f} cm /Im{obj} Do Q".encode("latin-1")
+        )
+        self._page_images.add(obj)
+        self.y += height + 10
+
+    def _register_image(self, png_bytes):
+        digest = hashlib.sha1(png_bytes).hexdigest()
+        if digest not in self._images:
+            with Image.open(BytesIO(png_bytes)) as img:
+                rgb = img.convert("RGB")
+            obj = self._new_id()
+            self._object(
+                obj,
+                f"/Type /XObject /Subtype /Image /Width {rgb.width} /Height {rgb.height} "
+                "/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode",
+                zlib.compress(rgb.tobytes(), 6)
+            )
+            self._images[digest] = (obj, rgb.width, rgb.height)
+        return self._images[digest]
+
+    # --------------------------------------------------
+    # DOCUMENT END
+    # --------------------------------------------------
+    def close(self, title=None):
+        """
+        Write the page tree, catalog and cross-reference table
+        """
+        if self._ops is not None:
+            self._finish_page()
+
+        kids = " ".join(f"{page} 0 R" for page in self._page_ids)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>")
+        self._object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        info_id = self._new_id()
+        created = datetime.now().strftime("%Y%m%d%H%M%S")
+        self._offsets[info_id] = self._pos
+        self._write(f"{info_id} 0 obj\n<< /CreationDate (D:{created})".encode("latin-1"))
+        if title:
+            self._write(b" /Title " + _pdf_string(title))
+        self._write(b" >>\nendobj\n")
+
+        xref = self._pos
+        size = self._next_id
+        entries = [b"0000000000 65535 f \n"] + [
+            f"{self._offsets[i]:010d} 00000 n \n".encode("latin-1") if i in self._offsets
+            else b"0000000000 65535 f \n"
+            for i in range(1, size)
+        ]
+        self._write(f"xref\n0 {size}\n".encode("latin-1") + b"".join(entries))
+        self._write(
+            f"trailer\n<< /Size {size} /Root 1 0 R /Info {info_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+        )
+
+
+def export_report_pack(output, title, summary, scenarios, progress=None):
+    """
+    Multi-scenario report streamed into `output` (binary file object).
+
+    summary: DataFrame of formatted cells (one row per scenario) for the
+    overview table. scenarios: iterable of dicts with "title",
+    "parameters" and "kpis" ({label: text}) and "charts"
+    ({caption: png bytes}); it is consumed one scenario at a time, so a
+    generator keeps only the current scenario's charts in memory.
+    """
+    pdf = StreamingPDF(output)
+    pdf.add_page()
+
+    pdf.heading(title, size=15)
+    pdf.paragraph(
+        f"Tanggal Laporan: {datetime.now().strftime('%d %B %Y')} - "
+        f"{len(summary)} skenario dari riwayat run DP."
+    )
+    pdf.heading("Ringkasan Skenario", size=12)
+    pdf.table(list(summary.columns), summary.astype(str).values.tolist(), size=8)
+
+    for i, scenario in enumerate(scenarios, start=1):
+        pdf.add_page()
+        pdf.heading(scenario["title"])
+
+        pdf.table(["Parameter", "Nilai"], list(scenario["parameters"].items()))
+        pdf.table(["KPI", "Nilai"], list(scenario["kpis"].items()))
+
+        # Dua grafik + tabel muat dalam satu halaman A4
+        for caption, png in scenario["charts"].items():
+            pdf.image(png, caption=caption, width=0.85 * pdf.content_width)
+
+        if progress is not None:
+            progress(i, len(summary))
+
+    pdf.close(title=title)
+    return pdf.pages
@@ -0,0 +1,167 @@
+import os
+from datetime import datetime
+from io import BytesIO
+
+import streamlit as st
+
+import numpy as np
+import pandas as pd
+
+from modules.artifact_store import ArtifactStore, content_key
+from modules.downsample import time_axis, window
+from modules.instrumentation import count, span
+from modules.lazy_import import lazy_import
+
+matplotlib = lazy_import("matplotlib")
+plt = lazy_import("matplotlib.pyplot")
+
+# Gambar bersifat content-addressed sehingga bisa dipakai lintas sesi
+FIGURE_BUDGET_BYTES = 64 * 1024 * 1024
+
+FIGURE_SESSION = "__figures__"
+
+# Slider zoom hanya untuk seri yang lebih panjang dari ini
+ZOOM_MIN_POINTS = 120
+
+# Di bawah jumlah ini pre-render serial lebih cepat dari start proses
+PARALLEL_MIN_FIGURES = 8
+
+IMAGE_MIME = {
+    "png": "image/png",
+    "svg": "image/svg+xml"
+}
+
+_FIGURE_STORE = ArtifactStore(budget_bytes=FIGURE_BUDGET_BYTES)
+
+
+def get_figure_store():
+    return _FIGURE_STORE
+
+
+def figure_to_bytes(fig, fmt="png", dpi=100):
+    """
+    Serialize a matplotlib figure and close it
+    """
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def _figure_key(builder, args, kwargs, key, fmt, dpi):
+    builder_name = f"{builder.__module__}.{builder.__qualname__}"
+    parts = (args, kwargs) if key is None else key
+    return builder_name, content_key(builder_name, parts, fmt, dpi, matplotlib.__version__)
+
+
+def render_figure(builder, *args, key=None, fmt="png", dpi=100, **kwargs):
+    """
+    Render builder(*args, **kwargs) -> Figure to PNG/SVG bytes, cached.
+
+    The cache key is a hash of the builder name, its arguments and the
+    output format. Pass key=... when the arguments cannot be hashed by
+    content (e.g. a fuzzy ControlSystem object).
+    """
+    builder_name, figure_key = _figure_key(builder, args, kwargs, key, fmt, dpi)
+
+    def render():
+        count("figure.cache_miss")
+        with span(f"figure.{builder.__qualname__}") as s:
+            data = figure_to_bytes(builder(*args, **kwargs), fmt=fmt, dpi=dpi)
+            s.set(bytes=len(data))
+        return data
+
+    count("figure.requests")
+    return _FIGURE_STORE.get_or_create(
+        FIGURE_SESSION,
+        builder_name,
+        figure_key,
+        render,
+        replace=False
+    )
+
+
+def _render_uncached(builder, args, kwargs, fmt, dpi):
+    # Dijalankan di proses worker (pyplot tidak thread-safe)
+    return figure_to_bytes(builder(*args, **kwargs), fmt=fmt, dpi=dpi)
+
+
+def prerender_figures(requests, workers=None, fmt="png", dpi=100, progress=None):
+    """
+    Fill the cache for many (builder, args, kwargs) figures before they
+    are needed; the missing ones are rendered in parallel worker
+    processes. Builders must be module-level functions. Returns the
+    number of figures that were rendered.
+    """
+    missing = []
+    for builder, args, kwargs in requests:
+        builder_name, figure_key = _figure_key(builder, args, kwargs, None, fmt, dpi)
+        count("figure.requests")
+        if _FIGURE_STORE.get(FIGURE_SESSION, builder_name, figure_key) is None:
+            missing.append((builder_name, figure_key, (builder, args, kwargs, fmt, dpi)))
+
+    workers = workers or os.cpu_count() or 1
+    with span("figure.prerender", figures=len(missing), workers=workers):
+        if workers > 1 and len(missing) >= PARALLEL_MIN_FIGURES:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render_uncached, *task) for _, _, task in missing]
+                rendered = ((item, future.result()) for item, future in zip(missing, futures))
+                _store_rendered(rendered, len(missing), progress)
+        else:
+            rendered = ((item, _render_uncached(*item[2])) for item in missing)
+            _store_rendered(rendered, len(missing), progress)
+
+    return len(missing)
+
+
+def _store_rendered(rendered, total, progress):
+    for i, ((builder_name, figure_key, _), data) in enumerate(rendered, start=1):
+        count("figure.cache_miss")
+        _FIGURE_STORE.put(FIGURE_SESSION, builder_name, figure_key, data, replace=False)
+        if progress is not None:
+            progress(i, total)
+
+
+def show_figure(builder, *args, key=None, dpi=100, **kwargs):
+    """
+    Streamlit replacement for st.pyplot(builder(...)) backed by the cache
+    """
+    png = render_figure(builder, *args, key=key, fmt="png", dpi=dpi, **kwargs)
+    st.image(png)
+    return png
+
+
+def show_time_series(builder, months, *series, zoom_key, dpi=100, **kwargs):
+    """
+    show_figure for builder(months, *series) with a zoom range slider.
+    Zooming slices the full-resolution series again, so the builder
+    (which downsamples) always draws at most screen resolution.
+    """
+    x = time_axis(months)
+
+    if len(x) > ZOOM_MIN_POINTS:
+        if np.issubdtype(x.dtype, np.datetime64):
+            bounds = (pd.Timestamp(x[0]).to_pydatetime(), pd.Timestamp(x[-1]).to_pydatetime())
+        else:
+            bounds = (x[0].item(), x[-1].item())
+
+        low, high = st.slider(
+            "Zoom",
+            min_value=bounds[0],
+            max_value=bounds[1],
+            value=bounds,
+            key=f"zoom_{zoom_key}"
+        )
+        if (low, high) != bounds:
+            if isinstance(low, datetime):
+                low, high = np.datetime64(low), np.datetime64(high)
+            rows = window(x, low, high)
+            months = np.asarray(months)[rows]
+            series = tuple(np.asarray(s)[rows] for s in series)
+
+    return show_figure(builder, months, *series, dpi=dpi, **kwargs)
+
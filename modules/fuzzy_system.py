@@ -1,51 +1,21 @@
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-
-def build_fuzzy_system():
-    market_demand = ctrl.Antecedent(np.arange(200, 401, 1), 'market_demand')
-    product_stock = ctrl.Antecedent(np.arange(100, 251, 1), 'product_stock')
-    production_capacity = ctrl.Antecedent(np.arange(0, 211, 1), 'production_capacity')
-    product_import = ctrl.Consequent(np.arange(30, 401, 1), 'product_import')
-
-    # Membership Functions
-    market_demand['Low'] = fuzz.trimf(market_demand.universe, [200, 200, 300])
-    market_demand['Medium'] = fuzz.trimf(market_demand.universe, [200, 300, 400])
-    market_demand['High'] = fuzz.trimf(market_demand.universe, [300, 400, 400])
-
-    product_stock['small'] = fuzz.trapmf(product_stock.universe, [75, 100, 130, 175])
-    product_stock['Moderate'] = fuzz.trimf(product_stock.universe, [130, 175, 220])
-    product_stock['Many'] = fuzz.trapmf(product_stock.universe, [175, 220, 250, 300])
-
-    production_capacity['Low'] = fuzz.trapmf(production_capacity.universe, [0, 0, 60, 100])
-    production_capacity['Medium'] = fuzz.trapmf(production_capacity.universe, [60, 100, 130, 170])
-    production_capacity['High'] = fuzz.trapmf(production_capacity.universe, [130, 170, 210, 210])
-
-    product_import['Low'] = fuzz.trapmf(product_import.universe, [30, 30, 90, 200])
-    product_import['Medium'] = fuzz.trapmf(product_import.universe, [90, 200, 250, 350])
-    product_import['High'] = fuzz.trapmf(product_import.universe, [250, 350, 400, 400])
-
-    # Rule base (27 rules)
-    rule_map = [
-        ('Low','Many','High','Low'), ('Low','Many','Medium','Low'), ('Low','Many','Low','Low'),
-        ('Low','Moderate','High','Low'), ('Low','Moderate','Medium','Low'), ('Low','Moderate','Low','Medium'),
-        ('Low','small','High','Low'), ('Low','small','Medium','Medium'), ('Low','small','Low','Medium'),
-        ('Medium','Many','High','Low'), ('Medium','Many','Medium','Medium'), ('Medium','Many','Low','Medium'),
-        ('Medium','Moderate','High','Medium'), ('Medium','Moderate','Medium','Medium'), ('Medium','Moderate','Low','High'),
-        ('Medium','small','High','Medium'), ('Medium','small','Medium','Medium'), ('Medium','small','Low','High'),
-        ('High','Many','High','Medium'), ('High','Many','Medium','Medium'), ('High','Many','Low','High'),
-        ('High','Moderate','High','Medium'), ('High','Moderate','Medium','Medium'), ('High','Moderate','Low','High'),
-        ('High','small','High','Medium'), ('High','small','Medium','High'), ('High','small','Low','High')
-    ]
-
-    rules = [
-        ctrl.Rule(market_demand[md] & product_stock[ps] & production_capacity[pc],
-                  product_import[pi])
-        for md, ps, pc, pi in rule_map
-    ]
-
-    system = ctrl.ControlSystem(rules)
-    return system, market_demand, product_stock, production_capacity, product_import
+
+from modules.instrumentation import instrumented
+from modules.lazy_import import lazy_import
+from modules.precision import resolve_dtype
+from modules.rule_base import DEFAULT_RULE_BASE, load_rule_base, rule_base_to_system
+
+ctrl = lazy_import("skfuzzy.control")
+
+def build_fuzzy_system(rule_base=None):
+    """
+    scikit-fuzzy ControlSystem of a rule base spec (default: the 27-rule
+    import controller in assets/rule_base_default.json)
+    -> (system, *input variables, output variable)
+    """
+    spec = load_rule_base(DEFAULT_RULE_BASE) if rule_base is None else rule_base
+    system, inputs, output = rule_base_to_system(spec)
+    return (system, *inputs, output)
 
 
 def predict_import(system, md, ps, pc):
@@ -55,3 +25,214 @@ def predict_import(system, md, ps, pc):
     sim.input['production_capacity'] = pc
     sim.compute()
     return sim.output['product_import']
+
+
+# ======================================================
+# VECTORIZED (BATCH) INFERENCE
+# ======================================================
+# Baris per potongan defuzzifikasi (batas memori array sementara)
+DEFUZZ_CHUNK_ROWS = 256
+
+def compile_fuzzy_tables(system):
+    """
+    Flatten a ControlSystem into arrays for predict_import_batch.
+
+    Only AND-rules with one consequent term are supported (the rule base
+    of build_fuzzy_system); rule base files compile directly with
+    modules.rule_base.compile_rule_base.
+    """
+    antecedents = list(system.antecedents)
+    consequent = list(system.consequents)[0]
+
+    inputs = []
+    term_index = {}
+    for var in antecedents:
+        labels = list(var.terms)
+        for j, label in enumerate(labels):
+            term_index[(var.label, label)] = j
+        inputs.append({
+            "label": var.label,
+            "universe": np.asarray(var.universe, dtype=float),
+            "mfs": np.array([var.terms[label].mf for label in labels], dtype=float)
+        })
+
+    output_labels = list(consequent.terms)
+    rule_terms = []
+    rule_outputs = []
+    for rule in system.rules:
+        if rule.and_func is not np.fmin or "or" in str(rule.antecedent).lower().split():
+            raise ValueError("Only AND rules are supported by the batch engine")
+        terms = {t.parent.label: term_index[(t.parent.label, t.label)] for t in rule.antecedent_terms}
+        rule_terms.append([terms.get(var["label"], -1) for var in inputs])
+        rule_outputs.append(output_labels.index(rule.consequent[0].term.label))
+
+    return {
+        "inputs": inputs,
+        "rule_terms": np.array(rule_terms, dtype=np.intp),
+        "rule_outputs": np.array(rule_outputs, dtype=np.intp),
+        "output_universe": np.asarray(consequent.universe, dtype=float),
+        "output_mfs": np.array([consequent.terms[label].mf for label in output_labels], dtype=float)
+    }
+
+
+def cast_fuzzy_tables(tables, dtype):
+    """
+    Copy of compiled tables with every float array in dtype (float32 mode)
+    """
+    if tables["output_mfs"].dtype == dtype:
+        return tables
+    return {
+        **tables,
+        "inputs": [
+            {**var, "universe": var["universe"].astype(dtype), "mfs": var["mfs"].astype(dtype)}
+            for var in tables["inputs"]
+        ],
+        "output_universe": tables["output_universe"].astype(dtype),
+        "output_mfs": tables["output_mfs"].astype(dtype)
+    }
+
+
+def _fuzzify(var, values):
+    """
+    Membership of every term for every value -> (n, terms); values are
+    clipped to the universe like ControlSystemSimulation(clip_to_bounds=True)
+    """
+    universe = var["universe"]
+    values = np.clip(values, universe[0], universe[-1])
+    # np.interp selalu menghasilkan float64 -> kembali ke dtype tabel
+    return np.stack(
+        [np.interp(values, universe, mf, left=0.0, right=0.0) for mf in var["mfs"]],
+        axis=1
+    ).astype(universe.dtype, copy=False)
+
+
+def fire_rules(tables, *values):
+    """
+    Output term activations (n, output terms) for n input rows.
+
+    rule_terms is a sparse rule tensor (one row of term indices per rule,
+    -1 = input not used), so the work is n × rules per input: gather the
+    memberships of each rule's term, AND them with fmin, then OR the
+    rules of every output term with one reduceat over rules grouped by
+    output term.
+    """
+    dtype = tables["output_mfs"].dtype
+    # Urutkan aturan per term output agar OR cukup satu reduceat
+    order = np.argsort(tables["rule_outputs"], kind="stable")
+    rule_terms = tables["rule_terms"][order]
+    rule_outputs = tables["rule_outputs"][order]
+
+    strength = None
+    for var, column, x in zip(tables["inputs"], rule_terms.T, values):
+        used = column >= 0
+        if not used.any():
+            continue
+        membership = _fuzzify(var, np.asarray(x, dtype=dtype))
+        if used.all():
+            gathered = membership[:, column]
+        else:
+            # Input tidak dipakai aturan -> keanggotaan 1 (netral untuk fmin)
+            gathered = np.ones((membership.shape[0], len(column)), dtype=dtype)
+            gathered[:, used] = membership[:, column[used]]
+        strength = gathered if strength is None else np.fmin(strength, gathered, out=strength)
+
+    terms, first = np.unique(rule_outputs, return_index=True)
+    cuts = np.zeros((strength.shape[0], len(tables["output_mfs"])), dtype=dtype)
+    cuts[:, terms] = np.maximum.reduceat(strength, first, axis=1)
+    return cuts
+
+
+def _defuzz_centroid(tables, cuts):
+    """
+    skfuzzy's centroid defuzzification (CrispValueCalculator) for many
+    rows of output term activations at once -> (n,)
+
+    skfuzzy inserts the points where each term crosses its cut level into
+    the output universe, clips and max-aggregates the terms there and
+    integrates the piecewise-linear result exactly. Here every row gets
+    the same universe plus its (padded) crossing points, so the whole
+    batch is one array computation.
+    """
+    universe = tables["output_universe"]
+    mfs = tables["output_mfs"]
+
+    x1, x2 = universe[:-1], universe[1:]
+    f1, f2 = mfs[:, :-1], mfs[:, 1:]
+    # Slope per titik universe (0 setelah titik terakhir)
+    slope = np.concatenate([(f2 - f1) / (x2 - x1), np.zeros((len(mfs), 1), dtype=mfs.dtype)], axis=1)
+
+    out = np.empty(len(cuts), dtype=mfs.dtype)
+    for start in range(0, len(cuts), DEFUZZ_CHUNK_ROWS):
+        cut = cuts[start:start + DEFUZZ_CHUNK_ROWS]
+        rows = len(cut)
+        level = cut[:, :, None]
+
+        # Titik potong tiap term pada level cut-nya (sama seperti
+        # _interp_universe_fast: '>' untuk cut nol, '>=' selain itu)
+        zero = level == 0
+        above1 = np.where(zero, f1 > level, f1 >= level)
+        above2 = np.where(zero, f2 > level, f2 >= level)
+        row, term, seg = np.nonzero(above1 != above2)
+        x_cut = x1[seg] + (cut[row, term] - f1[term, seg]) * (x2[seg] - x1[seg]) / (
+            f2[term, seg] - f1[term, seg]
+        )
+
+        # Universe + titik potong per baris; slot kosong diisi universe[0]
+        # (lebar nol, tidak menambah luas)
+        counts = np.bincount(row, minlength=rows)
+        extra = np.full((rows, counts.max(initial=0)), universe[0])
+        slot = np.arange(len(row)) - np.repeat(np.cumsum(counts) - counts, counts)
+        extra[row, slot] = x_cut
+
+        points = np.concatenate([np.broadcast_to(universe, (rows, len(universe))), extra], axis=1)
+        points.sort(axis=1)
+
+        # Keanggotaan tiap term di titik-titik itu, dipotong lalu max
+        j = np.searchsorted(universe, points, side="right") - 1
+        offset = points - universe[j]
+        y = np.zeros_like(points)
+        for k in range(len(mfs)):
+            term_mf = mfs[k, j] + offset * slope[k, j]
+            np.maximum(y, np.minimum(term_mf, cut[:, k:k + 1], out=term_mf), out=y)
+
+        # Luas dan momen tiap potongan linier (rumus skfuzzy.centroid)
+        px1, px2 = points[:, :-1], points[:, 1:]
+        y1, y2 = y[:, :-1], y[:, 1:]
+        width = px2 - px1
+        area = 0.5 * width * (y1 + y2)
+        height = np.where(y1 + y2 > 0, y1 + y2, 1.0)
+        moment = (2.0 / 3.0 * width * (y2 + 0.5 * y1)) / height + px1
+
+        out[start:start + rows] = (moment * area).sum(axis=1) / np.fmax(
+            area.sum(axis=1), np.finfo(mfs.dtype).eps
+        )
+
+    return out
+
+
+@instrumented("fuzzy.batch", units=lambda tables, first, *args, **kwargs: {"rows": np.size(first)})
+def predict_import_batch(tables, *inputs, precision=None):
+    """
+    Vectorized predict_import for arrays of inputs, one array per rule
+    input in table order (market demand, stock, capacity for the default
+    controller).
+
+    tables comes from compile_fuzzy_tables(system) or
+    compile_rule_base(spec). Fuzzification, rule
+    firing and defuzzification run on whole arrays; duplicate input rows
+    are computed once. Matches predict_import to floating-point rounding
+    in float64; precision="float32" (or the global setting) halves the
+    intermediate arrays.
+    """
+    dtype = resolve_dtype(precision)
+    tables = cast_fuzzy_tables(tables, dtype)
+    if len(inputs) != len(tables["inputs"]):
+        raise ValueError(f"Expected {len(tables['inputs'])} input arrays, got {len(inputs)}")
+    rows = np.column_stack([np.atleast_1d(np.asarray(x, dtype=dtype)) for x in inputs])
+    unique_rows, inverse = np.unique(rows, axis=0, return_inverse=True)
+
+    cuts = fire_rules(tables, *unique_rows.T)
+    if not (cuts > 0).any(axis=1).all():
+        raise ValueError("Crisp output cannot be calculated: no rule fired for some inputs")
+
+    return _defuzz_centroid(tables, cuts)[inverse.ravel()]
@@ -0,0 +1,388 @@
+import os
+import time
+from bisect import bisect_left, bisect_right
+from functools import partial
+
+import numpy as np
+
+from modules.dp_model import dp_deterministic_horizon, forward_simulation
+from modules.instrumentation import count, span
+
+# ======================================================
+# HIERARCHICAL PLANNING (AGGREGATE -> DISAGGREGATE)
+# ======================================================
+# Horizon panjang (mis. 5-10 tahun mingguan): DP kasar per blok periode
+# pada grid stok yang jarang menentukan target stok akhir blok, lalu tiap
+# blok diselesaikan sendiri (paralel) hanya pada koridor stok di sekitar
+# target-target itu, dengan nilai DP kasar sebagai biaya akhir.
+
+# Periode fine per blok untuk data mingguan
+BLOCK_SIZES = {
+    "month": 4,
+    "quarter": 13
+}
+
+# DP kasar: titik grid stok dan tingkat total impor per blok (maksimum)
+COARSE_STATES = 101
+COARSE_LEVELS = 27
+
+# Stok akhir blok dibatasi ke target +/- CORRIDOR
+CORRIDOR = 150
+
+# Di bawah max stock ini DP penuh lebih cepat (bench_hierarchical, 1 CPU):
+# lebar koridor tetap, biaya DP penuh naik dengan max stock
+MIN_MAX_STOCK = 1000
+
+# Di bawah jumlah periode ini blok diselesaikan serial (start-up proses
+# worker lebih mahal daripada semua blok)
+PARALLEL_MIN_PERIODS = 2000
+
+
+def pays_off(periods, max_stock, block):
+    """
+    Whether dp_hierarchical_horizon is expected to beat the full DP on
+    this problem size (at least two blocks and max_stock >= MIN_MAX_STOCK)
+    """
+    return periods >= 2 * block and max_stock >= MIN_MAX_STOCK
+
+
+def block_starts(T, block):
+    """
+    First period and length of every block of `block` periods
+    """
+    starts = np.arange(0, T, block)
+    return starts, np.diff(np.append(starts, T))
+
+
+def coarse_grid(max_stock, points=COARSE_STATES):
+    """
+    Stock levels of the coarse DP: at most `points` evenly spaced levels
+    from 0 to max_stock
+    """
+    step = max(1, -(-max_stock // (points - 1)))
+    return np.unique(np.append(np.arange(0, max_stock + 1, step), max_stock))
+
+
+def period_actions(fuzzy_import):
+    """
+    action_space of every period as a T × 3 array, smallest first (the
+    smallest repeats when it is clipped at zero)
+    """
+    base = np.round(np.asarray(fuzzy_import, dtype=float)).astype(np.int64)
+    return np.column_stack([np.maximum(0, base - 50), base, base + 50])
+
+
+def coarse_action_space(smallest, largest, levels=COARSE_LEVELS):
+    """
+    Block import totals of the coarse DP: every reachable total (steps of
+    50) from the smallest to the largest sum of the per-period actions,
+    thinned out evenly to at most `levels`
+    """
+    count = min(levels, (largest - smallest) // 50 + 1)
+    return smallest + (largest - smallest) * np.arange(count) // max(1, count - 1)
+
+
+def minimum_stock(demand, fuzzy_import):
+    """
+    Smallest stock at the start of every period (T + 1 levels) from
+    which the rest of the horizon can be met when the largest allowed
+    import is chosen each period
+    """
+    shortfall = (np.asarray(demand) - period_actions(fuzzy_import)[:, -1]).tolist()
+    need = np.zeros(len(shortfall) + 1, dtype=np.int64)
+    for t in reversed(range(len(shortfall))):
+        need[t] = max(0, shortfall[t] + need[t + 1])
+    return need
+
+
+def coarse_value(V_next, grid, stock, floor):
+    """
+    Coarse cost-to-go at any stock: linear between the finite grid
+    levels, infinite below floor (minimum_stock of that period)
+    """
+    finite = np.isfinite(V_next)
+    return np.where(stock < floor, np.inf, np.interp(stock, grid[finite], V_next[finite]))
+
+
+def solve_coarse(demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock, block):
+    """
+    DP over blocks of `block` periods on coarse_grid -> (V, grid, targets).
+
+    A block imports one of coarse_action_space in total, spread evenly
+    over its periods for the holding cost; V of the next block is read
+    with coarse_value. targets is the end-of-block stock along the
+    aggregate plan from initial_stock (import total of the nearest
+    feasible grid level at or below the stock), None when that plan is
+    infeasible.
+    """
+    demand = np.asarray(demand)
+    starts, lengths = block_starts(len(demand), block)
+    floors = minimum_stock(demand, fuzzy_import)[np.append(starts, len(demand))]
+    actions = period_actions(fuzzy_import)
+    smallest = np.add.reduceat(actions[:, 0], starts).tolist()
+    largest = np.add.reduceat(actions[:, -1], starts).tolist()
+    block_demand = np.add.reduceat(demand, starts).tolist()
+    # Jumlah demand kumulatif dalam blok (stok akhir tiap periode)
+    cumulative = [int(np.cumsum(demand[first:first + periods]).sum()) for first, periods in zip(starts, lengths)]
+    lengths, floors = lengths.tolist(), floors.tolist()
+
+    grid = coarse_grid(max_stock)
+    rows = np.arange(len(grid))
+    V = np.zeros((len(starts) + 1, len(grid)))
+    policy = np.zeros((len(starts), len(grid)), dtype=np.int64)
+
+    for k in reversed(range(len(starts))):
+        periods = lengths[k]
+        totals = coarse_action_space(smallest[k], largest[k])
+
+        end = np.minimum(max_stock, grid[:, None] + (totals - block_demand[k]))
+        holding = holding_cost * (periods * grid[:, None] + (periods + 1) / 2 * totals - cumulative[k])
+        total_cost = import_cost * totals + holding + coarse_value(V[k + 1], grid, end, floors[k + 1])
+        total_cost[grid < floors[k]] = np.inf
+
+        best = total_cost.argmin(axis=1)
+        V[k] = total_cost[rows, best]
+        policy[k] = totals[best]
+
+    targets = np.empty(len(starts), dtype=np.int64)
+    levels, finite = grid.tolist(), np.isfinite(V).tolist()
+    stock = initial_stock
+    for k in range(len(starts)):
+        index = max(bisect_right(levels, stock) - 1, bisect_left(levels, floors[k]))
+        if index == len(levels) or not finite[k][index]:
+            return V, grid, None
+        stock = targets[k] = min(max_stock, stock + int(policy[k, index]) - block_demand[k])
+    return V, grid, targets
+
+
+def stock_band(demand, fuzzy_import, max_stock, start, end=None):
+    """
+    Lowest and highest stock (T + 1 levels each) a plan of the block can
+    pass through when it starts within start = (low, high) and ends
+    within end = (low, high); end None leaves the end free
+    """
+    T = len(demand)
+    spaces = period_actions(fuzzy_import).tolist()
+    low = np.empty(T + 1, dtype=np.int64)
+    high = np.empty(T + 1, dtype=np.int64)
+    low[0], high[0] = start
+
+    for t in range(T):
+        low[t + 1] = min(max_stock, max(0, low[t] + spaces[t][0] - demand[t]))
+        high[t + 1] = min(max_stock, high[t] + spaces[t][-1] - demand[t])
+
+    if end is not None:
+        low[T] = max(low[T], end[0])
+        high[T] = min(high[T], end[1])
+        for t in reversed(range(T)):
+            low[t] = max(low[t], low[t + 1] - (spaces[t][-1] - demand[t]))
+            # Stok di atas max_stock terpotong: batas atas tak bisa dipersempit
+            if high[t + 1] < max_stock:
+                high[t] = min(high[t], high[t + 1] - (spaces[t][0] - demand[t]))
+    return low, high
+
+
+def solve_block(demand, fuzzy_import, holding_cost, import_cost, max_stock, start, end=None, terminal=None):
+    """
+    Backward pass of one block over its stock_band only -> (low, policy).
+
+    terminal(stocks): cost of ending at those stocks (default zero).
+    policy[t][s - low[t]] is the import at stock s in period t, -1 where
+    no plan reaches the block end (policy None: empty band).
+    """
+    low, high = stock_band(demand, fuzzy_import, max_stock, start, end)
+    if np.any(high < low):
+        return low[:-1], None
+
+    T = len(demand)
+    states = np.arange(low[T], high[T] + 1)
+    V = np.zeros(len(states)) if terminal is None else terminal(states)
+    spaces = period_actions(fuzzy_import)
+    policy = [None] * T
+
+    for t in reversed(range(T)):
+        actions = spaces[t]
+        new_stock = np.minimum(max_stock, np.arange(low[t], high[t] + 1)[:, None] + (actions - demand[t]))
+
+        # inf di kedua sisi pita: stok akhir di luar pita tak layak
+        padded = np.concatenate(([np.inf], V, [np.inf]))
+        index = np.minimum(len(padded) - 1, np.maximum(0, new_stock - (low[t + 1] - 1)))
+        total_cost = padded[index] + (holding_cost * new_stock + import_cost * actions)
+
+        # Seri dipecah ke aksi terkecil, seperti backward pass penuh
+        best = total_cost.argmin(axis=1)
+        V = total_cost[np.arange(len(best)), best]
+        policy[t] = np.where(V < np.inf, actions[best], -1)
+
+    return low[:-1], policy
+
+
+def _follow(low, policy, demand, max_stock, stock):
+    # Jalur satu blok dari stock -> [(stok, aksi)] per periode; None bila
+    # jalur keluar dari pita atau masuk stok tanpa rencana
+    path = []
+    for t in range(len(demand)):
+        index = stock - low[t]
+        if policy is None or not 0 <= index < len(policy[t]) or policy[t][index] < 0:
+            return None
+        path.append((stock, int(policy[t][index])))
+        stock = min(max_stock, stock + path[-1][1] - demand[t])
+    return path
+
+
+def _stitch(blocks, tasks, max_stock, initial_stock):
+    # Ikuti policy tiap blok dari initial_stock -> policy penuh di sepanjang
+    # jalur itu saja (None bila tak layak). Blok yang dimasuki pada stok
+    # tanpa rencana diselesaikan ulang dari stok sebenarnya, tanpa batas
+    # atas stok akhir (impor terkecil pun bisa melewati koridornya).
+    stock = initial_stock
+    path = []
+
+    for (low, policy), task in zip(blocks, tasks):
+        demand = task[0]
+        steps = _follow(low, policy, demand, max_stock, stock)
+        if steps is None:
+            count("dp.hierarchical_repair")
+            end, terminal = task[6:]
+            low, policy = solve_block(
+                *task[:5], (stock, stock), None if end is None else (end[0], max_stock), terminal
+            )
+            steps = _follow(low, policy, demand, max_stock, stock)
+            if steps is None:
+                return None
+        path.extend(steps)
+        stock = min(max_stock, steps[-1][0] + steps[-1][1] - demand[-1])
+
+    stocks, actions = np.array(path).T
+    full = np.zeros((len(path), max_stock + 1), dtype=np.int64)
+    full[np.arange(len(path)), stocks] = actions
+    return full
+
+
+def dp_hierarchical_horizon(
+    demand,
+    fuzzy_import,
+    holding_cost,
+    import_cost,
+    max_stock,
+    initial_stock,
+    block=BLOCK_SIZES["quarter"],
+    workers=None,
+    progress=None,
+    backend="numpy",
+    precision=None
+):
+    """
+    Two-level DP for long horizons, same output as
+    dp_deterministic_horizon.
+
+    1. solve_coarse gives a target ending stock for every block.
+    2. Every block is solved on its own (worker processes for horizons of
+       PARALLEL_MIN_PERIODS and more) over the stocks it can pass through
+       between the corridors (target +/- CORRIDOR) of the previous
+       block and its own; the coarse cost-to-go is its terminal cost.
+       The last block ends freely like the full DP.
+    3. The block policies are followed from initial_stock in one forward
+       pass; every block ends inside the starting corridor of the next.
+       A block entered at a stock it has no plan for is solved again
+       from that stock.
+
+    Falls back to the full DP (with backend and precision; blocks are
+    solved in float64) when the aggregate plan or the stitched plan is
+    infeasible.
+    """
+    demand = np.asarray(demand)
+    args = (demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock)
+    starts, lengths = block_starts(len(demand), block)
+
+    with span("dp.hierarchical", periods=len(demand), blocks=len(starts)):
+        with span("dp.coarse", blocks=len(starts)):
+            V, grid, targets = solve_coarse(*args, block)
+
+        if targets is None:
+            count("dp.hierarchical_fallback")
+            return dp_deterministic_horizon(*args, progress=progress, backend=backend, precision=precision)
+
+        floors = minimum_stock(demand, fuzzy_import)[starts]
+        tasks = []
+        start = (initial_stock, initial_stock)
+        for k, (first, periods) in enumerate(zip(starts, lengths)):
+            end = terminal = None
+            if k < len(starts) - 1:
+                end = (max(floors[k + 1], targets[k] - CORRIDOR), min(max_stock, targets[k] + CORRIDOR))
+                terminal = partial(coarse_value, V[k + 1], grid, floor=floors[k + 1])
+            tasks.append((
+                demand[first:first + periods],
+                fuzzy_import[first:first + periods],
+                holding_cost,
+                import_cost,
+                max_stock,
+                start,
+                end,
+                terminal
+            ))
+            start = end
+
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(demand) >= PARALLEL_MIN_PERIODS:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(solve_block, *task) for task in tasks]
+                blocks = []
+                for i, future in enumerate(futures, start=1):
+                    blocks.append(future.result())
+                    if progress is not None:
+                        progress(i, len(tasks))
+        else:
+            blocks = []
+            for i, task in enumerate(tasks, start=1):
+                blocks.append(solve_block(*task))
+                if progress is not None:
+                    progress(i, len(tasks))
+
+        policy = _stitch(blocks, tasks, max_stock, initial_stock)
+        if policy is None:
+            count("dp.hierarchical_fallback")
+            return dp_deterministic_horizon(*args, progress=progress, backend=backend, precision=precision)
+
+        df_result = forward_simulation(policy, *args)
+
+    return df_result, float(df_result["Total_Cost"].sum())
+
+
+def compare_hierarchical(
+    demand,
+    fuzzy_import,
+    holding_cost,
+    import_cost,
+    max_stock,
+    initial_stock,
+    block=BLOCK_SIZES["quarter"],
+    workers=None,
+    backend="numpy"
+):
+    """
+    Full solve vs hierarchical solve -> costs, relative cost gap,
+    wall times and speedup
+    """
+    args = (demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock)
+
+    start = time.perf_counter()
+    _, full_cost = dp_deterministic_horizon(*args, backend=backend, precision="float64")
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, hierarchical_cost = dp_hierarchical_horizon(
+        *args, block=block, workers=workers, backend=backend, precision="float64"
+    )
+    hierarchical_seconds = time.perf_counter() - start
+
+    return {
+        "full_cost": full_cost,
+        "hierarchical_cost": hierarchical_cost,
+        "cost_gap": (hierarchical_cost - full_cost) / max(1.0, abs(full_cost)),
+        "full_seconds": full_seconds,
+        "hierarchical_seconds": hierarchical_seconds,
+        "speedup": full_seconds / hierarchical_seconds
+    }
@@ -0,0 +1,303 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ======================================================
+# HOT-PATH INSTRUMENTATION (SPANS + COUNTERS)
+# ======================================================
+# Aktif bila DSS_INSTRUMENT=1 (atau lewat enable()); DSS_INSTRUMENT_LOG
+# menulis setiap span sebagai satu baris JSON ke file tersebut.
+ENV_ENABLED = "DSS_INSTRUMENT"
+ENV_LOG = "DSS_INSTRUMENT_LOG"
+
+# Span terakhir yang disimpan (ring buffer per proses)
+MAX_SPANS = 20_000
+
+# Atribut span yang dihitung sebagai throughput (satuan/detik)
+RATE_UNITS = ("rows", "cells", "bytes")
+
+# Sesi pemilik span/counter yang dicatat di thread ini (None = di luar sesi,
+# mis. inference service)
+_SESSION = contextvars.ContextVar("instrument_session", default=None)
+
+
+class _NullSpan:
+    """
+    Shared no-op span returned while instrumentation is disabled
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("recorder", "name", "attrs", "start")
+
+    def __init__(self, recorder, name, attrs):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.recorder.record(self.name, self.start, end - self.start, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """
+        Attach attributes known only inside the span (e.g. rows=len(df))
+        """
+        self.attrs.update(attrs)
+
+
+class Recorder:
+    """
+    Process-wide store of finished spans and counters. Thread-safe; jobs
+    and the inference service record from worker threads.
+
+    Spans and counters carry the session they were recorded for (see
+    session_scope), so snapshot/reset can be limited to one session.
+    """
+
+    def __init__(self, enabled=False, log_path=None, max_spans=MAX_SPANS):
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        # sesi -> {nama counter: nilai}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._log = None
+        self.log_path = None
+        self.set_log(log_path)
+
+    def set_log(self, path):
+        """
+        Append every span as a JSON line to path (None/"" stops logging).
+        OSError when path cannot be opened; the current log is kept then.
+        """
+        path = path or None
+        if path == self.log_path:
+            return
+        log = open(path, "a", encoding="utf-8", buffering=1) if path else None
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log = log
+            self.log_path = path
+
+    def record(self, name, start_ns, duration_ns, attrs):
+        event = {
+            "name": name,
+            "start_us": (start_ns - self._origin) / 1000,
+            "duration_ms": duration_ns / 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "session": _SESSION.get(),
+            "attrs": attrs
+        }
+        with self._lock:
+            self.spans.append(event)
+            if self._log is not None:
+                self._log.write(json.dumps(event, default=str) + "\n")
+
+    def count(self, name, value=1):
+        with self._lock:
+            counters = self.counters.setdefault(_SESSION.get(), {})
+            counters[name] = counters.get(name, 0) + value
+
+    def reset(self, session=None):
+        """
+        Drop the spans and counters of one session (all when None)
+        """
+        with self._lock:
+            if session is None:
+                self.spans.clear()
+                self.counters.clear()
+                return
+            kept = [e for e in self.spans if e["session"] != session]
+            self.spans.clear()
+            self.spans.extend(kept)
+            self.counters.pop(session, None)
+
+    def snapshot(self, session=None):
+        """
+        (spans, counters) of one session, or of all sessions when None
+        """
+        with self._lock:
+            if session is not None:
+                return (
+                    [e for e in self.spans if e["session"] == session],
+                    dict(self.counters.get(session, {}))
+                )
+            counters = {}
+            for values in self.counters.values():
+                for name, value in values.items():
+                    counters[name] = counters.get(name, 0) + value
+            return list(self.spans), counters
+
+
+_RECORDER = Recorder(
+    enabled=os.environ.get(ENV_ENABLED, "") not in ("", "0"),
+    log_path=os.environ.get(ENV_LOG) or None
+)
+
+
+def get_recorder():
+    return _RECORDER
+
+
+def enable(enabled=True, log_path=None):
+    """
+    Switch recording on/off at runtime; log_path appends JSON lines
+    """
+    _RECORDER.enabled = bool(enabled)
+    if log_path is not None:
+        _RECORDER.set_log(log_path)
+
+
+def is_enabled():
+    return _RECORDER.enabled
+
+
+def set_session(session):
+    """
+    Tag what the current thread records from now on with session
+    """
+    _SESSION.set(session)
+
+
+@contextmanager
+def session_scope(session):
+    """
+    with session_scope(job.session_id): ... -> spans and counters recorded
+    inside belong to that session
+    """
+    token = _SESSION.set(session)
+    try:
+        yield
+    finally:
+        _SESSION.reset(token)
+
+
+def span(name, **attrs):
+    """
+    with span("dp.backward", cells=T * S): ... -> timed when enabled, a
+    shared no-op otherwise
+    """
+    if not _RECORDER.enabled:
+        return _NULL_SPAN
+    return Span(_RECORDER, name, attrs)
+
+
+def count(name, value=1):
+    if _RECORDER.enabled:
+        _RECORDER.count(name, value)
+
+
+def instrumented(name, units=None):
+    """
+    Decorator form of span() for whole functions. units(*args, **kwargs)
+    -> span attributes taken from the call, e.g. {"rows": len(df)}.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _RECORDER.enabled:
+                return func(*args, **kwargs)
+            attrs = units(*args, **kwargs) if units is not None else {}
+            with Span(_RECORDER, name, attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ======================================================
+# SUMMARY + EXPORT
+# ======================================================
+def summary(session=None):
+    """
+    Per-span-name totals -> list of dicts (calls, total/mean/p95/max ms,
+    throughput for spans that carry rows/cells/bytes); session limits it
+    to that session's spans
+    """
+    spans, _ = _RECORDER.snapshot(session)
+    groups = {}
+    for event in spans:
+        groups.setdefault(event["name"], []).append(event)
+
+    rows = []
+    for name, events in groups.items():
+        durations = sorted(e["duration_ms"] for e in events)
+        total = sum(durations)
+        row = {
+            "Span": name,
+            "Calls": len(events),
+            "Total (ms)": round(total, 3),
+            "Mean (ms)": round(total / len(events), 3),
+            "p95 (ms)": round(durations[min(len(durations) - 1, int(0.95 * len(durations)))], 3),
+            "Max (ms)": round(durations[-1], 3),
+            "Throughput": ""
+        }
+        for unit in RATE_UNITS:
+            units = sum(e["attrs"].get(unit, 0) for e in events)
+            if units and total > 0:
+                row["Throughput"] = f"{units / (total / 1000):,.0f} {unit}/s"
+                break
+        rows.append(row)
+
+    return sorted(rows, key=lambda r: r["Total (ms)"], reverse=True)
+
+
+def export_json(session=None):
+    spans, counters = _RECORDER.snapshot(session)
+    return json.dumps(
+        {"spans": spans, "counters": counters, "summary": summary(session)}, default=str, indent=2
+    )
+
+
+def export_chrome_trace(session=None):
+    """
+    Chrome trace event format (chrome://tracing, Perfetto): one complete
+    ("X") event per span, counters as "C" events at the end
+    """
+    spans, counters = _RECORDER.snapshot(session)
+    events = [
+        {
+            "name": e["name"],
+            "ph": "X",
+            "ts": e["start_us"],
+            "dur": e["duration_ms"] * 1000,
+            "pid": e["pid"],
+            "tid": e["tid"],
+            "args": e["attrs"]
+        }
+        for e in spans
+    ]
+    end = max((e["ts"] + e["dur"] for e in events), default=0)
+    events += [
+        {"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "args": {"value": value}}
+        for name, value in counters.items()
+    ]
+    return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str)
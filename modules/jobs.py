@@ -0,0 +1,147 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.instrumentation import session_scope
+
+# Jumlah job paralel untuk seluruh server
+DEFAULT_WORKERS = 4
+
+# Job selesai yang disimpan per sesi (yang lebih lama dibuang)
+MAX_FINISHED_PER_SESSION = 20
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job when the user asked to cancel it
+    """
+
+
+class Job:
+    """
+    One background computation with progress, cancellation and result
+    """
+
+    def __init__(self, session_id, kind, label, meta=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.kind = kind
+        self.label = label
+        self.meta = meta or {}
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.attached = False
+        self._cancel = threading.Event()
+
+    def report(self, done, total, message=None):
+        """
+        Progress callback passed to the job function. Raises JobCancelled
+        once cancellation was requested, which aborts the computation.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(1.0, done / total) if total else 0.0
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == "queued":
+            self.status = "cancelled"
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobRunner:
+    """
+    Thread-pool job runner shared by all sessions.
+
+    Jobs run outside the Streamlit script thread, so pages stay responsive,
+    survive reruns and page navigation, and can be attached to later.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, kind, label, func, *args, meta=None, **kwargs):
+        """
+        Run func(*args, progress=job.report, **kwargs) in the background
+        """
+        job = Job(session_id, kind, label, meta=meta)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune(session_id)
+
+        def execute():
+            if job.status == "cancelled":
+                return
+            job.status = "running"
+            job.started = time.time()
+            try:
+                with session_scope(session_id):
+                    job.result = func(*args, progress=job.report, **kwargs)
+                job.progress = 1.0
+                job.status = "done"
+            except JobCancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.error = f"{e}\n{traceback.format_exc()}"
+                job.status = "failed"
+            finally:
+                job.finished = time.time()
+
+        self._pool.submit(execute)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs_for(self, session_id, kind=None):
+        """
+        Jobs of one session, newest first
+        """
+        with self._lock:
+            jobs = [
+                j for j in self._jobs.values()
+                if j.session_id == session_id and (kind is None or j.kind == kind)
+            ]
+        return sorted(jobs, key=lambda j: j.submitted, reverse=True)
+
+    def latest(self, session_id, kind):
+        jobs = self.jobs_for(session_id, kind)
+        return jobs[0] if jobs else None
+
+    def _prune(self, session_id):
+        finished = [
+            j for j in self._jobs.values()
+            if j.session_id == session_id and j.done
+        ]
+        finished.sort(key=lambda j: j.submitted, reverse=True)
+        for job in finished[MAX_FINISHED_PER_SESSION:]:
+            self._jobs.pop(job.id, None)
+
+
+_RUNNER = JobRunner()
+
+
+def get_job_runner():
+    return _RUNNER
@@ -1,6 +1,12 @@
+import os
+
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
+
+from modules.instrumentation import instrumented
+from modules.lazy_import import lazy_import
+
+stats = lazy_import("scipy.stats")
 
 # ======================================================
 # ERROR METRICS (FUZZY PREDICTION)
@@ -25,26 +31,331 @@ def smape(y_true, y_pred):
     return np.mean(np.abs(y_true - y_pred) / denom) * 100
 
 
+# ======================================================
+# STREAMING ERROR METRICS (CHUNKED / MULTI-PROCESS)
+# ======================================================
+
+class _Sum:
+    """
+    Neumaier-compensated running sum of chunk totals, so the final result
+    does not depend on how the data was chunked
+    """
+
+    __slots__ = ("total", "comp")
+
+    def __init__(self):
+        self.total = 0.0
+        self.comp = 0.0
+
+    def add(self, value):
+        value = float(value)
+        t = self.total + value
+        if abs(self.total) >= abs(value):
+            self.comp += (self.total - t) + value
+        else:
+            self.comp += (value - t) + self.total
+        self.total = t
+
+    @property
+    def value(self):
+        return self.total + self.comp
+
+
+def _error_terms(y_true, y_pred):
+    """
+    Per-observation terms of mae, rmse, mape and smape (same formulas)
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+
+    abs_err = np.abs(y_true - y_pred)
+    sq_err = abs_err * abs_err
+
+    # Seperti mape(): 1e-8 menggantikan nol di pembilang dan penyebut
+    y_safe = np.where(y_true == 0, 1e-8, y_true)
+    ape = np.abs(y_safe - y_pred) / np.abs(y_safe)
+
+    denom = (np.abs(y_true) + np.abs(y_pred)) / 2
+    denom = np.where(denom == 0, 1e-8, denom)
+    sape = abs_err / denom
+
+    return abs_err, sq_err, ape, sape
+
+
+def _metrics_from_sums(n, sum_abs, sum_sq, sum_ape, sum_sape):
+    if n == 0:
+        return {"MAE": np.nan, "RMSE": np.nan, "MAPE (%)": np.nan, "sMAPE (%)": np.nan}
+    return {
+        "MAE": sum_abs / n,
+        "RMSE": np.sqrt(sum_sq / n),
+        "MAPE (%)": sum_ape / n * 100,
+        "sMAPE (%)": sum_sape / n * 100
+    }
+
+
+class ErrorAccumulator:
+    """
+    Mergeable streaming version of mae / rmse / mape / smape.
+
+    update() per chunk, merge() accumulators from other workers (they are
+    picklable), result() gives the same dict keys as validation_summary.
+    Equal to the batch functions up to floating-point rounding.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self._sums = [_Sum() for _ in range(4)]
+
+    def update(self, y_true, y_pred):
+        terms = _error_terms(y_true, y_pred)
+        self.n += terms[0].size
+        for acc, term in zip(self._sums, terms):
+            acc.add(term.sum())
+        return self
+
+    def merge(self, other):
+        self.n += other.n
+        for acc, other_acc in zip(self._sums, other._sums):
+            acc.add(other_acc.total)
+            acc.add(other_acc.comp)
+        return self
+
+    def result(self):
+        return _metrics_from_sums(self.n, *(acc.value for acc in self._sums))
+
+
+class RollingErrorAccumulator:
+    """
+    Error metrics over the last `window` observations of a stream, for
+    drift monitoring. Keeps only the window in memory (ring buffer).
+    Not mergeable: the window depends on the order of the stream.
+    """
+
+    def __init__(self, window):
+        self.window = int(window)
+        self.n = 0
+        self._buffer = np.zeros((4, self.window))
+
+    def update(self, y_true, y_pred):
+        terms = np.stack(_error_terms(y_true, y_pred)).reshape(4, -1)
+        size = terms.shape[1]
+        terms = terms[:, -self.window:]
+        positions = (self.n + size - terms.shape[1] + np.arange(terms.shape[1])) % self.window
+        self._buffer[:, positions] = terms
+        self.n += size
+        return self
+
+    def result(self):
+        filled = min(self.n, self.window)
+        if filled < self.window:
+            positions = np.arange(self.n - filled, self.n) % self.window
+            sums = self._buffer[:, positions].sum(axis=1)
+        else:
+            sums = self._buffer.sum(axis=1)
+        return _metrics_from_sums(filled, *sums)
+
+
+def rolling_error_metrics(y_true, y_pred, window):
+    """
+    Trailing-window MAE/RMSE/MAPE/sMAPE at every observation (batch
+    version of RollingErrorAccumulator); the first window-1 rows are NaN
+    """
+    terms = np.stack(_error_terms(y_true, y_pred))
+    n = terms.shape[1]
+    blocks = -(-n // window)
+
+    # Prefix/suffix sums within blocks of `window` observations: each
+    # window sum only ever touches its own terms, unlike a global cumsum
+    padded = np.zeros((4, blocks * window))
+    padded[:, :n] = terms
+    padded = padded.reshape(4, blocks, window)
+    prefix = np.cumsum(padded, axis=2).reshape(4, -1)[:, :n]
+    suffix = np.cumsum(padded[:, :, ::-1], axis=2)[:, :, ::-1].reshape(4, -1)
+
+    end = np.arange(window - 1, n)
+    sums = prefix[:, end]
+    partial = (end % window) != window - 1
+    sums[:, partial] += suffix[:, end[partial] - window + 1]
+
+    out = np.full((4, n), np.nan)
+    out[:, window - 1:] = sums / window
+    out[1] = np.sqrt(out[1])
+    out[2:] *= 100
+
+    return pd.DataFrame({
+        "MAE": out[0],
+        "RMSE": out[1],
+        "MAPE (%)": out[2],
+        "sMAPE (%)": out[3]
+    })
+
+
 # ======================================================
 # DIEBOLD–MARIANO TEST
 # ======================================================
 
-def diebold_mariano(actual, pred_fuzzy, pred_baseline):
+DM_VARIANCES = ["sample", "hac"]
+
+# Resample per chunk (batas memori matriks indeks) dan ambang paralel
+BOOTSTRAP_CHUNK = 20_000
+PARALLEL_MIN_RESAMPLES = 100_000
+
+
+def newey_west_lag(n):
+    """
+    Newey–West (1994) rule-of-thumb truncation lag
+    """
+    return int(np.floor(4 * (n / 100) ** (2 / 9)))
+
+
+def _long_run_variance(d, lag):
+    """
+    Newey–West (Bartlett kernel) variance of the rows of d (..., T),
+    around each row's own mean
+    """
+    d = d - d.mean(axis=-1, keepdims=True)
+    n = d.shape[-1]
+    var = (d * d).sum(axis=-1) / n
+    for k in range(1, min(lag, n - 1) + 1):
+        gamma = (d[..., k:] * d[..., :-k]).sum(axis=-1) / n
+        var = var + 2 * (1 - k / (lag + 1)) * gamma
+    return var
+
+
+def _dm_stat(d, variance="sample", lag=None):
+    """
+    DM statistic of each row of the loss differential d (..., T)
+    """
+    n = d.shape[-1]
+    if variance == "hac":
+        var = _long_run_variance(d, newey_west_lag(n) if lag is None else lag)
+    elif variance == "sample":
+        var = np.var(d, axis=-1, ddof=1)
+    else:
+        raise ValueError(f"variance must be one of {DM_VARIANCES}")
+    return np.mean(d, axis=-1) / np.sqrt(var / n)
+
+
+def diebold_mariano(actual, pred_fuzzy, pred_baseline, variance="sample", lag=None):
+    """
+    DM test on squared-error loss. variance="hac" uses the Newey–West
+    long-run variance (lag=None -> newey_west_lag) instead of the plain
+    sample variance, for autocorrelated errors.
+    """
     e1 = actual - pred_fuzzy
     e2 = actual - pred_baseline
 
     d = (e1 ** 2) - (e2 ** 2)
-    dm_stat = np.mean(d) / np.sqrt(np.var(d, ddof=1) / len(d))
-    p_value = 2 * (1 - norm.cdf(abs(dm_stat)))
+    dm_stat = _dm_stat(np.asarray(d, dtype=float), variance, lag)
+    p_value = 2 * (1 - stats.norm.cdf(abs(dm_stat)))
 
     return dm_stat, p_value
 
 
+def _bootstrap_exceed(d, dm_stat, n_resamples, block_length, variance, lag, seed):
+    """
+    Moving-block resamples of the centered d; counts |DM*| >= |DM|.
+    All resamples of a chunk come from one (resamples × T) index matrix.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(d)
+    n_blocks = -(-n // block_length)
+    offsets = np.arange(block_length)
+    centered = d - d.mean()
+
+    exceed = 0
+    valid = 0
+    for start in range(0, n_resamples, BOOTSTRAP_CHUNK):
+        size = min(BOOTSTRAP_CHUNK, n_resamples - start)
+        starts = rng.integers(0, n - block_length + 1, size=(size, n_blocks))
+        index = (starts[:, :, None] + offsets).reshape(size, -1)[:, :n]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boot = _dm_stat(centered[index], variance, lag)
+
+        finite = np.isfinite(boot)
+        exceed += int((np.abs(boot[finite]) >= abs(dm_stat)).sum())
+        valid += int(finite.sum())
+
+    return exceed, valid
+
+
+def dm_bootstrap_pvalue(
+    actual,
+    pred_fuzzy,
+    pred_baseline,
+    n_resamples=10_000,
+    block_length=None,
+    variance="sample",
+    lag=None,
+    seed=0,
+    workers=None
+):
+    """
+    Moving-block bootstrap p-value of the DM statistic.
+
+    The loss differential is centered (null of equal accuracy) and
+    resampled in blocks of block_length (default ~T^(1/3)) to keep its
+    autocorrelation. From PARALLEL_MIN_RESAMPLES resamples on, the work
+    is split across worker processes with independent seed streams.
+    """
+    actual = np.asarray(actual, dtype=float)
+    d = (actual - np.asarray(pred_fuzzy, dtype=float)) ** 2 - \
+        (actual - np.asarray(pred_baseline, dtype=float)) ** 2
+    n = len(d)
+
+    if block_length is None:
+        block_length = max(1, int(round(n ** (1 / 3))))
+    block_length = int(min(max(1, block_length), n))
+
+    dm_stat = _dm_stat(d, variance, lag)
+    if not np.isfinite(dm_stat):
+        return np.nan
+
+    workers = workers or os.cpu_count() or 1
+    if n_resamples < PARALLEL_MIN_RESAMPLES or workers == 1:
+        parts = [_bootstrap_exceed(d, dm_stat, n_resamples, block_length, variance, lag, seed)]
+    else:
+        sizes = [len(chunk) for chunk in np.array_split(np.arange(n_resamples), workers)]
+        # multiprocessing hanya di-import bila benar-benar paralel
+        from concurrent.futures import ProcessPoolExecutor
+
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(
+                _bootstrap_exceed,
+                *zip(*[
+                    (d, dm_stat, size, block_length, variance, lag, child)
+                    for size, child in zip(sizes, seeds)
+                ])
+            ))
+
+    exceed = sum(p[0] for p in parts)
+    valid = sum(p[1] for p in parts)
+    # +1 agar p-value tidak pernah tepat nol
+    return (exceed + 1) / (valid + 1)
+
+
 # ======================================================
 # VALIDATION SUMMARY
 # ======================================================
 
-def validation_summary(actual, fuzzy, baseline=None):
+@instrumented("stats.validation")
+def validation_summary(
+    actual,
+    fuzzy,
+    baseline=None,
+    dm_variance="sample",
+    hac_lag=None,
+    bootstrap_resamples=0,
+    block_length=None,
+    seed=0
+):
+    """
+    Error metrics of the fuzzy prediction; with a baseline also the DM
+    test (dm_variance "sample" or "hac") and, if bootstrap_resamples > 0,
+    its moving-block bootstrap p-value
+    """
     summary = {
         "MAE": mae(actual, fuzzy),
         "RMSE": rmse(actual, fuzzy),
@@ -56,7 +367,9 @@ def validation_summary(actual, fuzzy, baseline=None):
         dm_stat, p_val = diebold_mariano(
             np.array(actual),
             np.array(fuzzy),
-            np.array(baseline)
+            np.array(baseline),
+            variance=dm_variance,
+            lag=hac_lag
         )
         summary.update({
             "DM Statistic": dm_stat,
@@ -64,6 +377,22 @@ def validation_summary(actual, fuzzy, baseline=None):
             "Significant (α=0.05)": p_val < 0.05
         })
 
+        if dm_variance == "hac":
+            lag = newey_west_lag(len(actual)) if hac_lag is None else hac_lag
+            summary["DM Variance"] = f"Newey–West (lag {lag})"
+
+        if bootstrap_resamples:
+            summary["Bootstrap p-value"] = dm_bootstrap_pvalue(
+                actual,
+                fuzzy,
+                baseline,
+                n_resamples=bootstrap_resamples,
+                block_length=block_length,
+                variance=dm_variance,
+                lag=hac_lag,
+                seed=seed
+            )
+
     return pd.DataFrame([summary])
 
 
@@ -71,45 +400,99 @@ def validation_summary(actual, fuzzy, baseline=None):
 # KPI – DYNAMIC PROGRAMMING (FIXED VERSION)
 # ======================================================
 
-def calculate_kpis(
-    df_policy: pd.DataFrame,
-    demand: np.ndarray,
-    import_cost: float,
-    holding_cost: float,
-    max_stock: float
+KPI_NAMES = [
+    "Total Import",
+    "Total Cost",
+    "Average Inventory",
+    "Stockout Rate",
+    "Overstock Rate",
+    "Service Level",
+    "Cost per Unit Demand",
+    "Inventory Turnover"
+]
+
+
+@instrumented(
+    "kpi.batch",
+    units=lambda ending_stock, *args, **kwargs: {"rows": len(np.atleast_2d(ending_stock))}
+)
+def calculate_kpis_batch(
+    ending_stock,
+    optimal_import,
+    period_import_cost,
+    period_holding_cost,
+    demand,
+    max_stock
 ):
     """
-    Calculate key performance indicators for Dynamic Programming policy
+    Vectorized KPIs for many policies at once.
+
+    ending_stock, optimal_import and the per-period costs are 2-D
+    (scenario × period) arrays; demand is (period,) or (scenario × period)
+    and max_stock a scalar or one value per scenario. Returns
+    {KPI name: array of shape (scenario,)}.
     """
+    ending_stock = np.atleast_2d(ending_stock)
+    optimal_import = np.atleast_2d(optimal_import)
+    demand = np.asarray(demand)
+    max_stock = np.asarray(max_stock)
+    if max_stock.ndim == 1:
+        max_stock = max_stock[:, None]
 
     # ---- Total Import & Cost ----
-    total_import = df_policy["Optimal_Import"].sum()
-    total_import_cost = df_policy["Import_Cost"].sum()
-    total_holding_cost = df_policy["Holding_Cost"].sum()
-    total_cost = total_import_cost + total_holding_cost
+    # Biaya float32 (mode presisi rendah) dijumlahkan dalam float64
+    period_import_cost = np.atleast_2d(period_import_cost)
+    period_holding_cost = np.atleast_2d(period_holding_cost)
+    accumulator = np.float64 if period_import_cost.dtype == np.float32 else None
+
+    total_import = optimal_import.sum(axis=1)
+    total_cost = (
+        period_import_cost.sum(axis=1, dtype=accumulator) +
+        period_holding_cost.sum(axis=1, dtype=accumulator)
+    )
 
     # ---- Inventory Metrics ----
-    avg_inventory = df_policy["Ending_Stock"].mean()
-    stockout_rate = (df_policy["Ending_Stock"] <= 0).mean()
-    overstock_rate = (df_policy["Ending_Stock"] >= 0.9 * max_stock).mean()
+    avg_inventory = ending_stock.mean(axis=1)
+    stockout_rate = (ending_stock <= 0).mean(axis=1)
+    overstock_rate = (ending_stock >= 0.9 * max_stock).mean(axis=1)
 
     # ---- Demand & Service ----
-    total_demand = np.sum(demand)
+    total_demand = demand.sum(axis=-1) * np.ones(len(ending_stock), dtype=demand.dtype)
     service_level = 1 - stockout_rate
 
     # ---- Efficiency Metrics ----
-    cost_per_unit = total_cost / total_demand if total_demand > 0 else 0
-    inventory_turnover = (
-        total_demand / avg_inventory if avg_inventory > 0 else 0
-    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost_per_unit = np.where(total_demand > 0, total_cost / total_demand, 0)
+        inventory_turnover = np.where(avg_inventory > 0, total_demand / avg_inventory, 0)
 
-    return {
-        "Total Import": total_import,
-        "Total Cost": total_cost,
-        "Average Inventory": avg_inventory,
-        "Stockout Rate": stockout_rate,
-        "Overstock Rate": overstock_rate,
-        "Service Level": service_level,
-        "Cost per Unit Demand": cost_per_unit,
-        "Inventory Turnover": inventory_turnover
-    }
+    return dict(zip(KPI_NAMES, [
+        total_import,
+        total_cost,
+        avg_inventory,
+        stockout_rate,
+        overstock_rate,
+        service_level,
+        cost_per_unit,
+        inventory_turnover
+    ]))
+
+
+def calculate_kpis(
+    df_policy: pd.DataFrame,
+    demand: np.ndarray,
+    import_cost: float,
+    holding_cost: float,
+    max_stock: float
+):
+    """
+    Calculate key performance indicators for Dynamic Programming policy
+    """
+    kpi = calculate_kpis_batch(
+        ending_stock=df_policy["Ending_Stock"].to_numpy(),
+        optimal_import=df_policy["Optimal_Import"].to_numpy(),
+        period_import_cost=df_policy["Import_Cost"].to_numpy(),
+        period_holding_cost=df_policy["Holding_Cost"].to_numpy(),
+        demand=np.asarray(demand),
+        max_stock=max_stock
+    )
+    return {name: values[0] for name, values in kpi.items()}
@@ -1,6 +1,14 @@
-import matplotlib.pyplot as plt
+import numpy as np
 import streamlit as st
 
+from modules.downsample import MAX_BARS, bucket_max, time_axis
+from modules.figure_cache import show_time_series
+from modules.lazy_import import lazy_import
+from modules.visualization import format_time_axis, plot_series
+
+plt = lazy_import("matplotlib.pyplot")
+mdates = lazy_import("matplotlib.dates")
+
 
 # ======================================================
 # KPI METRIC CARDS
@@ -24,18 +32,64 @@ def show_kpi_metrics(kpi):
 # ======================================================
 # INVENTORY PROFILE PLOT (FIXED)
 # ======================================================
-def plot_inventory_profile(df_policy):
+def inventory_profile_figure(months, ending_stock):
+    x = time_axis(months)
     fig, ax = plt.subplots(figsize=(9, 4))
 
-    ax.plot(
-        df_policy["Month"].astype(str),
-        df_policy["Ending_Stock"],
-        marker="o"
-    )
+    plot_series(ax, x, ending_stock)
+    format_time_axis(ax, x)
 
     ax.set_title("Inventory Level Over Time")
     ax.set_xlabel("Month")
     ax.set_ylabel("Ending Stock")
     ax.grid(True)
 
-    st.pyplot(fig)
+    return fig
+
+
+def plot_inventory_profile(df_policy):
+    """
+    Tampilkan profil stok (cached PNG, zoomable); mengembalikan bytes PNG
+    """
+    return show_time_series(
+        inventory_profile_figure,
+        df_policy["Month"].astype(str).values,
+        df_policy["Ending_Stock"].values,
+        zoom_key="inventory_profile"
+    )
+
+
+# ======================================================
+# ABSOLUTE ERROR BARS
+# ======================================================
+def absolute_error_figure(months, demand, fuzzy_import, optimal_import):
+    """
+    Paired error bars per period; long horizons are drawn as MAX_BARS
+    buckets holding the largest error of each bucket
+    """
+    fig, ax = plt.subplots(figsize=(10, 5))
+    errors_fuzzy = np.abs(np.asarray(demand, dtype=float) - np.asarray(fuzzy_import, dtype=float))
+    errors_dp = np.abs(np.asarray(demand, dtype=float) - np.asarray(optimal_import, dtype=float))
+
+    x = time_axis(months)
+    is_date = np.issubdtype(x.dtype, np.datetime64)
+    xf = mdates.date2num(x) if is_date else x.astype(float)
+
+    if len(xf) > MAX_BARS:
+        left, width, errors_fuzzy = bucket_max(xf, errors_fuzzy)
+        _, _, errors_dp = bucket_max(xf, errors_dp)
+        ax.set_ylabel("Max absolute error per bucket")
+    else:
+        step = np.diff(xf).min() if len(xf) > 1 else 1.0
+        left, width = xf - step / 2, np.full(len(xf), step)
+
+    ax.bar(left + 0.1 * width, errors_fuzzy, 0.4 * width, align="edge", label="Fuzzy Error")
+    ax.bar(left + 0.5 * width, errors_dp, 0.4 * width, align="edge", label="DP Error")
+    if is_date:
+        ax.xaxis_date()
+        format_time_axis(ax, x)
+    ax.set_title("Absolute Error Comparison")
+    ax.legend()
+    ax.grid(True, axis="y")
+
+    return fig
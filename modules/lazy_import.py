@@ -0,0 +1,38 @@
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module placeholder that imports the real module on first attribute access
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_loaded"] = False
+
+    def _load(self):
+        module = importlib.import_module(self.__name__)
+        # Salin namespace agar akses berikutnya tidak lewat __getattr__
+        self.__dict__.update(module.__dict__)
+        self.__dict__["_lazy_loaded"] = True
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """
+    Return the module if it is already imported, otherwise a LazyModule
+    that defers the (heavy) import until the module is actually used.
+
+        plt = lazy_import("matplotlib.pyplot")
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
@@ -0,0 +1,552 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from modules.dp_model import dp_deterministic_horizon
+from modules.export_excel import export_multi_sheet
+from modules.export_pdf import export_report_pack, export_summary_pdf
+from modules.figure_cache import prerender_figures, render_figure
+from modules.fuzzy_system import build_fuzzy_system, predict_import, predict_import_batch
+from modules.hierarchical_dp import dp_hierarchical_horizon, pays_off
+from modules.instrumentation import instrumented
+from modules.kpi_metrics import calculate_kpis, calculate_kpis_batch, validation_summary
+from modules.kpi_visuals import absolute_error_figure, inventory_profile_figure
+from modules.lazy_import import lazy_import
+from modules.precision import resolve_dtype
+from modules.rule_base import compile_rule_base, rule_base_columns
+from modules.stage_graph import StageGraph
+from modules.visualization import plot_import_comparison
+from modules.what_if import get_policy_cache
+
+stats = lazy_import("scipy.stats")
+
+# ======================================================
+# STAGE FUNCTIONS SHARED BY THE PAGES AND THE BATCH CLI
+# ======================================================
+ANYLOGIC_COLUMNS = {
+    "Demand": "Demand",
+    "Stock": "Initial_Stock",
+    "Production": "Production_Capacity"
+}
+
+REQUIRED_INPUT_COLUMNS = [
+    "Month",
+    "Demand",
+    "Initial_Stock",
+    "Production_Capacity"
+]
+
+DP_COLUMNS = {
+    "Impor_Optimal": "Optimal_Import",
+    "Impor_Fuzzy": "Fuzzy_Import",
+    "Stok_Awal": "Starting_Stock",
+    "Stok_Akhir": "Ending_Stock",
+    "Demand": "Demand"
+}
+
+REPORT_TITLE = "Final Import Decision Support System Report"
+
+REPORT_CONCLUSION = (
+    "The integration of fuzzy logic and dynamic programming "
+    "successfully generates an optimal import policy with "
+    "minimum cost and improved inventory control. "
+    "Statistical validation confirms performance differences."
+)
+
+
+def prepare_anylogic_frame(df):
+    """
+    Standardize raw AnyLogic data (Month period, global column contract).
+    Raises ValueError when required columns are missing.
+    """
+    df = df.rename(columns=ANYLOGIC_COLUMNS)
+
+    missing = [col for col in REQUIRED_INPUT_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Required columns are missing: {missing}")
+
+    df["Month"] = pd.to_datetime(df["Month"]).dt.to_period("M")
+    return df
+
+
+@instrumented("fuzzy.scoring", units=lambda df, *args, **kwargs: {"rows": len(df)})
+def run_fuzzy_scoring(df, rule_base=None, progress=None, system=None):
+    """
+    Fuzzy import prediction per row -> standardized fuzzy result
+
+    rule_base (a validated spec from modules.rule_base) scores the
+    columns it names in one batch call; without it every row goes
+    through the built-in skfuzzy controller (or system).
+    progress(done, total) dipanggil setiap baris selesai dihitung
+    """
+    if rule_base is not None:
+        columns = rule_base_columns(rule_base, df)
+        predictions = predict_import_batch(compile_rule_base(rule_base), *columns) if len(df) else []
+        if progress is not None:
+            progress(len(df), len(df))
+        return fuzzy_result_frame(df, predictions)
+
+    if system is None:
+        system = build_fuzzy_system()[0]
+
+    predictions = []
+    total = len(df)
+
+    for i, (_, row) in enumerate(df.iterrows(), start=1):
+        pred = predict_import(
+            system,
+            row["Demand"],
+            row["Initial_Stock"],
+            row["Production_Capacity"]
+        )
+        predictions.append(pred)
+
+        if progress is not None:
+            progress(i, total)
+
+    return fuzzy_result_frame(df, predictions)
+
+
+def fuzzy_result_frame(df, predictions):
+    """
+    Standardized fuzzy result (kontrak kolom Page 1 -> Page 2)
+    """
+    return pd.DataFrame({
+        "Month": df["Month"].values,
+        "Demand": df["Demand"].values,
+        "Initial_Stock": df["Initial_Stock"].values,
+        "Fuzzy_Import": predictions
+    })
+
+
+def run_dp_stage(
+    df_fuzzy,
+    holding_cost,
+    import_cost,
+    max_stock,
+    initial_stock=None,
+    progress=None,
+    precision=None,
+    block=None
+):
+    """
+    DP optimization on a fuzzy result -> standardized DP result
+
+    precision: "float64" / "float32" for the value recursion (None = the
+    global setting of modules.precision)
+    block: periods per aggregate block for hierarchical planning of long
+    horizons (None = one full-horizon DP); ignored where the full DP is
+    faster (see modules.hierarchical_dp.pays_off)
+
+    Full-horizon solves go through the policy cache, so a run that only
+    changes initial_stock is a forward rollout of the cached policy.
+    """
+    if initial_stock is None:
+        initial_stock = int(df_fuzzy["Initial_Stock"].iloc[0])
+
+    solve = partial(dp_deterministic_horizon, solve=get_policy_cache().solve)
+    if block and pays_off(len(df_fuzzy), int(max_stock), int(block)):
+        solve = partial(dp_hierarchical_horizon, block=int(block))
+
+    results_dp, _ = solve(
+        demand=df_fuzzy["Demand"].values,
+        fuzzy_import=df_fuzzy["Fuzzy_Import"].values,
+        holding_cost=holding_cost,
+        import_cost=import_cost,
+        max_stock=int(max_stock),
+        initial_stock=int(initial_stock),
+        progress=progress,
+        precision=precision
+    )
+
+    results_dp = results_dp.rename(columns=DP_COLUMNS)
+
+    results_dp["Month"] = df_fuzzy["Month"].astype(str).values
+    results_dp["Initial_Stock"] = df_fuzzy["Initial_Stock"].values
+
+    results_dp["Total_Cost"] = (
+        results_dp["Holding_Cost"] +
+        results_dp["Import_Cost"]
+    )
+
+    return results_dp
+
+
+@instrumented("kpi.compute")
+def compute_kpis(df_dp):
+    return calculate_kpis(
+        df_policy=df_dp,
+        demand=df_dp["Demand"].values,
+        import_cost=df_dp["Import_Cost"].mean(),
+        holding_cost=df_dp["Holding_Cost"].mean(),
+        max_stock=df_dp["Ending_Stock"].max()
+    )
+
+
+def compute_validation(df_dp, options=None):
+    """
+    options: validation_summary keyword arguments for the DM test
+    (dm_variance, hac_lag, bootstrap_resamples, block_length, seed)
+    """
+    return validation_summary(
+        actual=df_dp["Demand"].values,
+        fuzzy=df_dp["Fuzzy_Import"].values,
+        baseline=df_dp["Optimal_Import"].values,
+        **(options or {})
+    )
+
+
+@instrumented("stats.anova")
+def compute_anova(df_dp):
+    return stats.f_oneway(
+        df_dp["Fuzzy_Import"].values,
+        df_dp["Optimal_Import"].values,
+        df_dp["Demand"].values
+    )
+
+
+def assemble_analysis(df_dp, kpi, df_validation, anova):
+    """
+    Combine the analysis results with the monthly table and totals
+    """
+    anova_stat, anova_p = anova
+
+    df_analysis = pd.DataFrame({
+        "Month": df_dp["Month"].astype(str),
+        "Demand": df_dp["Demand"],
+        "Initial Stock": df_dp["Starting_Stock"],
+        "Import (Fuzzy)": df_dp["Fuzzy_Import"],
+        "Optimal Import (DP)": df_dp["Optimal_Import"],
+        "Final Stock": df_dp["Ending_Stock"],
+        "Total Cost": df_dp["Total_Cost"]
+    })
+
+    return {
+        "kpi": kpi,
+        "validation": df_validation,
+        "anova_stat": anova_stat,
+        "anova_p": anova_p,
+        "analysis": df_analysis,
+        "total_fuzzy_import": df_dp["Fuzzy_Import"].sum(),
+        "total_dp_import": df_dp["Optimal_Import"].sum(),
+        "total_cost": df_dp["Total_Cost"].sum()
+    }
+
+
+def run_analysis_stage(df_dp, validation_options=None):
+    """
+    KPIs, fuzzy validation (incl. DM test), ANOVA and the monthly table
+    """
+    return assemble_analysis(
+        df_dp,
+        compute_kpis(df_dp),
+        compute_validation(df_dp, validation_options),
+        compute_anova(df_dp)
+    )
+
+
+# ======================================================
+# REPORTS
+# ======================================================
+def report_sheets(df_fuzzy, df_dp, analysis):
+    anova_p = analysis["anova_p"]
+    return {
+        "Fuzzy_Result": df_fuzzy,
+        "DP_Result": df_dp,
+        "Final_Analysis": analysis["analysis"],
+        "Validation_Fuzzy": analysis["validation"],
+        "ANOVA_Test": pd.DataFrame({
+            "F-statistic": [analysis["anova_stat"]],
+            "p-value": [anova_p],
+            "Significant (α=0.05)": ["Yes" if anova_p < 0.05 else "No"]
+        })
+    }
+
+
+def report_metrics(analysis):
+    return {
+        "Total Fuzzy Import": f"{int(analysis['total_fuzzy_import']):,}",
+        "Total DP Import": f"{int(analysis['total_dp_import']):,}",
+        "Total Cost": f"{int(analysis['total_cost']):,}"
+    }
+
+
+def report_charts(df_dp, analysis):
+    """
+    PNG charts for the PDF report (same cache keys as the Page 3 figures)
+    """
+    df_analysis = analysis["analysis"]
+    return {
+        "Inventory Level Over Time": render_figure(
+            inventory_profile_figure,
+            df_dp["Month"].astype(str).values,
+            df_dp["Ending_Stock"].values
+        ),
+        "Fuzzy vs DP Import Comparison": render_figure(
+            plot_import_comparison,
+            df_analysis["Month"].values,
+            df_analysis["Import (Fuzzy)"].values,
+            df_analysis["Optimal Import (DP)"].values,
+            title="Fuzzy vs Dynamic Programming Import Comparison",
+            optimal_label="DP Import",
+            figsize=(10, 5)
+        ),
+        "Absolute Error Comparison": render_figure(
+            absolute_error_figure,
+            df_dp["Month"].astype(str).values,
+            df_dp["Demand"].values,
+            df_dp["Fuzzy_Import"].values,
+            df_dp["Optimal_Import"].values
+        )
+    }
+
+
+def build_excel_report(df_fuzzy, df_dp, analysis):
+    return export_multi_sheet(report_sheets(df_fuzzy, df_dp, analysis))
+
+
+@instrumented("export.pdf")
+def build_pdf_report(df_dp, analysis, charts=None):
+    return export_summary_pdf(
+        title=REPORT_TITLE,
+        metrics=report_metrics(analysis),
+        conclusion=REPORT_CONCLUSION,
+        charts=charts if charts is not None else report_charts(df_dp, analysis)
+    )
+
+
+# ======================================================
+# REPORT PACK (MANY SCENARIOS FROM THE RUN HISTORY)
+# ======================================================
+REPORT_PACK_TITLE = "Import Decision Scenario Report Pack"
+
+# Laporan di atas ukuran ini ditulis ke file sementara, bukan ke memori
+REPORT_PACK_SPOOL_BYTES = 16 * 1024 * 1024
+
+PACK_PARAMETER_LABELS = {
+    "holding_cost": "Holding Cost",
+    "import_cost": "Import Cost",
+    "max_stock": "Max Stock",
+    "initial_stock": "Initial Stock"
+}
+
+# KPI berupa rasio -> ditampilkan sebagai persen
+PERCENT_KPIS = {"stockout_rate", "overstock_rate", "service_level"}
+
+
+def _kpi_text(column, value):
+    if value is None or pd.isna(value):
+        return "-"
+    if column in PERCENT_KPIS:
+        return f"{value * 100:.1f}%"
+    return f"{value:,.2f}"
+
+
+def scenario_figures(periods):
+    """
+    (caption, builder, args, kwargs) of the charts on one scenario page
+    """
+    months = periods["Month"].values
+    return [
+        (
+            "Inventory Level Over Time",
+            inventory_profile_figure,
+            (months, periods["Ending_Stock"].values),
+            {}
+        ),
+        (
+            "Fuzzy vs DP Import Comparison",
+            plot_import_comparison,
+            (months, periods["Fuzzy_Import"].values, periods["Optimal_Import"].values),
+            {"optimal_label": "DP Import"}
+        )
+    ]
+
+
+def report_pack_summary(runs):
+    """
+    Overview table of the pack (formatted text, one row per run)
+    """
+    return pd.DataFrame({
+        "Run": [f"#{i}" for i in runs["id"]],
+        "Holding": runs["holding_cost"].map("{:g}".format),
+        "Import": runs["import_cost"].map("{:g}".format),
+        "Max Stock": runs["max_stock"].map("{:,}".format),
+        "Init. Stock": runs["initial_stock"].map("{:,}".format),
+        "Total Cost": [_kpi_text("total_cost", v) for v in runs["total_cost"]],
+        "Service": [_kpi_text("service_level", v) for v in runs["service_level"]],
+        "Avg. Inventory": [_kpi_text("average_inventory", v) for v in runs["average_inventory"]]
+    })
+
+
+@instrumented("export.report_pack")
+def build_report_pack(run_ids, store=None, workers=None, output=None, progress=None):
+    """
+    PDF report pack for stored runs: overview table plus one section
+    (parameters, KPIs, charts) per run.
+
+    Charts go through the figure cache: missing ones are pre-rendered in
+    parallel first, then pages are written one run at a time into
+    `output` (default: a spooled temp file that moves to disk beyond
+    REPORT_PACK_SPOOL_BYTES). Returns the output, rewound.
+    """
+    import tempfile
+
+    from modules.run_store import KPI_COLUMNS, get_run_store
+
+    store = store or get_run_store()
+    runs = store.runs(run_ids)
+    if runs.empty:
+        raise ValueError("Run yang dipilih tidak ada di riwayat")
+    periods = dict(tuple(store.periods(runs["id"]).groupby("Run ID", sort=False)))
+    figures = {run_id: scenario_figures(df) for run_id, df in periods.items()}
+
+    # Progress: gambar yang belum ada di cache, lalu satu langkah per skenario
+    def render_progress(done, total):
+        if progress is not None:
+            progress(done, total + len(runs), "rendering charts")
+
+    rendered = prerender_figures(
+        [(builder, args, kwargs) for items in figures.values() for _, builder, args, kwargs in items],
+        workers=workers,
+        progress=render_progress
+    )
+
+    def scenarios():
+        # Generator: hanya gambar skenario yang sedang ditulis ada di memori
+        for run in runs.itertuples(index=False):
+            yield {
+                "title": f"Run #{run.id} - {run.source} ({run.created_at} UTC)",
+                "parameters": {
+                    **{label: f"{getattr(run, col):g}" for col, label in PACK_PARAMETER_LABELS.items()},
+                    "Periods": f"{run.periods} ({run.start_month} - {run.end_month})"
+                },
+                "kpis": {name: _kpi_text(col, getattr(run, col)) for name, col in KPI_COLUMNS.items()},
+                "charts": {
+                    caption: render_figure(builder, *args, **kwargs)
+                    for caption, builder, args, kwargs in figures.get(run.id, [])
+                }
+            }
+
+    def page_progress(done, total):
+        if progress is not None:
+            progress(rendered + done, rendered + total, f"writing scenario {done}/{total}")
+
+    output = output if output is not None else tempfile.SpooledTemporaryFile(max_size=REPORT_PACK_SPOOL_BYTES)
+    export_report_pack(output, REPORT_PACK_TITLE, report_pack_summary(runs), scenarios(), progress=page_progress)
+    output.seek(0)
+    return output
+
+
+# ======================================================
+# STAGE GRAPH (UPLOAD -> FUZZY -> DP -> ANALYSIS -> EXPORTS)
+# ======================================================
+def _dp_stage(df_fuzzy, dp_params, progress=None):
+    return run_dp_stage(df_fuzzy, **dp_params, progress=progress)
+
+
+def _excel_stage(df_fuzzy, df_dp, analysis):
+    return build_excel_report(df_fuzzy, df_dp, analysis).getvalue()
+
+
+def _pdf_stage(df_dp, analysis, charts):
+    return build_pdf_report(df_dp, analysis, charts=charts).getvalue()
+
+
+def build_stage_graph():
+    """
+    Memoized DAG of the whole app pipeline.
+
+    Inputs: raw_data (prepared AnyLogic frame), rule_base (rule base
+    spec, defaults to None = built-in controller), dp_params (dict of
+    run_dp_stage keyword arguments), validation_options (dict for
+    compute_validation, defaults to {}). Any stage (e.g. fuzzy, dp)
+    can also be supplied directly through StageGraph.run(inputs=...).
+    """
+    graph = StageGraph()
+    graph.add_input("raw_data")
+    graph.add_input("rule_base", default=None)
+    graph.add_input("dp_params")
+    graph.add_input("validation_options", default={})
+
+    graph.add_stage("fuzzy", run_fuzzy_scoring, deps=["raw_data", "rule_base"], progress=True)
+    graph.add_stage("dp", _dp_stage, deps=["fuzzy", "dp_params"], progress=True)
+    graph.add_stage("kpis", compute_kpis, deps=["dp"])
+    graph.add_stage("validation", compute_validation, deps=["dp", "validation_options"])
+    graph.add_stage("anova", compute_anova, deps=["dp"])
+    graph.add_stage("analysis", assemble_analysis, deps=["dp", "kpis", "validation", "anova"])
+    graph.add_stage("charts", report_charts, deps=["dp", "analysis"])
+    graph.add_stage("excel_report", _excel_stage, deps=["fuzzy", "dp", "analysis"])
+    graph.add_stage("pdf_report", _pdf_stage, deps=["dp", "analysis", "charts"])
+
+    return graph
+
+
+# ======================================================
+# PARAMETER SWEEP
+# ======================================================
+SWEEP_PARAMETERS = ["holding_cost", "import_cost", "max_stock", "initial_stock"]
+
+
+def run_dp_sweep(df_fuzzy, dp_params, parameter, values, progress=None, run_store=None):
+    """
+    Re-run the DP for each value of one parameter -> cost/KPI table
+
+    run_store: optional RunStore; every sweep point is recorded in one
+    batched insert
+    """
+    results = []
+    total = len(values)
+
+    for i, value in enumerate(values):
+        params = {**dp_params, parameter: value}
+
+        def step_progress(done, steps):
+            if progress is not None:
+                progress(i + done / steps, total, f"{parameter} = {value}")
+
+        results.append(run_dp_stage(df_fuzzy, **params, progress=step_progress))
+
+    # KPI semua nilai sekaligus (sweep × periode), sama seperti compute_kpis;
+    # kolom float mengikuti presisi komputasi
+    dtype = resolve_dtype(dp_params.get("precision"))
+
+    def stack(column):
+        values = np.stack([df_dp[column].to_numpy() for df_dp in results])
+        return values.astype(dtype) if values.dtype.kind == "f" else values
+
+    ending_stock = stack("Ending_Stock")
+    kpi = calculate_kpis_batch(
+        ending_stock=ending_stock,
+        optimal_import=stack("Optimal_Import"),
+        period_import_cost=stack("Import_Cost"),
+        period_holding_cost=stack("Holding_Cost"),
+        demand=stack("Demand"),
+        max_stock=ending_stock.max(axis=1)
+    )
+
+    if run_store is not None:
+        from modules.artifact_store import content_key
+        from modules.run_store import make_run_record
+
+        input_hash = content_key(df_fuzzy)
+        run_store.record_many([
+            make_run_record(
+                df_fuzzy,
+                df_dp,
+                {**dp_params, parameter: value},
+                {name: column[i] for name, column in kpi.items()},
+                source=f"sweep:{parameter}",
+                input_hash=input_hash
+            )
+            for i, (value, df_dp) in enumerate(zip(values, results))
+        ])
+
+    return pd.DataFrame({
+        parameter: list(values),
+        "Total Cost": kpi["Total Cost"],
+        "Total Import": kpi["Total Import"],
+        "Average Inventory": kpi["Average Inventory"],
+        "Service Level": kpi["Service Level"]
+    })
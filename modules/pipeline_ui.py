@@ -0,0 +1,259 @@
+import sqlite3
+
+import streamlit as st
+
+from modules import instrumentation
+from modules.artifact_store import session_id
+from modules.compact_results import (
+    get_result_registry,
+    session_memory,
+    store_result
+)
+from modules.jobs import get_job_runner
+from modules.pipeline import build_stage_graph, compute_kpis
+from modules.run_store import get_run_store, make_run_record
+
+
+def session_stage_graph():
+    """
+    One memoized stage graph per Streamlit session
+    """
+    if "stage_graph" not in st.session_state:
+        st.session_state["stage_graph"] = build_stage_graph()
+    return st.session_state["stage_graph"]
+
+
+def show_stage_status(graph):
+    """
+    Sidebar panel with per-stage cache state and timings
+    """
+    with st.sidebar.expander("🧮 Pipeline Stages", expanded=False):
+        st.dataframe(graph.status(), hide_index=True, use_container_width=True)
+
+        if st.button("♻️ Clear stage cache"):
+            graph.invalidate()
+            st.rerun()
+
+
+def _set_recording():
+    instrumentation.enable(st.session_state["record_timings"])
+
+
+def show_instrumentation_panel():
+    """
+    Sidebar panel with this session's hot-path timings and trace exports.
+    Recording is switched for the whole server; the log file comes from
+    DSS_INSTRUMENT_LOG only.
+    """
+    sid = session_id()
+    with st.sidebar.expander("⏱️ Performance Timings", expanded=False):
+        # Recorder dipakai bersama: toggle mengikuti statusnya (sesi lain
+        # bisa mengubahnya) dan hanya mengubahnya saat diklik
+        st.session_state["record_timings"] = instrumentation.is_enabled()
+        enabled = st.toggle(
+            "Record timings (all sessions)",
+            key="record_timings",
+            on_change=_set_recording,
+            help="Recording is shared by every session of this server; the table shows your own timings."
+        )
+        if instrumentation.get_recorder().log_path:
+            st.caption(f"Spans are also appended to the server's {instrumentation.ENV_LOG} file.")
+
+        rows = instrumentation.summary(sid)
+        if not rows:
+            st.caption("No timings recorded yet." if enabled else "Recording is off.")
+            return
+
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        _, counters = instrumentation.get_recorder().snapshot(sid)
+        if counters:
+            st.caption(" · ".join(f"{name}: {value:,}" for name, value in counters.items()))
+
+        st.download_button(
+            "⬇️ Timings (JSON)",
+            data=instrumentation.export_json(sid),
+            file_name="timings.json",
+            mime="application/json"
+        )
+        st.download_button(
+            "⬇️ Chrome trace",
+            data=instrumentation.export_chrome_trace(sid),
+            file_name="trace.json",
+            mime="application/json",
+            help="Open in chrome://tracing or ui.perfetto.dev"
+        )
+        if st.button("🧹 Clear my timings"):
+            instrumentation.get_recorder().reset(sid)
+            st.rerun()
+
+
+def show_memory_panel():
+    """
+    Sidebar panel with this session's memory use and the shared result budget
+    """
+    with st.sidebar.expander("🧠 Session Memory", expanded=False):
+        usage = get_result_registry().usage(session_id())
+        total = get_result_registry().usage()
+
+        col1, col2 = st.columns(2)
+        col1.metric("Results (this session)", f"{usage['bytes'] / 1e6:,.1f} MB")
+        col2.metric(
+            "Results (all sessions)",
+            f"{total['bytes'] / 1e6:,.0f} / {total['budget_bytes'] / 1e6:,.0f} MB"
+        )
+        if usage["source_bytes"]:
+            st.caption(
+                f"Compact storage saves {1 - usage['bytes'] / usage['source_bytes']:.0%} "
+                f"vs. the original frames · {total['evictions']} eviction(s)"
+            )
+
+        st.dataframe(session_memory(), hide_index=True, use_container_width=True)
+
+
+# ======================================================
+# BACKGROUND JOBS
+# ======================================================
+def _store_fuzzy(job):
+    store_result("fuzzy_result", job.result["fuzzy"])
+    st.session_state["fuzzy_source_key"] = job.meta["source_key"]
+
+
+def _store_dp(job):
+    results_dp = job.result["dp"]
+    store_result("dp_result", results_dp)
+    st.session_state["dp_total_cost"] = results_dp["Total_Cost"].sum()
+    st.session_state["dp_result_key"] = job.meta["params_key"]
+
+    # Riwayat skenario: setiap run DP yang selesai dicatat sekali
+    if "dp_params" in job.meta:
+        try:
+            get_run_store().record(make_run_record(
+                None,
+                results_dp,
+                job.meta["dp_params"],
+                compute_kpis(results_dp),
+                input_hash=job.meta["input_key"]
+            ))
+        except sqlite3.Error as exc:
+            st.toast(f"⚠️ Run history not saved: {exc}")
+
+
+def _store_sweep(job):
+    st.session_state["dp_sweep"] = job.result
+    st.session_state["dp_sweep_parameter"] = job.meta["parameter"]
+
+
+def _store_sobol(job):
+    st.session_state["sobol_result"] = job.result
+    st.session_state["sobol_settings"] = job.meta
+
+
+def _store_replications(job):
+    st.session_state["replication_stats"] = job.result
+
+
+def _store_distribution(job):
+    st.session_state["distribution_result"] = job.result
+    st.session_state["distribution_key"] = job.meta["distribution_key"]
+
+
+def _store_report_pack(job):
+    # Satu report pack per sesi; file lama (mungkin di disk) ditutup
+    previous = st.session_state.get("report_pack")
+    if previous is not None and previous is not job.result:
+        previous.close()
+    st.session_state["report_pack"] = job.result
+    st.session_state["report_pack_runs"] = job.meta["runs"]
+
+
+# Cara hasil job dimasukkan ke session_state, per jenis job
+ATTACH_HANDLERS = {
+    "fuzzy": _store_fuzzy,
+    "dp": _store_dp,
+    "sweep": _store_sweep,
+    "sobol": _store_sobol,
+    "replications": _store_replications,
+    "distribution": _store_distribution,
+    "report_pack": _store_report_pack
+}
+
+
+def attach_finished_jobs():
+    """
+    Move results of finished jobs into the session (on any page); also
+    tags the timings of this script run with the session
+    """
+    # Span yang dicatat script run ini milik sesi ini
+    instrumentation.set_session(session_id())
+
+    runner = get_job_runner()
+    for job in reversed(runner.jobs_for(session_id())):
+        if job.status == "done" and not job.attached:
+            ATTACH_HANDLERS[job.kind](job)
+            job.attached = True
+
+
+def submit_job(kind, label, func, *args, meta=None, **kwargs):
+    """
+    Submit a job unless one of the same kind is still running
+    """
+    runner = get_job_runner()
+    current = runner.latest(session_id(), kind)
+    if current is not None and not current.done:
+        return current
+    return runner.submit(session_id(), kind, label, func, *args, meta=meta, **kwargs)
+
+
+def latest_job(kind):
+    return get_job_runner().latest(session_id(), kind)
+
+
+def _render_job(job):
+    if job.done:
+        return
+    st.progress(job.progress, text=f"⏳ {job.label} — {job.progress * 100:.0f}% {job.message}")
+    if st.button("⛔ Cancel", key=f"cancel_{job.id}"):
+        job.cancel()
+
+
+if hasattr(st, "fragment"):
+    @st.fragment(run_every=1.0)
+    def _poll_job(job_id):
+        job = get_job_runner().get(job_id)
+        if job is None:
+            return
+        _render_job(job)
+        if job.done:
+            st.rerun()
+else:
+    def _poll_job(job_id):
+        _render_job(get_job_runner().get(job_id))
+        st.button("🔄 Refresh", key=f"refresh_{job_id}")
+
+
+def show_job_status(job):
+    """
+    Progress bar + cancel button while running, outcome afterwards
+    """
+    if job is None:
+        return
+    if not job.done:
+        _poll_job(job.id)
+    elif job.status == "failed":
+        st.error(f"❌ {job.label} failed")
+        with st.expander("Details"):
+            st.code(job.error)
+    elif job.status == "cancelled":
+        st.warning(f"⛔ {job.label} was cancelled")
+
+
+def show_jobs_sidebar():
+    jobs = get_job_runner().jobs_for(session_id())
+    if not jobs:
+        return
+    with st.sidebar.expander("⏳ Background Jobs", expanded=any(not j.done for j in jobs)):
+        for job in jobs:
+            st.write(
+                f"**{job.label}** — {job.status} "
+                f"({job.progress * 100:.0f}%, {job.elapsed:.1f}s)"
+            )
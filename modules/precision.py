@@ -0,0 +1,101 @@
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+# ======================================================
+# GLOBAL COMPUTE PRECISION (FLOAT64 / FLOAT32)
+# ======================================================
+# DSS_PRECISION=float32 menjalankan inferensi fuzzy batch, rekursi nilai
+# DP (backend numpy) dan rollout kebijakan dalam float32.
+ENV_PRECISION = "DSS_PRECISION"
+
+PRECISIONS = {
+    "float64": np.float64,
+    "float32": np.float32
+}
+
+DEFAULT_PRECISION = "float64"
+
+# Selisih biaya relatif float32 vs float64 yang masih diterima
+COST_RTOL = 1e-5
+
+# Selisih absolut prediksi impor fuzzy (unit) yang masih diterima
+FUZZY_ATOL = 1e-2
+
+
+def _validate(name):
+    if name not in PRECISIONS:
+        raise ValueError(f"Presisi tidak dikenal: {name} (pilih {', '.join(PRECISIONS)})")
+    return name
+
+
+_PRECISION = _validate(os.environ.get(ENV_PRECISION) or DEFAULT_PRECISION)
+
+
+def get_precision():
+    return _PRECISION
+
+
+def set_precision(name):
+    """
+    Switch the process-wide precision; worker processes started later
+    inherit it through DSS_PRECISION
+    """
+    global _PRECISION
+    _PRECISION = _validate(name)
+    os.environ[ENV_PRECISION] = name
+
+
+@contextmanager
+def using_precision(name):
+    previous = _PRECISION
+    set_precision(name)
+    try:
+        yield
+    finally:
+        set_precision(previous)
+
+
+def resolve_dtype(precision=None):
+    """
+    numpy float type for an explicit precision name, else the global one
+    """
+    return PRECISIONS[_validate(precision or _PRECISION)]
+
+
+# ======================================================
+# ACCURACY CHECKS (FLOAT32 VS FLOAT64)
+# ======================================================
+def verify_dp(demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock, rtol=COST_RTOL):
+    """
+    Solve the DP in both precisions -> optimal plan unchanged and total
+    cost within rtol
+    """
+    from modules.dp_model import dp_deterministic_horizon
+
+    args = (demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock)
+    df64, cost64 = dp_deterministic_horizon(*args, precision="float64")
+    df32, cost32 = dp_deterministic_horizon(*args, precision="float32", fallback=False)
+
+    rel_error = abs(cost32 - cost64) / max(1.0, abs(cost64))
+    policy_equal = bool((df32["Impor_Optimal"].to_numpy() == df64["Impor_Optimal"].to_numpy()).all())
+    return {
+        "policy_equal": policy_equal,
+        "cost_float64": cost64,
+        "cost_float32": cost32,
+        "rel_error": rel_error,
+        "ok": policy_equal and rel_error <= rtol
+    }
+
+
+def verify_fuzzy(tables, *inputs, atol=FUZZY_ATOL):
+    """
+    Batch fuzzy inference in both precisions -> largest absolute gap
+    """
+    from modules.fuzzy_system import predict_import_batch
+
+    out64 = predict_import_batch(tables, *inputs, precision="float64")
+    out32 = predict_import_batch(tables, *inputs, precision="float32")
+    max_error = float(np.max(np.abs(out32.astype(np.float64) - out64)))
+    return {"max_abs_error": max_error, "ok": max_error <= atol}
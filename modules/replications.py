@@ -0,0 +1,261 @@
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from modules.lazy_import import lazy_import
+
+stats = lazy_import("scipy.stats")
+
+# ======================================================
+# MULTI-REPLICATION INGESTION (ZIP / SEVERAL FILES)
+# ======================================================
+REPLICATION_EXTENSIONS = (".csv", ".xlsx")
+
+# Kolom per periode yang dirata-rata antar replikasi (confidence band)
+SERIES_COLUMNS = ["Demand", "Fuzzy_Import", "Optimal_Import", "Ending_Stock", "Total_Cost"]
+
+# Replikasi yang boleh "in flight" per worker (batas memori)
+IN_FLIGHT_PER_WORKER = 2
+
+
+def _is_replication_file(name):
+    base = os.path.basename(name)
+    return (
+        name.lower().endswith(REPLICATION_EXTENSIONS) and
+        not name.startswith("__MACOSX/") and
+        not base.startswith(".")
+    )
+
+
+def count_replications(files):
+    """
+    Number of replication files in [(name, bytes)] uploads (zips expanded)
+    """
+    total = 0
+    for name, data in files:
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                total += sum(_is_replication_file(m) for m in zf.namelist())
+        elif _is_replication_file(name):
+            total += 1
+    return total
+
+
+def iter_replications(files):
+    """
+    Yield (name, bytes) per replication; zip members are read one at a time
+    """
+    for name, data in files:
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for member in sorted(zf.namelist()):
+                    if _is_replication_file(member):
+                        yield member, zf.read(member)
+        elif _is_replication_file(name):
+            yield name, data
+
+
+# ======================================================
+# ONE REPLICATION (WORKER PROCESS)
+# ======================================================
+@lru_cache(maxsize=4)
+def _worker_tables(rule_base_json=None):
+    # Spec dikirim sebagai JSON agar bisa menjadi kunci cache per worker
+    if rule_base_json is not None:
+        from modules.rule_base import compile_rule_base
+        return compile_rule_base(json.loads(rule_base_json))
+
+    from modules.fuzzy_system import build_fuzzy_system, compile_fuzzy_tables
+    return compile_fuzzy_tables(build_fuzzy_system()[0])
+
+
+def process_replication(name, data, dp_params, rule_base=None):
+    """
+    Parse -> fuzzy (batch inference) -> DP -> KPIs for one replication.
+    Returns only KPIs and the per-period series, not the frames.
+
+    rule_base (a validated spec) scores the columns it names, as on the
+    single-file path; ValueError when the replication lacks one.
+    """
+    from modules.data_loader import load_anylogic_data
+    from modules.fuzzy_system import predict_import_batch
+    from modules.pipeline import (
+        compute_kpis,
+        fuzzy_result_frame,
+        prepare_anylogic_frame,
+        run_dp_stage
+    )
+    from modules.rule_base import rule_base_columns
+
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    df = prepare_anylogic_frame(load_anylogic_data(buffer))
+
+    if rule_base is None:
+        tables = _worker_tables()
+        columns = [df["Demand"].values, df["Initial_Stock"].values, df["Production_Capacity"].values]
+    else:
+        tables = _worker_tables(json.dumps(rule_base, sort_keys=True))
+        columns = rule_base_columns(rule_base, df)
+
+    predictions = predict_import_batch(tables, *columns)
+    df_fuzzy = fuzzy_result_frame(df, predictions)
+    df_dp = run_dp_stage(df_fuzzy, **dp_params)
+
+    kpi = {k: float(v) for k, v in compute_kpis(df_dp).items()}
+    kpi["Total Fuzzy Import"] = float(df_dp["Fuzzy_Import"].sum())
+
+    return {
+        "name": name,
+        "kpi": kpi,
+        "months": df_dp["Month"].astype(str).tolist(),
+        "series": {col: df_dp[col].to_numpy(dtype=float) for col in SERIES_COLUMNS}
+    }
+
+
+# ======================================================
+# INCREMENTAL AGGREGATION
+# ======================================================
+class _Moments:
+    """
+    Welford running mean / variance of a vector that may grow in length
+    (replications with different horizons)
+    """
+
+    def __init__(self):
+        self.n = np.zeros(0)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        size = len(values)
+        if size > len(self.n):
+            pad = size - len(self.n)
+            self.n = np.concatenate([self.n, np.zeros(pad)])
+            self.mean = np.concatenate([self.mean, np.zeros(pad)])
+            self.m2 = np.concatenate([self.m2, np.zeros(pad)])
+
+        n = self.n[:size] + 1
+        delta = values - self.mean[:size]
+        self.mean[:size] += delta / n
+        self.m2[:size] += delta * (values - self.mean[:size])
+        self.n[:size] = n
+
+    def summary(self, confidence):
+        n = self.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(np.where(n > 1, self.m2 / (n - 1), np.nan))
+            half = stats.t.ppf(0.5 + confidence / 2, np.maximum(n - 1, 1)) * std / np.sqrt(n)
+        return self.mean, std, self.mean - half, self.mean + half
+
+
+class ReplicationStats:
+    """
+    Running KPI and per-period statistics over replications. Memory is
+    O(KPIs + periods), independent of the number of replications.
+    """
+
+    def __init__(self, dp_params=None):
+        self.dp_params = dp_params or {}
+        self.count = 0
+        self.names = []
+        self.failures = []
+        self.months = []
+        self.kpi_names = []
+        self._kpi = _Moments()
+        self._series = {col: _Moments() for col in SERIES_COLUMNS}
+
+    def update(self, result):
+        if not self.kpi_names:
+            self.kpi_names = list(result["kpi"])
+        self._kpi.update([result["kpi"][k] for k in self.kpi_names])
+
+        for col, values in result["series"].items():
+            self._series[col].update(values)
+        if len(result["months"]) > len(self.months):
+            self.months = result["months"]
+
+        self.count += 1
+        self.names.append(result["name"])
+
+    def kpi_table(self, confidence=0.95):
+        mean, std, low, high = self._kpi.summary(confidence)
+        return pd.DataFrame({
+            "KPI": self.kpi_names,
+            "Mean": mean,
+            "Std": std,
+            f"CI Low ({confidence:.0%})": low,
+            f"CI High ({confidence:.0%})": high,
+            "Replications": self._kpi.n.astype(int)
+        })
+
+    def band(self, column, confidence=0.95):
+        """
+        Per-period mean and confidence band of one series column
+        """
+        mean, std, low, high = self._series[column].summary(confidence)
+        return pd.DataFrame({
+            "Month": self.months[:len(mean)],
+            "Mean": mean,
+            "Std": std,
+            "CI Low": low,
+            "CI High": high,
+            "Replications": self._series[column].n.astype(int)
+        })
+
+
+def run_replications(files, dp_params, workers=None, progress=None, rule_base=None):
+    """
+    Process every replication in [(name, bytes)] uploads in parallel and
+    aggregate incrementally -> ReplicationStats.
+
+    dp_params as for run_dp_stage; initial_stock=None uses each
+    replication's own first Initial_Stock. rule_base (a validated spec)
+    replaces the built-in controller.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = count_replications(files)
+    aggregate = ReplicationStats(dp_params)
+    sources = iter_replications(files)
+    done = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {}
+
+        def submit_next():
+            for name, data in sources:
+                running[pool.submit(process_replication, name, data, dp_params, rule_base)] = name
+                return True
+            return False
+
+        for _ in range(workers * IN_FLIGHT_PER_WORKER):
+            if not submit_next():
+                break
+
+        try:
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        aggregate.update(future.result())
+                    except Exception as e:
+                        aggregate.failures.append((name, f"{type(e).__name__}: {e}"))
+
+                    done += 1
+                    if progress is not None:
+                        progress(done, total, name)
+                    submit_next()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+
+    return aggregate
@@ -0,0 +1,340 @@
+"""
+Declarative fuzzy rule bases (JSON / YAML)
+
+A rule base file describes the inputs, the output and the rules of a
+Mamdani controller; compile_rule_base turns it into the index arrays of
+the batch engine (modules/fuzzy_system.py), rule_base_to_system into a
+scikit-fuzzy ControlSystem for reference checks.
+
+    {
+        "name": "Import requirement",
+        "inputs": [
+            {
+                "label": "market_demand",
+                "title": "Market Demand",
+                "column": "Demand",
+                "universe": [200, 400, 1],
+                "terms": {"Low": {"mf": "trimf", "params": [200, 200, 300]}, ...}
+            },
+            ...
+        ],
+        "output": {"label": "product_import", "universe": [30, 400, 1], "terms": {...}},
+        "rules": [
+            ["Low", "Many", "High", "Low"],
+            {"if": {"market_demand": "High", "lead_time": "Long"}, "then": "High"}
+        ]
+    }
+
+universe is [start, stop, step] (stop included, at most
+MAX_UNIVERSE_POINTS points) and params are finite numbers. "column" is
+the data column scored by the pipeline (default: the label). A rule is
+either a list with one term per input in input order plus the output
+term, or an "if"/"then" mapping; inputs left out of a mapping or given as "*" do not
+constrain the rule. Rules are AND-combined with one output term.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+from modules.lazy_import import lazy_import
+
+fuzz = lazy_import("skfuzzy")
+ctrl = lazy_import("skfuzzy.control")
+yaml = lazy_import("yaml")
+
+# ======================================================
+# FORMAT
+# ======================================================
+DEFAULT_RULE_BASE = Path(__file__).resolve().parent.parent / "assets" / "rule_base_default.json"
+
+# Fungsi keanggotaan skfuzzy -> jumlah parameter
+MEMBERSHIP_FUNCTIONS = {
+    "trimf": 3,
+    "trapmf": 4,
+    "gaussmf": 2,
+    "gbellmf": 3,
+    "sigmf": 2
+}
+
+# Penanda input yang tidak membatasi sebuah aturan
+ANY_TERM = "*"
+
+# Selisih absolut batch engine vs skfuzzy yang masih diterima
+VERIFY_ATOL = 1e-6
+
+# Titik universe terbanyak per variabel (membatasi memori saat kompilasi)
+MAX_UNIVERSE_POINTS = 20_001
+
+
+def parse_rule_base(text, fmt="json"):
+    """
+    Rule base from JSON or YAML text -> validated spec (rules as
+    "if"/"then" mappings)
+    """
+    if fmt in ("yaml", "yml"):
+        try:
+            spec = yaml.safe_load(text)
+        except ModuleNotFoundError:
+            raise ValueError("YAML rule bases need PyYAML (pip install pyyaml); JSON works without it")
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}")
+    elif fmt == "json":
+        spec = json.loads(text)
+    else:
+        raise ValueError(f"Unknown rule base format: {fmt} (use json or yaml)")
+    return validate_rule_base(spec)
+
+
+def load_rule_base(path=DEFAULT_RULE_BASE):
+    """
+    Rule base file (.json, .yaml or .yml) -> validated spec
+    """
+    path = Path(path)
+    return parse_rule_base(path.read_text(encoding="utf-8"), fmt=path.suffix.lstrip(".").lower() or "json")
+
+
+def _is_number(value):
+    # bool adalah subclass int, tapi bukan angka yang dimaksud
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+
+
+def _validate_variable(var, kind):
+    if not isinstance(var, dict) or not isinstance(var.get("label"), str) or not var["label"]:
+        raise ValueError(f"Every {kind} needs a label")
+    label = var["label"]
+    if not isinstance(var.get("column", label), str) or not isinstance(var.get("title", label), str):
+        raise ValueError(f"{label}: title and column must be text")
+
+    universe = var.get("universe")
+    if not isinstance(universe, (list, tuple)) or len(universe) not in (2, 3):
+        raise ValueError(f"{label}: universe must be [start, stop] or [start, stop, step]")
+    if not all(_is_number(v) for v in universe):
+        raise ValueError(f"{label}: universe values must be finite numbers")
+    start, stop, step = (list(universe) + [1])[:3]
+    if not stop > start or not step > 0:
+        raise ValueError(f"{label}: universe needs start < stop and step > 0")
+    if (stop - start) / step + 1 > MAX_UNIVERSE_POINTS:
+        raise ValueError(f"{label}: universe has more than {MAX_UNIVERSE_POINTS:,} points; use a larger step")
+
+    terms = var.get("terms")
+    if not isinstance(terms, dict) or not terms:
+        raise ValueError(f"{label}: at least one term is required")
+    for name, term in terms.items():
+        mf = term.get("mf") if isinstance(term, dict) else None
+        if mf not in MEMBERSHIP_FUNCTIONS:
+            raise ValueError(f"{label}.{name}: mf must be one of {', '.join(MEMBERSHIP_FUNCTIONS)}")
+        params = term.get("params")
+        if not isinstance(params, (list, tuple)) or len(params) != MEMBERSHIP_FUNCTIONS[mf]:
+            raise ValueError(f"{label}.{name}: {mf} takes a list of {MEMBERSHIP_FUNCTIONS[mf]} params")
+        if not all(_is_number(v) for v in params):
+            raise ValueError(f"{label}.{name}: params must be finite numbers")
+        # Syarat parameter skfuzzy (assert / pembagian dengan nol)
+        if mf in ("trimf", "trapmf") and list(params) != sorted(params):
+            raise ValueError(f"{label}.{name}: {mf} params must be in ascending order")
+        if mf in ("gaussmf", "gbellmf") and params[{"gaussmf": 1, "gbellmf": 0}[mf]] == 0:
+            raise ValueError(f"{label}.{name}: {mf} width must not be 0")
+
+    return {
+        **var,
+        "title": var.get("title", label),
+        "universe": [start, stop, step],
+        "terms": {str(name): {"mf": t["mf"], "params": list(t["params"])} for name, t in terms.items()}
+    }
+
+
+def validate_rule_base(spec):
+    """
+    Check a parsed rule base and normalize it (defaults filled in, list
+    rules turned into "if"/"then" mappings without "*" entries).
+    Raises ValueError naming the first problem found.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("A rule base must be a mapping with inputs, output and rules")
+    for field in ("inputs", "rules"):
+        if not isinstance(spec.get(field) or [], list):
+            raise ValueError(f"{field} must be a list")
+
+    inputs = [_validate_variable(var, "input") for var in spec.get("inputs") or []]
+    if not inputs:
+        raise ValueError("A rule base needs at least one input")
+    labels = [var["label"] for var in inputs]
+    if len(set(labels)) != len(labels):
+        raise ValueError("Input labels must be unique")
+    for var in inputs:
+        var.setdefault("column", var["label"])
+
+    output = _validate_variable(spec.get("output"), "output")
+    if output["label"] in labels:
+        raise ValueError("The output label must differ from the input labels")
+
+    rules = []
+    for i, rule in enumerate(spec.get("rules") or [], start=1):
+        if isinstance(rule, (list, tuple)):
+            if len(rule) != len(inputs) + 1:
+                raise ValueError(f"Rule {i}: expected {len(inputs)} input terms and an output term")
+            conditions, then = dict(zip(labels, rule[:-1])), rule[-1]
+        elif isinstance(rule, dict) and "then" in rule and isinstance(rule.get("if") or {}, dict):
+            conditions, then = dict(rule.get("if") or {}), rule["then"]
+        else:
+            raise ValueError(f"Rule {i}: use a list of terms or an if/then mapping")
+
+        conditions = {k: str(v) for k, v in conditions.items() if v is not None and str(v) != ANY_TERM}
+        for label, term in conditions.items():
+            if label not in labels:
+                raise ValueError(f"Rule {i}: unknown input {label}")
+            if term not in inputs[labels.index(label)]["terms"]:
+                raise ValueError(f"Rule {i}: {label} has no term {term}")
+        if not conditions:
+            raise ValueError(f"Rule {i}: at least one input must be constrained")
+        if str(then) not in output["terms"]:
+            raise ValueError(f"Rule {i}: {output['label']} has no term {then}")
+        rules.append({"if": conditions, "then": str(then)})
+
+    if not rules:
+        raise ValueError("A rule base needs at least one rule")
+
+    return {"name": spec.get("name", "Rule base"), "inputs": inputs, "output": output, "rules": rules}
+
+
+# ======================================================
+# COMPILER: SPEC -> INDEX ARRAYS
+# ======================================================
+def _universe(var):
+    start, stop, step = var["universe"]
+    # stop ikut; bilangan bulat tetap int seperti np.arange(200, 401, 1)
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+def _membership(universe, term):
+    func = getattr(fuzz, term["mf"])
+    params = term["params"]
+    if term["mf"] in ("trimf", "trapmf"):
+        return func(universe, params)
+    return func(universe, *params)
+
+
+def compile_rule_base(spec):
+    """
+    Rule base -> tables for predict_import_batch, without building a
+    ControlSystem.
+
+    The rule base is kept as a sparse tensor over the term grid: one
+    coordinate row per defined rule in rule_terms (term index per input,
+    -1 where the rule does not use the input) and its output term in
+    rule_outputs, so inference cost grows with the number of rules and
+    not with the product of the term counts.
+    """
+    labels = [var["label"] for var in spec["inputs"]]
+    inputs = []
+    for var in spec["inputs"]:
+        universe = _universe(var)
+        inputs.append({
+            "label": var["label"],
+            "universe": np.asarray(universe, dtype=float),
+            "mfs": np.array([_membership(universe, t) for t in var["terms"].values()], dtype=float)
+        })
+
+    term_index = [{name: j for j, name in enumerate(var["terms"])} for var in spec["inputs"]]
+    output_terms = list(spec["output"]["terms"])
+
+    rule_terms = np.full((len(spec["rules"]), len(labels)), -1, dtype=np.intp)
+    rule_outputs = np.empty(len(spec["rules"]), dtype=np.intp)
+    for r, rule in enumerate(spec["rules"]):
+        for label, term in rule["if"].items():
+            i = labels.index(label)
+            rule_terms[r, i] = term_index[i][term]
+        rule_outputs[r] = output_terms.index(rule["then"])
+
+    output_universe = _universe(spec["output"])
+    return {
+        "inputs": inputs,
+        "rule_terms": rule_terms,
+        "rule_outputs": rule_outputs,
+        "output_universe": np.asarray(output_universe, dtype=float),
+        "output_mfs": np.array(
+            [_membership(output_universe, t) for t in spec["output"]["terms"].values()], dtype=float
+        )
+    }
+
+
+def rule_base_to_system(spec):
+    """
+    scikit-fuzzy version of a rule base -> (ControlSystem, [Antecedent],
+    Consequent), variables in spec order
+    """
+    inputs = []
+    for var in spec["inputs"]:
+        antecedent = ctrl.Antecedent(_universe(var), var["label"])
+        for name, term in var["terms"].items():
+            antecedent[name] = _membership(antecedent.universe, term)
+        inputs.append(antecedent)
+
+    output = ctrl.Consequent(_universe(spec["output"]), spec["output"]["label"])
+    for name, term in spec["output"]["terms"].items():
+        output[name] = _membership(output.universe, term)
+
+    by_label = {var.label: var for var in inputs}
+    rules = []
+    for rule in spec["rules"]:
+        terms = [by_label[label][term] for label, term in rule["if"].items()]
+        antecedent = terms[0]
+        for term in terms[1:]:
+            antecedent = antecedent & term
+        rules.append(ctrl.Rule(antecedent, output[rule["then"]]))
+
+    return ctrl.ControlSystem(rules), inputs, output
+
+
+def rule_base_columns(spec, df):
+    """
+    Input columns of df in rule-input order; ValueError when the data
+    lacks one
+    """
+    missing = [var["column"] for var in spec["inputs"] if var["column"] not in df.columns]
+    if missing:
+        raise ValueError(f"Columns required by the rule base are missing: {missing}")
+    return [df[var["column"]].to_numpy(dtype=float) for var in spec["inputs"]]
+
+
+# ======================================================
+# VERIFICATION AGAINST SCIKIT-FUZZY
+# ======================================================
+def verify_rule_base(spec, n=200, seed=0, atol=VERIFY_ATOL):
+    """
+    Compiled batch inference vs scikit-fuzzy's ControlSystemSimulation
+    on n random points of the input universes (plus every universe
+    corner). Points where no rule fires are counted, not compared.
+    """
+    from modules.fuzzy_system import fire_rules, predict_import_batch
+
+    tables = compile_rule_base(spec)
+    system, inputs, output = rule_base_to_system(spec)
+
+    rng = np.random.default_rng(seed)
+    bounds = np.array([(var["universe"][0], var["universe"][-1]) for var in tables["inputs"]])
+    corners = np.stack(np.meshgrid(*bounds, indexing="ij"), axis=-1).reshape(-1, len(bounds))
+    X = np.vstack([corners, rng.uniform(bounds[:, 0], bounds[:, 1], (n, len(bounds)))])
+
+    covered = (fire_rules(tables, *X.T) > 0).any(axis=1)
+    X = X[covered]
+    actual = predict_import_batch(tables, *X.T, precision="float64") if len(X) else np.empty(0)
+
+    # Input yang tidak dipakai aturan mana pun bukan bagian dari ControlSystem
+    used = {var.label for var in system.antecedents}
+    expected = np.empty(len(X))
+    for i, row in enumerate(X):
+        sim = ctrl.ControlSystemSimulation(system)
+        for var, value in zip(inputs, row):
+            if var.label in used:
+                sim.input[var.label] = value
+        sim.compute()
+        expected[i] = sim.output[output.label]
+
+    max_error = float(np.max(np.abs(actual - expected), initial=0.0))
+    return {
+        "points": int(len(X)),
+        "uncovered": int((~covered).sum()),
+        "max_abs_error": max_error,
+        "ok": max_error <= atol
+    }
@@ -0,0 +1,332 @@
+import io
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from modules.artifact_store import content_key
+
+# ======================================================
+# SCENARIO HISTORY (SQLITE)
+# ======================================================
+# Lokasi database riwayat run (default: folder kerja aplikasi)
+ENV_PATH = "DSS_RUN_STORE"
+DEFAULT_PATH = "run_history.sqlite"
+
+# Jumlah run per executemany / transaksi
+INSERT_BATCH_SIZE = 1000
+
+# Parameter DP yang disimpan sebagai kolom terindeks
+PARAMETER_COLUMNS = ["holding_cost", "import_cost", "max_stock", "initial_stock"]
+
+# Nama KPI dari calculate_kpis -> kolom tabel runs
+KPI_COLUMNS = {
+    "Total Import": "total_import",
+    "Total Cost": "total_cost",
+    "Average Inventory": "average_inventory",
+    "Stockout Rate": "stockout_rate",
+    "Overstock Rate": "overstock_rate",
+    "Service Level": "service_level",
+    "Cost per Unit Demand": "cost_per_unit_demand",
+    "Inventory Turnover": "inventory_turnover"
+}
+
+# Kolom per-periode yang disimpan (float32, terkompresi per run)
+PERIOD_COLUMNS = [
+    "Demand",
+    "Fuzzy_Import",
+    "Optimal_Import",
+    "Starting_Stock",
+    "Ending_Stock",
+    "Total_Cost"
+]
+
+RUN_COLUMNS = (
+    ["created_at", "source", "input_hash", "params_hash"] +
+    PARAMETER_COLUMNS +
+    ["periods", "start_month", "end_month"] +
+    list(KPI_COLUMNS.values())
+)
+
+# Kolom yang boleh dipakai untuk filter / urutan / grouping (whitelist SQL)
+QUERY_COLUMNS = ["id"] + RUN_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    input_hash TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    holding_cost REAL NOT NULL,
+    import_cost REAL NOT NULL,
+    max_stock INTEGER NOT NULL,
+    initial_stock INTEGER NOT NULL,
+    periods INTEGER NOT NULL,
+    start_month TEXT,
+    end_month TEXT,
+    {", ".join(f"{col} REAL" for col in KPI_COLUMNS.values())}
+);
+CREATE TABLE IF NOT EXISTS run_periods (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    months TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_params
+    ON runs (holding_cost, import_cost, max_stock, initial_stock);
+CREATE INDEX IF NOT EXISTS idx_runs_import_cost ON runs (import_cost);
+CREATE INDEX IF NOT EXISTS idx_runs_max_stock ON runs (max_stock);
+CREATE INDEX IF NOT EXISTS idx_runs_initial_stock ON runs (initial_stock);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_months ON runs (start_month, end_month);
+CREATE INDEX IF NOT EXISTS idx_runs_input ON runs (input_hash);
+CREATE INDEX IF NOT EXISTS idx_runs_total_cost ON runs (total_cost);
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _encode_periods(df_dp):
+    """
+    Per-period columns -> (newline-joined months, compressed float32 blob)
+    """
+    output = io.BytesIO()
+    np.savez_compressed(output, **{
+        col: df_dp[col].to_numpy(dtype=np.float32)
+        for col in PERIOD_COLUMNS if col in df_dp.columns
+    })
+    months = "\n".join(df_dp["Month"].astype(str))
+    return months, output.getvalue()
+
+
+def _decode_periods(months, data):
+    with np.load(io.BytesIO(data)) as arrays:
+        df = pd.DataFrame({col: arrays[col] for col in arrays.files})
+    df.insert(0, "Month", months.split("\n"))
+    return df
+
+
+def make_run_record(df_fuzzy, df_dp, dp_params, kpi, source="dp", input_hash=None):
+    """
+    One history row: hashed inputs, DP parameters, KPI dict from
+    calculate_kpis and the compact per-period results
+    """
+    months = df_dp["Month"].astype(str)
+    record = {
+        "created_at": _now(),
+        "source": source,
+        "input_hash": input_hash or content_key(df_fuzzy),
+        "params_hash": content_key(dp_params),
+        "periods": len(df_dp),
+        "start_month": months.iloc[0] if len(months) else None,
+        "end_month": months.iloc[-1] if len(months) else None
+    }
+    record.update({col: np.asarray(dp_params[col]).item() for col in PARAMETER_COLUMNS})
+    record.update({col: float(kpi[name]) for name, col in KPI_COLUMNS.items() if name in kpi})
+    record["periods_data"] = _encode_periods(df_dp)
+    return record
+
+
+class RunStore:
+    """
+    SQLite-backed history of DP runs. One connection per store, shared
+    by the page threads and background jobs behind a lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get(ENV_PATH) or DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --------------------------------------------------
+    # WRITE
+    # --------------------------------------------------
+    def record(self, record):
+        return self.record_many([record])[0]
+
+    def record_many(self, records, batch_size=INSERT_BATCH_SIZE):
+        """
+        Insert runs in batches (one transaction per batch) -> new run ids
+        """
+        # id dialokasikan sendiri agar run_periods bisa ikut executemany
+        insert_run = (
+            f"INSERT INTO runs (id, {', '.join(RUN_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in RUN_COLUMNS)})"
+        )
+        insert_periods = "INSERT INTO run_periods (run_id, months, data) VALUES (?, ?, ?)"
+
+        ids = []
+        with self._lock:
+            for start in range(0, len(records), batch_size):
+                batch = records[start:start + batch_size]
+                with self._conn:
+                    # Kunci tulis sebelum membaca MAX(id) (proses lain)
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    first = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM runs").fetchone()[0]
+                    batch_ids = list(range(first, first + len(batch)))
+                    self._conn.executemany(
+                        insert_run,
+                        [
+                            [run_id] + [r.get(col) for col in RUN_COLUMNS]
+                            for run_id, r in zip(batch_ids, batch)
+                        ]
+                    )
+                    self._conn.executemany(
+                        insert_periods,
+                        [
+                            (run_id, *r["periods_data"])
+                            for run_id, r in zip(batch_ids, batch)
+                            if r.get("periods_data") is not None
+                        ]
+                    )
+                ids.extend(batch_ids)
+        return ids
+
+    def delete(self, run_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM runs WHERE id = ?", [(int(i),) for i in run_ids])
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM run_periods")
+            self._conn.execute("DELETE FROM runs")
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+    @staticmethod
+    def _where(filters):
+        """
+        filters = {column: value | (low, high)}; None bounds are open
+        """
+        clauses, args = [], []
+        for column, value in (filters or {}).items():
+            if column not in QUERY_COLUMNS:
+                raise ValueError(f"Kolom tidak dikenal: {column}")
+            if isinstance(value, (tuple, list)):
+                low, high = value
+                if low is not None:
+                    clauses.append(f"{column} >= ?")
+                    args.append(low)
+                if high is not None:
+                    clauses.append(f"{column} <= ?")
+                    args.append(high)
+            else:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def _frame(self, sql, args=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, args)
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def count(self, filters=None):
+        where, args = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM runs{where}", args).fetchone()[0]
+
+    def query(self, filters=None, order_by="created_at", descending=True, limit=200, offset=0):
+        """
+        Matching runs (without per-period data), sorted and paged in SQL
+        """
+        if order_by not in QUERY_COLUMNS:
+            raise ValueError(f"Kolom tidak dikenal: {order_by}")
+        where, args = self._where(filters)
+        direction = "DESC" if descending else "ASC"
+        return self._frame(
+            f"SELECT id, {', '.join(RUN_COLUMNS)} FROM runs{where} "
+            f"ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+            [*args, int(limit), int(offset)]
+        )
+
+    def runs(self, run_ids):
+        """
+        Selected runs (without per-period data) in the given order
+        """
+        run_ids = [int(i) for i in run_ids]
+        if not run_ids:
+            return pd.DataFrame(columns=QUERY_COLUMNS)
+        df = self._frame(
+            f"SELECT id, {', '.join(RUN_COLUMNS)} FROM runs "
+            f"WHERE id IN ({', '.join('?' for _ in run_ids)})",
+            run_ids
+        )
+        found = set(df["id"])
+        return df.set_index("id").loc[[i for i in run_ids if i in found]].reset_index()
+
+    def aggregate(self, group_by, filters=None, limit=500):
+        """
+        Runs grouped by one parameter -> count and KPI mean/min/max
+        """
+        if group_by not in QUERY_COLUMNS:
+            raise ValueError(f"Kolom tidak dikenal: {group_by}")
+        where, args = self._where(filters)
+        return self._frame(
+            f"SELECT {group_by}, COUNT(*) AS runs, "
+            "AVG(total_cost) AS mean_cost, MIN(total_cost) AS min_cost, "
+            "MAX(total_cost) AS max_cost, AVG(service_level) AS mean_service_level, "
+            "AVG(average_inventory) AS mean_inventory "
+            f"FROM runs{where} GROUP BY {group_by} ORDER BY {group_by} LIMIT ?",
+            [*args, int(limit)]
+        )
+
+    def ranges(self):
+        """
+        Min/max of every parameter and the date span (filter widgets)
+        """
+        columns = PARAMETER_COLUMNS + ["created_at"]
+        # Satu subquery per MIN/MAX -> SQLite membaca ujung index saja
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT " + ", ".join(
+                    f"(SELECT MIN({c}) FROM runs), (SELECT MAX({c}) FROM runs)" for c in columns
+                )
+            ).fetchone()
+        return {col: (row[2 * i], row[2 * i + 1]) for i, col in enumerate(columns)}
+
+    def periods(self, run_ids):
+        """
+        Per-period results of the given runs -> long DataFrame with Run ID
+        """
+        run_ids = [int(i) for i in run_ids]
+        if not run_ids:
+            return pd.DataFrame()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT run_id, months, data FROM run_periods "
+                f"WHERE run_id IN ({', '.join('?' for _ in run_ids)})",
+                run_ids
+            ).fetchall()
+        frames = [_decode_periods(months, data).assign(**{"Run ID": run_id}) for run_id, months, data in rows]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+_RUN_STORE = None
+_RUN_STORE_LOCK = threading.Lock()
+
+
+def get_run_store():
+    """
+    Process-wide store at DSS_RUN_STORE (created on first use)
+    """
+    global _RUN_STORE
+    with _RUN_STORE_LOCK:
+        if _RUN_STORE is None:
+            _RUN_STORE = RunStore()
+        return _RUN_STORE
@@ -0,0 +1,224 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.fuzzy_system import build_fuzzy_system, compile_fuzzy_tables, predict_import_batch
+from modules.lazy_import import lazy_import
+
+qmc = lazy_import("scipy.stats.qmc")
+interpolate = lazy_import("scipy.interpolate")
+
+# ======================================================
+# GLOBAL SENSITIVITY ANALYSIS (SOBOL / SALTELLI)
+# ======================================================
+INPUT_NAMES = {
+    "market_demand": "Market Demand",
+    "product_stock": "Product Stock",
+    "production_capacity": "Production Capacity"
+}
+
+# Baris per panggilan inferensi (juga satuan progress & kerja paralel)
+EVAL_CHUNK_ROWS = 16_384
+
+# Batas elemen matriks indeks bootstrap per potongan (resample × n)
+BOOTSTRAP_CHUNK_ELEMENTS = 2_000_000
+
+METHODS = ["batch", "table"]
+
+# Titik per input grid tabel; grid dengan lebih dari MAX_TABLE_POINTS
+# titik (mis. 41^4) lebih mahal dari evaluasi langsung dan boros memori
+TABLE_RESOLUTION = 41
+MAX_TABLE_POINTS = 250_000
+
+
+def input_bounds(tables):
+    """
+    (low, high) of every input universe, in rule-input order
+    """
+    return [(var["universe"][0], var["universe"][-1]) for var in tables["inputs"]]
+
+
+# ======================================================
+# MODELS: EXACT BATCH OR TABULATED INFERENCE
+# ======================================================
+def table_fits(inputs, resolution=TABLE_RESOLUTION):
+    """
+    Whether a resolution^inputs response table stays within MAX_TABLE_POINTS
+    """
+    return resolution ** inputs <= MAX_TABLE_POINTS
+
+
+def build_response_table(tables, resolution=TABLE_RESOLUTION, progress=None):
+    """
+    Controller output on a regular grid over the input universes, for
+    trilinear lookup (method="table"). resolution points per input;
+    ValueError when the grid exceeds MAX_TABLE_POINTS.
+    """
+    if not table_fits(len(tables["inputs"]), resolution):
+        raise ValueError(
+            f"A {resolution}^{len(tables['inputs'])} table exceeds {MAX_TABLE_POINTS:,} points; "
+            "use the exact batch method"
+        )
+    axes = [np.linspace(low, high, resolution) for low, high in input_bounds(tables)]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes))
+    values = _evaluate(("batch", tables), grid, progress=progress)
+    return {"axes": axes, "values": values.reshape([resolution] * len(axes))}
+
+
+def _predict_chunk(model, X):
+    method, data = model
+    if method == "batch":
+        return predict_import_batch(data, *X.T)
+    lookup = interpolate.RegularGridInterpolator(data["axes"], data["values"])
+    return lookup(X)
+
+
+def _evaluate(model, X, workers=1, progress=None):
+    """
+    Model output for every row of X, chunked (and optionally across
+    worker processes); progress(done, total) per finished chunk
+    """
+    chunks = [X[i:i + EVAL_CHUNK_ROWS] for i in range(0, len(X), EVAL_CHUNK_ROWS)]
+    results = []
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_predict_chunk, model, chunk) for chunk in chunks]
+            for i, future in enumerate(futures, start=1):
+                results.append(future.result())
+                if progress is not None:
+                    progress(i, len(chunks))
+    else:
+        for i, chunk in enumerate(chunks, start=1):
+            results.append(_predict_chunk(model, chunk))
+            if progress is not None:
+                progress(i, len(chunks))
+
+    return np.concatenate(results) if results else np.empty(0)
+
+
+# ======================================================
+# SALTELLI DESIGN + INDICES
+# ======================================================
+def saltelli_design(n, bounds, seed=0):
+    """
+    Base matrices A, B (n × d) from a scrambled Sobol sequence and the
+    d matrices AB_i (A with column i taken from B), stacked as
+    [A; B; AB_1; ...; AB_d] -> ((d + 2)·n × d)
+    """
+    d = len(bounds)
+    low, high = np.array(bounds, dtype=float).T
+
+    sampler = qmc.Sobol(d=2 * d, scramble=True, seed=seed)
+    base = sampler.random(n)
+    A = low + base[:, :d] * (high - low)
+    B = low + base[:, d:] * (high - low)
+
+    blocks = [A, B]
+    for i in range(d):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    return np.vstack(blocks)
+
+
+def sobol_estimates(fA, fB, fAB):
+    """
+    First-order (Saltelli 2010) and total (Jansen) indices.
+
+    fA, fB: (..., n); fAB: (d, ..., n). Leading axes (e.g. bootstrap
+    resamples) are kept -> S1, ST of shape (d, ...). ValueError when the
+    output does not vary (the indices are undefined).
+    """
+    variance = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)
+    if not np.all(variance > 0):
+        raise ValueError("The output is constant over the sampled inputs; Sobol indices are undefined")
+    s1 = np.mean(fB * (fAB - fA), axis=-1) / variance
+    st = 0.5 * np.mean((fA - fAB) ** 2, axis=-1) / variance
+    return s1, st
+
+
+def _bootstrap_intervals(fA, fB, fAB, n_bootstrap, confidence, seed, progress=None):
+    rng = np.random.default_rng(seed)
+    n = len(fA)
+    chunk = max(1, BOOTSTRAP_CHUNK_ELEMENTS // n)
+    s1_boot, st_boot = [], []
+
+    for start in range(0, n_bootstrap, chunk):
+        size = min(chunk, n_bootstrap - start)
+        index = rng.integers(0, n, size=(size, n))
+        s1, st = sobol_estimates(fA[index], fB[index], fAB[:, index])
+        s1_boot.append(s1)
+        st_boot.append(st)
+        if progress is not None:
+            progress(start + size, n_bootstrap)
+
+    alpha = (1 - confidence) / 2
+    quantiles = [alpha, 1 - alpha]
+    s1_ci = np.quantile(np.concatenate(s1_boot, axis=1), quantiles, axis=1)
+    st_ci = np.quantile(np.concatenate(st_boot, axis=1), quantiles, axis=1)
+    return s1_ci, st_ci
+
+
+def sobol_analysis(
+    n=2 ** 13,
+    method="batch",
+    resolution=TABLE_RESOLUTION,
+    n_bootstrap=500,
+    confidence=0.95,
+    seed=0,
+    workers=1,
+    tables=None,
+    progress=None
+):
+    """
+    Sobol sensitivity of the import recommendation to each fuzzy input.
+
+    n base samples -> (d + 2)·n controller evaluations, uniform over the
+    input universes. method="batch" runs the exact vectorized controller;
+    "table" interpolates a resolution^d grid of it (faster for very large
+    n, approximate between grid points; at most MAX_TABLE_POINTS grid
+    points). workers > 1 spreads the evaluations over processes.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    if tables is None:
+        tables = compile_fuzzy_tables(build_fuzzy_system()[0])
+
+    bounds = input_bounds(tables)
+    d = len(bounds)
+
+    # Progress dibagi per fase: grid tabel (bila ada), evaluasi, bootstrap
+    phases = (["grid"] if method == "table" else []) + ["evaluation", "bootstrap"]
+
+    def phase_progress(name):
+        def report(done, total):
+            if progress is not None:
+                progress(phases.index(name) + done / total, len(phases), name)
+        return report
+
+    if method == "table":
+        model = ("table", build_response_table(tables, resolution, progress=phase_progress("grid")))
+    else:
+        model = ("batch", tables)
+
+    X = saltelli_design(n, bounds, seed=seed)
+    f = _evaluate(model, X, workers=workers, progress=phase_progress("evaluation"))
+    f = f.reshape(d + 2, n)
+
+    fA, fB, fAB = f[0], f[1], f[2:]
+    s1, st = sobol_estimates(fA, fB, fAB)
+    s1_ci, st_ci = _bootstrap_intervals(
+        fA, fB, fAB, n_bootstrap, confidence, seed, progress=phase_progress("bootstrap")
+    )
+
+    return pd.DataFrame({
+        "Input": [INPUT_NAMES.get(var["label"], var["label"]) for var in tables["inputs"]],
+        "S1": s1,
+        "S1 CI Low": s1_ci[0],
+        "S1 CI High": s1_ci[1],
+        "ST": st,
+        "ST CI Low": st_ci[0],
+        "ST CI High": st_ci[1]
+    })
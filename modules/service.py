@@ -0,0 +1,446 @@
+"""
+Local inference service for the fuzzy model and the DP optimizer
+
+A small asyncio HTTP/JSON server (standard library only). Single-row fuzzy
+requests arriving within a short window are coalesced into one vectorized
+predict_import_batch call; DP solves run in a process pool whose size caps
+how many solves run at once, with a bounded queue in front of it.
+
+Usage:
+    python -m modules.service --port 8765 [--batch-window-ms 5] [--dp-workers 2]
+
+Endpoints:
+    GET  /health    -> counters and batching statistics
+    POST /predict   {"demand": 300, "stock": 150, "capacity": 100}
+                    -> {"fuzzy_import": 215.3}
+                    (or {"rows": [[md, ps, pc], ...]} -> {"fuzzy_import": [...]})
+    POST /optimize  {"demand": [...], "fuzzy_import": [...], "holding_cost": 2,
+                     "import_cost": 5, "max_stock": 500, "initial_stock": 150}
+                    -> {"total_cost": ..., "optimal_import": [...], "ending_stock": [...]}
+
+The load-test harness is benchmarks/load_test.py.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_PORT = 8765
+
+# Jendela pengumpulan request fuzzy sebelum dieksekusi sebagai satu batch
+DEFAULT_BATCH_WINDOW_MS = 5
+DEFAULT_MAX_BATCH = 512
+
+# Batas solve DP yang berjalan bersamaan dan yang boleh mengantre
+DEFAULT_DP_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+DEFAULT_DP_QUEUE = 32
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ======================================================
+# FUZZY MICRO-BATCHING
+# ======================================================
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row fuzzy requests into vectorized batches.
+
+    The first request of a batch opens a window of window_ms; everything
+    arriving before it closes (up to max_batch rows) is scored in one
+    predict_import_batch call in a worker thread. A failed batch is scored
+    again request by request, so an error reaches only its own caller.
+    """
+
+    def __init__(self, tables, window_ms=DEFAULT_BATCH_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH):
+        self.tables = tables
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, rows):
+        """
+        Score rows (list of (md, ps, pc)); resolves when their batch is done
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.window
+
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            await self._run_batch(pending)
+
+    async def _run_batch(self, pending):
+        from modules.fuzzy_system import predict_import_batch
+
+        rows = np.array([row for rows, _ in pending for row in rows], dtype=float)
+        self.batches += 1
+        self.rows += len(rows)
+
+        try:
+            out = await asyncio.get_running_loop().run_in_executor(
+                None, predict_import_batch, self.tables, rows[:, 0], rows[:, 1], rows[:, 2]
+            )
+        except Exception as e:
+            if len(pending) == 1:
+                if not pending[0][1].done():
+                    pending[0][1].set_exception(e)
+                return
+            # Request yang gagal tidak boleh menggagalkan request lain di
+            # batch yang sama: setiap request dinilai ulang sendiri-sendiri
+            for item in pending:
+                await self._run_batch([item])
+            return
+
+        start = 0
+        for rows_i, future in pending:
+            if not future.done():
+                future.set_result(out[start:start + len(rows_i)].tolist())
+            start += len(rows_i)
+
+
+# ======================================================
+# DP WORKER POOL
+# ======================================================
+def dp_request(payload):
+    """
+    /optimize body -> keyword arguments of dp_deterministic_horizon.
+    ServiceError 400 for missing or non-numeric fields, NaN/inf values,
+    max_stock <= 0 and initial_stock outside 0..max_stock.
+    """
+    if "initial_stock" not in payload:
+        raise ServiceError(400, "initial_stock is required")
+    try:
+        demand = np.asarray(payload["demand"], dtype=float)
+        fuzzy_import = np.asarray(payload["fuzzy_import"], dtype=float)
+        costs = [float(payload.get("holding_cost", 2.0)), float(payload.get("import_cost", 5.0))]
+        stocks = [float(payload.get("max_stock", 500)), float(payload["initial_stock"])]
+    except (KeyError, TypeError, ValueError):
+        raise ServiceError(400, "Expected demand and fuzzy_import lists and numeric costs and stocks")
+
+    if demand.ndim != 1 or len(demand) == 0 or demand.shape != fuzzy_import.shape:
+        raise ServiceError(400, "demand and fuzzy_import must be non-empty and of equal length")
+    if not (np.isfinite(demand).all() and np.isfinite(fuzzy_import).all() and np.isfinite(costs + stocks).all()):
+        raise ServiceError(400, "All inputs must be finite numbers")
+
+    max_stock, initial_stock = int(stocks[0]), int(stocks[1])
+    if max_stock <= 0:
+        raise ServiceError(400, "max_stock must be positive")
+    if not 0 <= initial_stock <= max_stock:
+        raise ServiceError(400, "initial_stock must be between 0 and max_stock")
+
+    return {
+        "demand": demand.round().astype(np.int64),
+        "fuzzy_import": fuzzy_import,
+        "holding_cost": costs[0],
+        "import_cost": costs[1],
+        "max_stock": max_stock,
+        "initial_stock": initial_stock
+    }
+
+
+def solve_dp(request):
+    """
+    One DP solve in a worker process (same call as Page 2); request comes
+    from dp_request
+    """
+    from modules.dp_model import dp_deterministic_horizon
+
+    df, total_cost = dp_deterministic_horizon(**request)
+
+    return {
+        "total_cost": float(total_cost),
+        "optimal_import": df["Impor_Optimal"].tolist(),
+        "ending_stock": df["Stok_Akhir"].tolist(),
+        "holding_cost": df["Holding_Cost"].tolist(),
+        "import_cost": df["Import_Cost"].tolist()
+    }
+
+
+class DPPool:
+    """
+    Process pool for DP solves; at most workers run at once and at most
+    max_queue more may wait, beyond that requests get 503
+    """
+
+    def __init__(self, workers=DEFAULT_DP_WORKERS, max_queue=DEFAULT_DP_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.running = asyncio.Semaphore(workers)
+        self.pending = 0
+        self.solved = 0
+
+    async def solve(self, payload):
+        request = dp_request(payload)
+        if self.pending >= self.workers + self.max_queue:
+            raise ServiceError(503, "DP queue is full")
+
+        self.pending += 1
+        try:
+            async with self.running:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.pool, solve_dp, request
+                )
+        finally:
+            self.pending -= 1
+
+        self.solved += 1
+        return result
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# ======================================================
+# HTTP SERVER
+# ======================================================
+class InferenceService:
+    def __init__(
+        self,
+        batch_window_ms=DEFAULT_BATCH_WINDOW_MS,
+        max_batch=DEFAULT_MAX_BATCH,
+        dp_workers=DEFAULT_DP_WORKERS,
+        dp_queue=DEFAULT_DP_QUEUE
+    ):
+        self.batch_window_ms = batch_window_ms
+        self.max_batch = max_batch
+        self.dp_workers = dp_workers
+        self.dp_queue = dp_queue
+        self.batcher = None
+        self.dp = None
+        self.requests = 0
+        self.started = None
+
+    async def start(self, host, port):
+        from modules.fuzzy_system import build_fuzzy_system, compile_fuzzy_tables
+
+        tables = compile_fuzzy_tables(build_fuzzy_system()[0])
+        self.batcher = MicroBatcher(tables, self.batch_window_ms, self.max_batch)
+        self.batcher.start()
+        self.dp = DPPool(self.dp_workers, self.dp_queue)
+        self.started = time.time()
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def stop(self):
+        await self.batcher.stop()
+        self.dp.shutdown()
+
+    # ---- Routes ----
+    async def route(self, method, path, body):
+        if path == "/health":
+            return self.health()
+
+        if path not in ("/predict", "/optimize"):
+            raise ServiceError(404, f"Unknown path {path}")
+        if method != "POST":
+            raise ServiceError(405, "Use POST")
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise ServiceError(400, "Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise ServiceError(400, "Body must be a JSON object")
+
+        if path == "/predict":
+            return await self.predict(payload)
+        return await self.dp.solve(payload)
+
+    async def predict(self, payload):
+        try:
+            if "rows" in payload:
+                rows = [tuple(float(v) for v in row) for row in payload["rows"]]
+                if not rows or any(len(row) != 3 for row in rows):
+                    raise ValueError
+            else:
+                rows = [(
+                    float(payload["demand"]),
+                    float(payload["stock"]),
+                    float(payload["capacity"])
+                )]
+        except (KeyError, TypeError, ValueError):
+            raise ServiceError(400, "Expected demand, stock, capacity or rows=[[md, ps, pc], ...]")
+        # float() dan json.loads menerima NaN/Infinity
+        if not np.isfinite(rows).all():
+            raise ServiceError(400, "demand, stock and capacity must be finite numbers")
+
+        out = await self.batcher.predict(rows)
+        return {"fuzzy_import": out if "rows" in payload else out[0]}
+
+    def health(self):
+        batcher = self.batcher
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "fuzzy_batches": batcher.batches,
+            "fuzzy_rows": batcher.rows,
+            "mean_batch_size": round(batcher.rows / batcher.batches, 2) if batcher.batches else 0,
+            "dp_workers": self.dp.workers,
+            "dp_pending": self.dp.pending,
+            "dp_solved": self.dp.solved
+        }
+
+    # ---- HTTP/1.1 (keep-alive) ----
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, path, _ = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                try:
+                    status, result = 200, await self.route(method, path.split("?")[0], body)
+                except ServiceError as e:
+                    status, result = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, **options):
+    service = InferenceService(**options)
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{port} (Ctrl+C to stop)", flush=True)
+
+    # SIGTERM (mis. dari load_test --spawn) dimatikan dengan rapi agar
+    # worker DP ikut berhenti dan port langsung bebas
+    serving = asyncio.ensure_future(server.serve_forever())
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+    except NotImplementedError:
+        pass
+
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        server.close()
+        await service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help="fuzzy coalescing window (0 = score each request alone)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--dp-workers", type=int, default=DEFAULT_DP_WORKERS)
+    parser.add_argument("--dp-queue", type=int, default=DEFAULT_DP_QUEUE)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(
+            args.host,
+            args.port,
+            batch_window_ms=args.batch_window_ms,
+            max_batch=args.max_batch,
+            dp_workers=args.dp_workers,
+            dp_queue=args.dp_queue
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
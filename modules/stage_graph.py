@@ -0,0 +1,165 @@
+import threading
+import time
+
+import pandas as pd
+
+from modules.artifact_store import content_key
+from modules.lazy_import import lazy_import
+
+nx = lazy_import("networkx")
+
+_NO_DEFAULT = object()
+
+
+class StageGraph:
+    """
+    Memoized pipeline of stages modelled as a networkx DAG.
+
+    Every stage is a function of its upstream stages. A stage's key is the
+    hash of its name and its upstream keys; values passed through
+    run(inputs=...) are keyed by a hash of their content. A stage is only
+    recomputed when its key differs from the cached one, so editing one
+    parameter recomputes just the stages downstream of it.
+    """
+
+    def __init__(self):
+        self.graph = nx.DiGraph()
+        self._cache = {}
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    def add_input(self, name, default=_NO_DEFAULT):
+        """
+        Value supplied through run(inputs=...); the default (if any) is
+        used when a run does not provide it
+        """
+        self.graph.add_node(name, func=None, deps=[], progress=False, default=default)
+
+    def add_stage(self, name, func, deps=(), progress=False):
+        """
+        func is called with the upstream values as positional arguments,
+        in the order of deps. With progress=True it also receives the
+        progress callback given to run() as progress=...
+        """
+        self.graph.add_node(name, func=func, deps=list(deps), progress=progress)
+        for dep in deps:
+            if dep not in self.graph:
+                raise ValueError(f"Unknown dependency '{dep}' for stage '{name}'")
+            self.graph.add_edge(dep, name)
+
+    def _plan(self, targets, inputs):
+        """
+        Stages needed for targets; provided inputs cut off their ancestors
+        """
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            if name not in inputs:
+                stack.extend(self.graph.predecessors(name))
+
+        return [n for n in nx.topological_sort(self.graph) if n in needed]
+
+    def run(self, targets, inputs=None, progress=None):
+        """
+        Evaluate targets (name or list of names), reusing cached stages.
+        Returns {name: value} for every stage touched.
+
+        The lock only guards the cache, so a long stage running in a
+        background job does not block other runs of the same graph.
+        """
+        if isinstance(targets, str):
+            targets = [targets]
+        inputs = {
+            name: data["default"]
+            for name, data in self.graph.nodes(data=True)
+            if data.get("default", _NO_DEFAULT) is not _NO_DEFAULT
+        } | (inputs or {})
+
+        values = {}
+        keys = {}
+
+        for name in self._plan(targets, inputs):
+            with self._lock:
+                stats = self._stats.setdefault(
+                    name, {"state": "-", "seconds": None, "computed": 0, "hits": 0}
+                )
+
+            if name in inputs:
+                keys[name] = content_key("input", inputs[name])
+                values[name] = inputs[name]
+                stats["state"] = "input"
+                stats["key"] = keys[name][:10]
+                continue
+
+            node = self.graph.nodes[name]
+            func = node["func"]
+            if func is None:
+                raise ValueError(f"Input '{name}' was not provided")
+
+            deps = node["deps"]
+            key = content_key(name, func.__qualname__, [keys[d] for d in deps])
+            keys[name] = key
+
+            with self._lock:
+                cached = self._cache.get(name)
+                if cached is not None and cached[0] == key:
+                    values[name] = cached[1]
+                    stats["state"] = "hit"
+                    stats["hits"] += 1
+                    stats["key"] = key[:10]
+                    continue
+                stats["state"] = "running"
+
+            kwargs = {"progress": progress} if node["progress"] and progress else {}
+
+            start = time.perf_counter()
+            try:
+                values[name] = func(*[values[d] for d in deps], **kwargs)
+            except BaseException:
+                stats["state"] = "failed"
+                raise
+
+            with self._lock:
+                stats["seconds"] = time.perf_counter() - start
+                stats["state"] = "computed"
+                stats["computed"] += 1
+                stats["key"] = key[:10]
+
+                # Hanya versi terakhir per stage yang disimpan
+                self._cache[name] = (key, values[name])
+
+        return values
+
+    def invalidate(self, name=None):
+        """
+        Drop the cache of one stage and everything downstream (or all)
+        """
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+                return
+            for stage in {name} | nx.descendants(self.graph, name):
+                self._cache.pop(stage, None)
+
+    def status(self):
+        """
+        Per-stage cache state and timings of the most recent runs
+        """
+        rows = []
+        for name in nx.topological_sort(self.graph):
+            stats = self._stats.get(name, {})
+            seconds = stats.get("seconds")
+            rows.append({
+                "Stage": name,
+                "State": stats.get("state", "-"),
+                "Cached": name in self._cache,
+                "Last Compute (ms)": None if seconds is None else round(seconds * 1000, 1),
+                "Computed": stats.get("computed", 0),
+                "Hits": stats.get("hits", 0),
+                "Key": stats.get("key", "")
+            })
+        return pd.DataFrame(rows)
@@ -1,7 +1,33 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from skfuzzy.control import ControlSystemSimulation
+
+from modules.downsample import MARKER_LIMIT, downsample, time_axis
+from modules.lazy_import import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+mdates = lazy_import("matplotlib.dates")
+ctrl = lazy_import("skfuzzy.control")
+
+
+# ======================================================
+# TIME-SERIES HELPERS (NUMERIC AXIS + DOWNSAMPLING)
+# ======================================================
+def format_time_axis(ax, x):
+    """
+    Date locator/formatter for datetime axes (ticks stay readable at any
+    horizon length)
+    """
+    if np.issubdtype(np.asarray(x).dtype, np.datetime64):
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+def plot_series(ax, x, y, marker="o", **kwargs):
+    """
+    ax.plot on at most MAX_POINTS LTTB points; markers only for short series
+    """
+    xs, ys = downsample(x, y)
+    ax.plot(xs, ys, marker=marker if len(y) <= MARKER_LIMIT else None, **kwargs)
 
 
 def plot_mf(universe, mf_dict, title):
@@ -15,12 +41,14 @@ def plot_mf(universe, mf_dict, title):
 
 
 def plot_fuzzy_surface(system, md_range, ps_range, pc_fixed=100):
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 (registrasi proyeksi 3D)
+
     X, Y = np.meshgrid(md_range, ps_range)
     Z = np.zeros_like(X, dtype=float)
 
     for i in range(X.shape[0]):
         for j in range(X.shape[1]):
-            sim = ControlSystemSimulation(system)
+            sim = ctrl.ControlSystemSimulation(system)
 
             sim.input['market_demand'] = X[i, j]
             sim.input['product_stock'] = Y[i, j]
@@ -47,3 +75,127 @@ def plot_fuzzy_surface(system, md_range, ps_range, pc_fixed=100):
     fig.colorbar(surf, shrink=0.5, aspect=10)
 
     return fig
+
+
+def plot_response_surface(tables, x_range, y_range, fixed, titles, output_title="Product Import"):
+    """
+    Fuzzy surface of a compiled rule base over its first two inputs;
+    any further inputs are held at the values in fixed
+    """
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 (registrasi proyeksi 3D)
+    from modules.fuzzy_system import predict_import_batch
+
+    X, Y = np.meshgrid(x_range, y_range)
+    columns = [X.ravel(), Y.ravel()] + [np.full(X.size, value) for value in fixed]
+    Z = predict_import_batch(tables, *columns).reshape(X.shape)
+
+    fig = plt.figure(figsize=(8, 6))
+    ax = fig.add_subplot(111, projection='3d')
+    surf = ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='none', alpha=0.9)
+
+    ax.set_xlabel(titles[0])
+    ax.set_ylabel(titles[1])
+    ax.set_zlabel(output_title)
+    ax.set_title("Fuzzy Inference Surface")
+
+    fig.colorbar(surf, shrink=0.5, aspect=10)
+
+    return fig
+
+
+def plot_response_curve(tables, x_range, title, output_title="Product Import"):
+    """
+    Response curve of a compiled single-input rule base
+    """
+    from modules.fuzzy_system import predict_import_batch
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.plot(x_range, predict_import_batch(tables, x_range))
+    ax.set_xlabel(title)
+    ax.set_ylabel(output_title)
+    ax.set_title("Fuzzy Inference Response")
+    ax.grid(True)
+    return fig
+
+
+def plot_import_timeseries(months, values, title="Fuzzy Import Prediction Over Time"):
+    x = time_axis(months)
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    plot_series(ax, x, values)
+    format_time_axis(ax, x)
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Import Quantity")
+    ax.set_title(title)
+    ax.grid(True)
+    return fig
+
+
+def plot_import_comparison(
+    months,
+    fuzzy_import,
+    optimal_import,
+    title="Comparison of Import Decisions",
+    optimal_label="Optimal Import (DP)",
+    figsize=(10, 4)
+):
+    x = time_axis(months)
+
+    fig, ax = plt.subplots(figsize=figsize)
+    plot_series(ax, x, fuzzy_import, marker="o", label="Fuzzy Import")
+    plot_series(ax, x, optimal_import, marker="s", label=optimal_label)
+    format_time_axis(ax, x)
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Import Quantity")
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
+    return fig
+
+
+def plot_sobol_indices(df_sobol):
+    """
+    First-order and total Sobol indices per input with bootstrap CIs
+    """
+    y = np.arange(len(df_sobol))
+    height = 0.38
+
+    fig, ax = plt.subplots(figsize=(8, 3.5))
+    for offset, index, label in ((-height / 2, "S1", "First-order (S1)"), (height / 2, "ST", "Total (ST)")):
+        values = df_sobol[index].values
+        errors = np.vstack([
+            values - df_sobol[f"{index} CI Low"].values,
+            df_sobol[f"{index} CI High"].values - values
+        ]).clip(min=0)
+        ax.barh(y + offset, values, height, xerr=errors, capsize=3, label=label)
+
+    ax.set_yticks(y)
+    ax.set_yticklabels(df_sobol["Input"].values)
+    ax.invert_yaxis()
+    ax.set_xlabel("Sobol index")
+    ax.set_title("Sensitivity of the Import Recommendation")
+    ax.grid(True, axis="x")
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def plot_replication_band(months, mean, low, high, title, ylabel):
+    """
+    Mean over replications with its confidence band, per period
+    """
+    x = np.arange(len(months))
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.fill_between(x, low, high, alpha=0.3, label="95% CI")
+    ax.plot(x, mean, marker="o", label="Mean")
+    ax.set_xticks(x)
+    ax.set_xticklabels(months, rotation=45)
+    ax.set_xlabel("Month")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from modules.artifact_store import content_key
+from modules.dp_model import forward_simulation, solve_value_function
+from modules.instrumentation import count, span
+from modules.precision import resolve_dtype
+
+# ======================================================
+# SOLVED POLICY CACHE
+# ======================================================
+# V dan policy mencakup semua stok awal: perubahan stok awal cukup
+# dilayani dengan forward rollout dari tabel yang sudah ada.
+
+# Anggaran memori global untuk tabel V/policy per proses (byte)
+POLICY_BUDGET_BYTES = int(float(os.environ.get("DSS_POLICY_CACHE_MB", 64)) * 1024 * 1024)
+
+
+class PolicyCache:
+    """
+    LRU cache of solved (V, policy) tables keyed by the DP inputs, shared
+    by all sessions under one byte budget. Cached arrays are read-only.
+    """
+
+    def __init__(self, budget_bytes=POLICY_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def solve(
+        self,
+        demand,
+        fuzzy_import,
+        holding_cost,
+        import_cost,
+        max_stock,
+        progress=None,
+        backend="numpy",
+        precision=None,
+        import_cap=None
+    ):
+        """
+        solve_value_function with the same arguments, reusing the tables
+        of an earlier identical solve
+        """
+        dtype = np.float64 if backend == "loop" else resolve_dtype(precision)
+        key = content_key(
+            np.asarray(demand),
+            np.asarray(fuzzy_import, dtype=float),
+            float(holding_cost),
+            float(import_cost),
+            int(max_stock),
+            backend,
+            np.dtype(dtype).name,
+            None if import_cap is None else np.asarray(import_cap, dtype=float)
+        )
+
+        with self._lock:
+            tables = self._entries.get(key)
+            if tables is not None:
+                self._entries.move_to_end(key)
+
+        if tables is not None:
+            count("dp.policy_cache_hit")
+            if progress is not None:
+                progress(len(demand), len(demand))
+            return tables
+
+        count("dp.policy_cache_miss")
+        V, policy = solve_value_function(
+            demand, fuzzy_import, holding_cost, import_cost, max_stock,
+            progress=progress, backend=backend, precision=np.dtype(dtype).name, import_cap=import_cap
+        )
+        V.flags.writeable = False
+        policy.flags.writeable = False
+        self._put(key, (V, policy))
+        return V, policy
+
+    def _put(self, key, tables):
+        nbytes = sum(a.nbytes for a in tables)
+        if nbytes > self.budget_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= sum(a.nbytes for a in old)
+            self._entries[key] = tables
+            self._size += nbytes
+            while self._size > self.budget_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= sum(a.nbytes for a in evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def usage(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "budget_bytes": self.budget_bytes
+            }
+
+
+_POLICY_CACHE = PolicyCache()
+
+
+def get_policy_cache():
+    """
+    Process-wide policy cache (shared by all sessions and jobs)
+    """
+    return _POLICY_CACHE
+
+
+# ======================================================
+# WHAT-IF SCENARIOS
+# ======================================================
+def what_if_scenario(
+    demand,
+    fuzzy_import,
+    holding_cost,
+    import_cost,
+    max_stock,
+    initial_stock,
+    spike=None,
+    cap=None,
+    backend="numpy",
+    precision=None,
+    cache=None
+):
+    """
+    Optimal plan under a what-if change, reusing the cached base solve.
+
+    spike: (period, extra units) - one-off demand increase
+    cap: (largest import, first period, last period) - import capacity
+    cap over an inclusive range of 0-based periods
+
+    V[t] only depends on periods t..T-1, so a change ending at period k
+    leaves V[k+1:] and policy[k+1:] as they are: periods 0..k are solved
+    again with V[k+1] as terminal cost. A new initial stock alone needs
+    the forward rollout only.
+
+    Returns {"result", "cost", "feasible", "resolved_periods", "seconds"};
+    result is None and cost inf when no plan meets demand.
+    """
+    start = time.perf_counter()
+    cache = cache or get_policy_cache()
+    demand = np.array(demand)
+    fuzzy_import = np.asarray(fuzzy_import)
+    T = len(demand)
+
+    V, policy = cache.solve(
+        demand, fuzzy_import, holding_cost, import_cost, max_stock, backend=backend, precision=precision
+    )
+    value = V[0]
+
+    last = -1
+    import_cap = None
+    if spike is not None:
+        period, units = spike
+        demand[period] += units
+        last = max(last, period)
+    if cap is not None:
+        limit, first, final = cap
+        import_cap = np.full(T, np.inf)
+        import_cap[first:final + 1] = limit
+        last = max(last, min(final, T - 1))
+
+    if last >= 0:
+        with span("dp.what_if", periods=last + 1):
+            V_head, policy_head = solve_value_function(
+                demand[:last + 1],
+                fuzzy_import[:last + 1],
+                holding_cost,
+                import_cost,
+                max_stock,
+                backend=backend,
+                precision=precision,
+                terminal=V[last + 1],
+                import_cap=None if import_cap is None else import_cap[:last + 1]
+            )
+        policy = np.vstack([policy_head, policy[last + 1:]])
+        value = V_head[0]
+
+    # Tak layak (stok negatif di periode mana pun): tidak ada rencana
+    feasible = bool(np.isfinite(value[initial_stock]))
+    df_result = forward_simulation(
+        policy, demand, fuzzy_import, holding_cost, import_cost, max_stock, initial_stock
+    ) if feasible else None
+
+    return {
+        "result": df_result,
+        "cost": float(df_result["Total_Cost"].sum()) if feasible else np.inf,
+        "feasible": feasible,
+        "resolved_periods": last + 1,
+        "seconds": time.perf_counter() - start
+    }
@@ -1,12 +1,36 @@
+import os
+
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
-from modules.fuzzy_system import build_fuzzy_system, predict_import
+from modules.fuzzy_system import build_fuzzy_system, compile_fuzzy_tables
+from modules.rule_base import DEFAULT_RULE_BASE, compile_rule_base, parse_rule_base
+from modules.pipeline import prepare_anylogic_frame
+from modules.pipeline_ui import (
+    session_stage_graph,
+    show_stage_status,
+    show_instrumentation_panel,
+    show_memory_panel,
+    submit_job,
+    latest_job,
+    show_job_status,
+    attach_finished_jobs,
+    show_jobs_sidebar
+)
 from modules.data_loader import load_anylogic_data
-from modules.visualization import plot_mf, plot_fuzzy_surface
-from io import BytesIO
+from modules.arrow_io import export_fuzzy_parquet, PARQUET_MIME
+from modules.visualization import (
+    plot_mf,
+    plot_fuzzy_surface,
+    plot_response_surface,
+    plot_response_curve,
+    plot_import_timeseries,
+    plot_sobol_indices
+)
+from modules.figure_cache import show_figure, show_time_series
+from modules.export_excel import export_single_sheet
+from modules.artifact_store import content_key, download_artifact, EXCEL_MIME
+from modules.compact_results import load_result
 
 # =========================================================
 # PAGE CONFIGURATION
@@ -18,10 +42,97 @@ st.set_page_config(
 
 st.title("📊 Import Requirement Forecasting Using a Fuzzy System")
 
+graph = session_stage_graph()
+attach_finished_jobs()
+
 # =========================================================
-# BUILD FUZZY SYSTEM
+# BUILD FUZZY SYSTEM (ON DEMAND)
 # =========================================================
-system, md, ps, pc, pi = build_fuzzy_system()
+# Rule base aktif: None = controller bawaan, selain itu spec dari file
+rule_base = st.session_state.get("rule_base")
+rule_base_key = content_key(rule_base) if rule_base is not None else "default"
+
+
+@st.cache_resource
+def get_fuzzy_system(key="default", _spec=None):
+    # skfuzzy hanya di-import saat fitur fuzzy benar-benar dipakai
+    return build_fuzzy_system(_spec)
+
+
+@st.cache_resource
+def get_fuzzy_tables(key="default", _spec=None):
+    # Array aturan/MF untuk inferensi batch (vectorized)
+    if _spec is None:
+        return compile_fuzzy_tables(get_fuzzy_system()[0])
+    return compile_rule_base(_spec)
+
+# =========================================================
+# RULE BASE (BUILT-IN OR FROM FILE)
+# =========================================================
+st.subheader("📜 Rule Base")
+
+col_rb1, col_rb2 = st.columns([3, 1])
+rule_file = col_rb1.file_uploader(
+    "Load a rule base file (JSON or YAML); leave empty for the built-in 27-rule controller",
+    type=["json", "yaml", "yml"],
+    key="rule_base_file"
+)
+col_rb2.download_button(
+    "⬇️ Built-in rule base (template)",
+    data=DEFAULT_RULE_BASE.read_bytes(),
+    file_name=DEFAULT_RULE_BASE.name,
+    mime="application/json"
+)
+
+# File yang sama hanya diterapkan sekali: kembali ke halaman ini atau
+# memilih controller bawaan tidak menimpa pilihan user
+rule_file_key = None if rule_file is None else content_key(rule_file.name, rule_file.getvalue())
+if rule_file_key is not None and rule_file_key != st.session_state.get("rule_base_file_key"):
+    try:
+        spec = parse_rule_base(
+            rule_file.getvalue().decode("utf-8"),
+            fmt=rule_file.name.rsplit(".", 1)[-1].lower()
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"❌ Invalid rule base: {e}")
+    else:
+        st.session_state["rule_base"] = spec
+        st.session_state["rule_base_file_key"] = rule_file_key
+        st.session_state.pop("rule_base_check", None)
+        st.rerun()
+
+if rule_base is None:
+    st.caption("Using the built-in controller: 3 inputs × 3 terms, 27 rules.")
+else:
+    st.caption(
+        f"Using **{rule_base['name']}**: "
+        + ", ".join(f"{var['title']} ({len(var['terms'])} terms)" for var in rule_base["inputs"])
+        + f" → {len(rule_base['rules'])} rules. Inputs are read from the columns "
+        + ", ".join(f"`{var['column']}`" for var in rule_base["inputs"]) + "."
+    )
+
+    col_b1, col_b2 = st.columns(2)
+    if col_b1.button("🔎 Verify against scikit-fuzzy"):
+        from modules.rule_base import verify_rule_base
+
+        st.session_state["rule_base_check"] = (rule_base_key, verify_rule_base(rule_base))
+
+    if col_b2.button("↩️ Use the built-in rule base"):
+        st.session_state.pop("rule_base", None)
+        st.session_state.pop("rule_base_check", None)
+        st.rerun()
+
+    check = st.session_state.get("rule_base_check")
+    if check is not None and check[0] == rule_base_key:
+        result = check[1]
+        col_v1, col_v2, col_v3 = st.columns(3)
+        col_v1.metric("Points compared", f"{result['points']:,}")
+        col_v2.metric("Max |batch − skfuzzy|", f"{result['max_abs_error']:.2e}")
+        col_v3.metric("Points without a firing rule", f"{result['uncovered']:,}")
+        if result["ok"]:
+            st.success("✅ Compiled inference matches scikit-fuzzy")
+        else:
+            st.error("❌ Compiled inference differs from scikit-fuzzy")
 
 # =========================================================
 # MEMBERSHIP FUNCTIONS (TOGGLE)
@@ -35,39 +146,22 @@ if st.button("📐 Show Membership Functions"):
     st.session_state.show_mf = not st.session_state.show_mf
 
 if st.session_state.show_mf:
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.pyplot(
-            plot_mf(
-                md.universe,
-                {k: md[k].mf for k in md.terms},
-                "Market Demand"
-            )
-        )
-        st.pyplot(
-            plot_mf(
-                ps.universe,
-                {k: ps[k].mf for k in ps.terms},
-                "Initial Stock"
-            )
-        )
-
-    with col2:
-        st.pyplot(
-            plot_mf(
-                pc.universe,
-                {k: pc[k].mf for k in pc.terms},
-                "Production Capacity"
-            )
-        )
-        st.pyplot(
-            plot_mf(
-                pi.universe,
-                {k: pi[k].mf for k in pi.terms},
-                "Import Decision"
+    system, *variables = get_fuzzy_system(rule_base_key, rule_base)
+    titles = (
+        ["Market Demand", "Initial Stock", "Production Capacity", "Import Decision"]
+        if rule_base is None else
+        [var["title"] for var in rule_base["inputs"]] + [rule_base["output"]["title"]]
+    )
+    columns = st.columns(2)
+
+    for i, (var, title) in enumerate(zip(variables, titles)):
+        with columns[i % 2]:
+            show_figure(
+                plot_mf,
+                var.universe,
+                {k: var[k].mf for k in var.terms},
+                title
             )
-        )
 
 # =========================================================
 # FUZZY SURFACE (3D)
@@ -80,54 +174,146 @@ if "show_surface" not in st.session_state:
 if st.button("🧩 Show Fuzzy Surface"):
     st.session_state.show_surface = not st.session_state.show_surface
 
-if st.session_state.show_surface:
+if st.session_state.show_surface and rule_base is None:
+    system, md, ps, pc, pi = get_fuzzy_system()
     md_range = np.linspace(md.universe.min(), md.universe.max(), 30)
     ps_range = np.linspace(ps.universe.min(), ps.universe.max(), 30)
 
-    fig_surface = plot_fuzzy_surface(
+    show_figure(
+        plot_fuzzy_surface,
         system,
         md_range,
         ps_range,
-        pc_fixed=100
+        pc_fixed=100,
+        key=("build_fuzzy_system", md_range, ps_range, 100)
+    )
+elif st.session_state.show_surface and len(rule_base["inputs"]) == 1:
+    # Satu input: kurva respons, bukan permukaan
+    tables = get_fuzzy_tables(rule_base_key, rule_base)
+    x_var = tables["inputs"][0]
+
+    show_figure(
+        plot_response_curve,
+        tables,
+        np.linspace(x_var["universe"][0], x_var["universe"][-1], 200),
+        rule_base["inputs"][0]["title"],
+        rule_base["output"]["title"]
+    )
+elif st.session_state.show_surface:
+    # Rule base dari file: dua input pertama, input lain di tengah universe
+    tables = get_fuzzy_tables(rule_base_key, rule_base)
+    x_var, y_var, *others = tables["inputs"]
+    others_titles = [var["title"] for var in rule_base["inputs"][2:]]
+    fixed = []
+    for var, title in zip(others, others_titles):
+        low, high = float(var["universe"][0]), float(var["universe"][-1])
+        fixed.append(st.slider(f"{title} (held fixed)", low, high, (low + high) / 2, key=f"surface_{var['label']}"))
+
+    show_figure(
+        plot_response_surface,
+        tables,
+        np.linspace(x_var["universe"][0], x_var["universe"][-1], 30),
+        np.linspace(y_var["universe"][0], y_var["universe"][-1], 30),
+        fixed,
+        [var["title"] for var in rule_base["inputs"][:2]],
+        rule_base["output"]["title"]
     )
 
-    st.pyplot(fig_surface)
+# =========================================================
+# GLOBAL SENSITIVITY ANALYSIS (SOBOL)
+# =========================================================
+st.subheader("🎯 Global Sensitivity Analysis (Sobol)")
+
+if "show_sobol" not in st.session_state:
+    st.session_state.show_sobol = False
+
+if st.button("🎯 Show Sensitivity Analysis"):
+    st.session_state.show_sobol = not st.session_state.show_sobol
+
+if st.session_state.show_sobol:
+    st.caption(
+        "Which input drives the import recommendation most? Inputs are sampled "
+        "uniformly over their universes; S1 is the share of output variance "
+        "explained by an input alone, ST includes its interactions."
+    )
+
+    from modules.sensitivity import TABLE_RESOLUTION, sobol_analysis, table_fits
+
+    n_inputs = len(get_fuzzy_tables(rule_base_key, rule_base)["inputs"])
+    col_s1, col_s2, col_s3 = st.columns(3)
+    base_samples = col_s1.selectbox(
+        "Base samples (N)",
+        options=[2 ** k for k in range(10, 18)],
+        index=3,
+        format_func=lambda n: f"{n:,} → {(n_inputs + 2) * n:,} evaluations"
+    )
+    # Grid tabel tumbuh eksponensial dengan jumlah input
+    sobol_method = col_s2.radio(
+        "Inference",
+        options=["batch", "table"] if table_fits(n_inputs) else ["batch"],
+        format_func=lambda m: "Exact (batch)" if m == "batch" else f"Tabulated ({TABLE_RESOLUTION}^{n_inputs} grid)",
+        horizontal=True,
+        help=None if table_fits(n_inputs) else f"A tabulated grid is too large for {n_inputs} inputs."
+    )
+    sobol_workers = col_s3.number_input(
+        "Worker processes",
+        min_value=1,
+        max_value=16,
+        value=1
+    )
+
+    if st.button("▶️ Run Sensitivity Analysis"):
+        submit_job(
+            "sobol",
+            f"Sobol analysis (N={base_samples:,}, {sobol_method})",
+            sobol_analysis,
+            n=base_samples,
+            method=sobol_method,
+            workers=int(sobol_workers),
+            tables=get_fuzzy_tables(rule_base_key, rule_base),
+            meta={"n": base_samples, "method": sobol_method}
+        )
+
+    show_job_status(latest_job("sobol"))
+
+    if "sobol_result" in st.session_state:
+        df_sobol = st.session_state["sobol_result"]
+        settings = st.session_state["sobol_settings"]
+
+        st.markdown(
+            f"**N = {settings['n']:,}** ({settings['method']}), "
+            "95% bootstrap confidence intervals"
+        )
+        st.dataframe(df_sobol.round(4), hide_index=True, use_container_width=True)
+        show_figure(plot_sobol_indices, df_sobol)
 
 # =========================================================
 # DATA UPLOAD
 # =========================================================
 st.subheader("📂 Upload AnyLogic Data")
 
-uploaded_file = st.file_uploader(
-    "Upload CSV or Excel File",
-    type=["csv", "xlsx"]
+uploaded_files = st.file_uploader(
+    "Upload CSV or Excel File (several files or a ZIP for multiple replications)",
+    type=["csv", "xlsx", "zip"],
+    accept_multiple_files=True
+) or []
+
+# Satu file CSV/Excel -> alur biasa; beberapa file atau ZIP -> replikasi
+replication_mode = (
+    len(uploaded_files) > 1 or
+    any(f.name.lower().endswith(".zip") for f in uploaded_files)
 )
+uploaded_file = uploaded_files[0] if uploaded_files and not replication_mode else None
 
 if uploaded_file:
     df = load_anylogic_data(uploaded_file)
 
     # =====================================================
-    # STANDARDIZE TIME COLUMN
+    # STANDARDIZE TIME COLUMN & COLUMN NAMES (GLOBAL CONTRACT)
     # =====================================================
-    df["Month"] = pd.to_datetime(df["Month"]).dt.to_period("M")
-
-    # =====================================================
-    # STANDARDIZE COLUMN NAMES (GLOBAL CONTRACT)
-    # =====================================================
-    df = df.rename(columns={
-        "Demand": "Demand",
-        "Stock": "Initial_Stock",
-        "Production": "Production_Capacity"
-    })
-
-    required_cols = [
-        "Month",
-        "Demand",
-        "Initial_Stock",
-        "Production_Capacity"
-    ]
-
-    if not all(col in df.columns for col in required_cols):
+    try:
+        df = prepare_anylogic_frame(df)
+    except ValueError:
         st.error("❌ Required columns are missing.")
         st.write("Detected columns:", list(df.columns))
         st.stop()
@@ -138,32 +324,30 @@ if uploaded_file:
     # =====================================================
     # RUN FUZZY PREDICTION
     # =====================================================
-    if st.button("🔍 Run Fuzzy Prediction"):
-        predictions = []
-
-        for _, row in df.iterrows():
-            pred = predict_import(
-                system,
-                row["Demand"],
-                row["Initial_Stock"],
-                row["Production_Capacity"]
-            )
-            predictions.append(pred)
+    # Scoring berjalan sebagai background job; hasil standar disimpan ke
+    # session saat job selesai (juga bila user sedang di halaman lain)
+    source_key = content_key(df) if rule_base is None else content_key(df, rule_base)
+    missing_columns = [] if rule_base is None else [
+        var["column"] for var in rule_base["inputs"] if var["column"] not in df.columns
+    ]
+    if missing_columns:
+        st.error(f"❌ The rule base needs columns missing from the data: {missing_columns}")
+
+    if st.button("🔍 Run Fuzzy Prediction", disabled=bool(missing_columns)):
+        submit_job(
+            "fuzzy",
+            f"Fuzzy scoring ({len(df)} rows)",
+            graph.run,
+            "fuzzy",
+            inputs={"raw_data": df, "rule_base": rule_base},
+            meta={"source_key": source_key}
+        )
 
-        df["Fuzzy_Import"] = predictions
+    show_job_status(latest_job("fuzzy"))
 
-        # =================================================
-        # SAVE ONLY STANDARDIZED OUTPUT TO SESSION
-        # =================================================
-        fuzzy_output = df[[
-            "Month",
-            "Demand",
-            "Initial_Stock",
-            "Fuzzy_Import"
-        ]].copy()
-
-        st.session_state["fuzzy_result"] = fuzzy_output
+    fuzzy_output = load_result("fuzzy_result")
 
+    if fuzzy_output is not None and st.session_state.get("fuzzy_source_key") == source_key:
         st.success("✅ Fuzzy prediction results saved to session")
         st.dataframe(fuzzy_output, use_container_width=True)
 
@@ -172,36 +356,88 @@ if uploaded_file:
         # =================================================
         st.subheader("📉 Time Series of Fuzzy Import Prediction")
 
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.plot(
-            fuzzy_output["Month"].astype(str),
-            fuzzy_output["Fuzzy_Import"],
-            marker="o"
+        show_time_series(
+            plot_import_timeseries,
+            fuzzy_output["Month"].astype(str).values,
+            fuzzy_output["Fuzzy_Import"].values,
+            zoom_key="fuzzy_timeseries"
         )
-        ax.set_xlabel("Month")
-        ax.set_ylabel("Import Quantity")
-        ax.set_title("Fuzzy Import Prediction Over Time")
-        ax.grid(True)
-        plt.xticks(rotation=45)
-
-        st.pyplot(fig)
 
         # =================================================
         # DOWNLOAD RESULTS
         # =================================================
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            fuzzy_output.to_excel(
-                writer,
-                index=False,
-                sheet_name="Fuzzy_Result"
-            )
+        result_key = content_key(fuzzy_output)
 
-        output.seek(0)
-
-        st.download_button(
+        download_artifact(
             label="⬇️ Download Fuzzy Results (Excel)",
-            data=output,
+            name="fuzzy_excel",
+            key=result_key,
+            factory=lambda: export_single_sheet(fuzzy_output, sheet_name="Fuzzy_Result"),
             file_name="fuzzy_import_results.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=EXCEL_MIME
+        )
+
+        download_artifact(
+            label="⬇️ Download Fuzzy Results (Parquet)",
+            name="fuzzy_parquet",
+            key=result_key,
+            factory=lambda: export_fuzzy_parquet(fuzzy_output),
+            file_name="fuzzy_import_results.parquet",
+            mime=PARQUET_MIME
+        )
+
+# =========================================================
+# MULTIPLE REPLICATIONS
+# =========================================================
+if replication_mode:
+    from modules.replications import count_replications, run_replications
+
+    replication_files = [(f.name, f.getvalue()) for f in uploaded_files]
+    n_replications = count_replications(replication_files)
+
+    st.success(f"✅ {n_replications} replication file(s) detected")
+    st.caption(
+        "Every replication is parsed, scored by the fuzzy system and optimized "
+        "by DP in parallel; only KPI and per-period statistics are kept. "
+        "Results are shown on the Analysis page."
+    )
+    if rule_base is not None:
+        st.info(
+            f"Replications are scored with **{rule_base['name']}**; files without the columns "
+            + ", ".join(f"`{var['column']}`" for var in rule_base["inputs"]) + " are reported as failed."
         )
+
+    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+    rep_holding_cost = col_r1.number_input("Holding Cost per Unit", min_value=0.0, value=2.0, key="rep_holding")
+    rep_import_cost = col_r2.number_input("Import Cost per Unit", min_value=0.0, value=5.0, key="rep_import")
+    rep_max_stock = col_r3.number_input("Maximum Warehouse Capacity", min_value=1, value=500, key="rep_max_stock")
+    rep_workers = col_r4.number_input("Worker processes", min_value=1, max_value=32, value=os.cpu_count() or 1, key="rep_workers")
+
+    if st.button("🔁 Run All Replications", disabled=n_replications == 0):
+        submit_job(
+            "replications",
+            f"Replications ({n_replications} files)",
+            run_replications,
+            replication_files,
+            {
+                "holding_cost": rep_holding_cost,
+                "import_cost": rep_import_cost,
+                "max_stock": int(rep_max_stock),
+                "initial_stock": None
+            },
+            workers=int(rep_workers),
+            rule_base=rule_base
+        )
+
+    show_job_status(latest_job("replications"))
+
+    replication_stats = st.session_state.get("replication_stats")
+    if replication_stats is not None:
+        st.success(f"✅ {replication_stats.count} replication(s) aggregated — see the Analysis page")
+        for name, error in replication_stats.failures:
+            st.warning(f"⚠️ {name}: {error}")
+
+show_stage_status(graph)
+show_instrumentation_panel()
+show_memory_panel()
+show_jobs_sidebar()
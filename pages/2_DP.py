@@ -1,9 +1,33 @@
+import os
+
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from modules.dp_model import dp_deterministic_horizon
+from modules.pipeline import SWEEP_PARAMETERS, run_dp_sweep
+from modules.distribution import DEFAULT_NETWORK, MODES, load_network, optimize_distribution
+from modules.pipeline_ui import (
+    session_stage_graph,
+    show_stage_status,
+    show_instrumentation_panel,
+    show_memory_panel,
+    submit_job,
+    latest_job,
+    show_job_status,
+    attach_finished_jobs,
+    show_jobs_sidebar
+)
+from modules.visualization import plot_import_comparison
+from modules.figure_cache import show_figure, show_time_series
+from modules.data_loader import load_fuzzy_result
+from modules.arrow_io import REQUIRED_FUZZY_COLUMNS, missing_fuzzy_columns
+from modules.export_excel import export_single_sheet, export_multi_sheet
+from modules.artifact_store import content_key, download_artifact, EXCEL_MIME
+from modules.compact_results import load_result
+from modules.run_store import get_run_store
+from modules.precision import PRECISIONS, get_precision
+from modules.hierarchical_dp import BLOCK_SIZES, MIN_MAX_STOCK, compare_hierarchical, pays_off
+from modules.what_if import what_if_scenario
 
 # =========================================================
 # PAGE CONFIGURATION
@@ -15,44 +39,146 @@ st.set_page_config(
 
 st.title("⚙️ Import Optimization Using Dynamic Programming")
 
+graph = session_stage_graph()
+attach_finished_jobs()
+
 st.markdown("""
 This page optimizes import decisions using a **Dynamic Programming (DP)** approach.
 The **Fuzzy System output** is used as a constraint/reference for optimization.
 """)
 
 # =========================================================
-# UPLOAD FUZZY RESULTS
+# WHAT-IF PANEL
 # =========================================================
-st.subheader("📂 Upload Fuzzy Prediction Results")
+@st.fragment
+def show_what_if(df, dp_params, results_dp):
+    # Fragment: setiap perubahan hanya menjalankan ulang panel ini
+    months = list(df["Month"])
+    T = len(months)
+
+    col_w1, col_w2, col_w3 = st.columns(3)
+    with col_w1:
+        what_if_stock = st.number_input(
+            "Initial stock",
+            min_value=0,
+            max_value=dp_params["max_stock"],
+            value=min(dp_params["initial_stock"], dp_params["max_stock"]),
+            key="what_if_stock"
+        )
+    with col_w2:
+        spike_period = st.selectbox(
+            "Demand spike in",
+            options=[None] + list(range(T)),
+            format_func=lambda t: "No spike" if t is None else months[t],
+            key="what_if_spike_period"
+        )
+        spike_units = st.number_input(
+            "Extra demand (units)",
+            min_value=0,
+            value=50,
+            disabled=spike_period is None,
+            key="what_if_spike_units"
+        )
+    with col_w3:
+        cap_enabled = st.toggle("Import capacity cap", key="what_if_cap")
+        cap_value = st.number_input(
+            "Largest import per period",
+            min_value=0,
+            value=int(results_dp["Optimal_Import"].max()),
+            disabled=not cap_enabled,
+            key="what_if_cap_value"
+        )
+        cap_range = st.select_slider(
+            "Cap applies to",
+            options=list(range(T)),
+            value=(0, T - 1),
+            format_func=lambda t: months[t],
+            disabled=not cap_enabled or T < 2,
+            key="what_if_cap_range"
+        )
 
-uploaded_file = st.file_uploader(
-    "Upload Fuzzy Prediction Result File (Excel)",
-    type=["xlsx"]
-)
+    scenario = what_if_scenario(
+        df["Demand"].values,
+        df["Fuzzy_Import"].values,
+        dp_params["holding_cost"],
+        dp_params["import_cost"],
+        dp_params["max_stock"],
+        int(what_if_stock),
+        spike=None if spike_period is None else (spike_period, int(spike_units)),
+        cap=(int(cap_value), *cap_range) if cap_enabled else None,
+        precision=dp_params.get("precision")
+    )
 
-if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    base_cost = results_dp["Total_Cost"].sum()
+    col_m1, col_m2, col_m3 = st.columns(3)
+    col_m2.metric("Periods re-solved", f"{scenario['resolved_periods']} / {T}")
+    col_m3.metric("Update time", f"{scenario['seconds'] * 1000:.0f} ms")
+
+    if not scenario["feasible"]:
+        col_m1.metric("What-if total cost", "infeasible")
+        st.warning("⚠️ No import plan meets demand in every period under this scenario.")
+        return
+
+    col_m1.metric(
+        "What-if total cost",
+        f"{scenario['cost']:,.2f}",
+        delta=f"{scenario['cost'] - base_cost:+,.2f}",
+        delta_color="inverse"
+    )
+    st.line_chart(pd.DataFrame({
+        "Month": months,
+        "Ending stock (base)": results_dp["Ending_Stock"].values,
+        "Ending stock (what-if)": scenario["result"]["Stok_Akhir"].values,
+        "Optimal import (what-if)": scenario["result"]["Impor_Optimal"].values
+    }), x="Month")
 
-    # =====================================================
-    # REQUIRED COLUMNS (OFFICIAL CONTRACT)
-    # =====================================================
-    required_cols = [
-        "Month",
-        "Demand",
-        "Initial_Stock",
-        "Fuzzy_Import"
-    ]
-
-    if not all(col in df.columns for col in required_cols):
+# =========================================================
+# LOAD FUZZY RESULTS
+# =========================================================
+st.subheader("📂 Load Fuzzy Prediction Results")
+
+df = None
+source = "Upload file"
+session_fuzzy = load_result("fuzzy_result")
+
+if session_fuzzy is not None:
+    source = st.radio(
+        "Fuzzy result source",
+        ["Current session (Page 1)", "Upload file"],
+        horizontal=True
+    )
+
+if source == "Current session (Page 1)":
+    # Zero-copy: frame dari Page 1 dipakai langsung tanpa file
+    df = session_fuzzy
+else:
+    uploaded_file = st.file_uploader(
+        "Upload Fuzzy Prediction Result File (Parquet or Excel)",
+        type=["parquet", "xlsx"]
+    )
+
+    if uploaded_file:
+        try:
+            df = load_fuzzy_result(uploaded_file)
+        except ValueError as e:
+            st.error("❌ Invalid file format.")
+            st.write("Required columns:", REQUIRED_FUZZY_COLUMNS)
+            st.write("Detail:", str(e))
+            st.stop()
+
+if df is not None:
+    missing = missing_fuzzy_columns(df)
+
+    if missing:
         st.error("❌ Invalid file format.")
-        st.write("Required columns:", required_cols)
+        st.write("Required columns:", REQUIRED_FUZZY_COLUMNS)
         st.write("Detected columns:", list(df.columns))
         st.stop()
 
     # =====================================================
     # DATA PREVIEW
     # =====================================================
-    df["Month"] = df["Month"].astype(str)
+    df = df.assign(Month=df["Month"].astype(str))
 
     st.success("✅ Fuzzy prediction data successfully loaded")
     st.dataframe(df, use_container_width=True)
@@ -85,59 +211,80 @@ if uploaded_file:
             value=500
         )
 
-    initial_stock = st.number_input(
-        "Initial Stock Level",
-        min_value=0,
-        value=int(df["Initial_Stock"].iloc[0])
-    )
+    col4, col5, col6 = st.columns([2, 1, 1])
+
+    with col4:
+        initial_stock = st.number_input(
+            "Initial Stock Level",
+            min_value=0,
+            value=int(df["Initial_Stock"].iloc[0])
+        )
+
+    with col5:
+        precision = st.radio(
+            "Compute precision",
+            options=list(PRECISIONS),
+            index=list(PRECISIONS).index(get_precision()),
+            horizontal=True,
+            help=(
+                "float32 halves the DP value table; the plan cost is re-checked "
+                "in float64 and the DP falls back to float64 when it deviates."
+            )
+        )
+
+    with col6:
+        block = st.selectbox(
+            "Planning mode",
+            options=[None] + list(BLOCK_SIZES.values()),
+            format_func=lambda b: "Full horizon" if b is None else f"Hierarchical ({b}-period blocks)",
+            help=(
+                "For long (e.g. weekly multi-year) horizons: a coarse DP over blocks sets "
+                "target end-of-block stocks, then every block is solved separately over "
+                f"a stock corridor around its target. Needs max stock ≥ {MIN_MAX_STOCK:,}."
+            )
+        )
+        if block is not None and not pays_off(len(df), int(max_stock), block):
+            st.caption(f"The full-horizon DP is faster below max stock {MIN_MAX_STOCK:,} or two blocks; using it.")
+            block = None
 
     # =====================================================
     # RUN DP
     # =====================================================
-    if st.button("⚙️ Run Dynamic Programming Optimization"):
+    dp_params = {
+        "holding_cost": holding_cost,
+        "import_cost": import_cost,
+        "max_stock": int(max_stock),
+        "initial_stock": int(initial_stock)
+    }
+    # Hanya bila non-default, agar key run float64 tetap sama
+    if precision != "float64":
+        dp_params["precision"] = precision
+    if block is not None:
+        dp_params["block"] = block
+    params_key = content_key(df, dp_params)
 
-        demand = df["Demand"].values
-        fuzzy_import = df["Fuzzy_Import"].values
-
-        results_dp, total_cost = dp_deterministic_horizon(
-            demand=demand,
-            fuzzy_import=fuzzy_import,
-            holding_cost=holding_cost,
-            import_cost=import_cost,
-            max_stock=int(max_stock),
-            initial_stock=int(initial_stock)
+    if st.button("⚙️ Run Dynamic Programming Optimization"):
+        submit_job(
+            "dp",
+            f"DP optimization (T={len(df)}, max stock={int(max_stock)})",
+            graph.run,
+            "dp",
+            inputs={"fuzzy": df, "dp_params": dp_params},
+            meta={
+                "params_key": params_key,
+                "dp_params": dp_params,
+                "input_key": content_key(df)
+            }
         )
 
-        # =================================================
-        # FINAL COLUMN STANDARDIZATION
-        # =================================================
-        results_dp = results_dp.rename(columns={
-            "Impor_Optimal": "Optimal_Import",
-            "Impor_Fuzzy": "Fuzzy_Import",
-            "Stok_Awal": "Starting_Stock",
-            "Stok_Akhir": "Ending_Stock",
-            "Demand": "Demand"
-        })
-
-        # =================================================
-        # ADD TIME INDEX
-        # =================================================
-        results_dp["Month"] = df["Month"].values
-        results_dp["Initial_Stock"] = df["Initial_Stock"].values
+    show_job_status(latest_job("dp"))
 
-        # =================================================
-        # TOTAL COST
-        # =================================================
-        results_dp["Total_Cost"] = (
-            results_dp["Holding_Cost"] +
-            results_dp["Import_Cost"]
-        )
+    # =====================================================
+    # RESULTS (SAVED TO SESSION WHEN THE JOB FINISHES)
+    # =====================================================
+    results_dp = load_result("dp_result")
 
-        # =================================================
-        # SAVE TO SESSION
-        # =================================================
-        st.session_state["dp_result"] = results_dp.copy()
-        st.session_state["dp_total_cost"] = results_dp["Total_Cost"].sum()
+    if results_dp is not None and st.session_state.get("dp_result_key") == params_key:
 
         st.success("✅ Dynamic Programming optimization completed")
 
@@ -152,51 +299,199 @@ if uploaded_file:
             value=f"{results_dp['Total_Cost'].sum():,.2f}"
         )
 
+        if block is not None:
+            with st.expander("📐 Hierarchical vs full-horizon solve"):
+                if st.button("Compare with a full-horizon DP"):
+                    st.session_state["hierarchical_comparison"] = (params_key, compare_hierarchical(
+                        df["Demand"].values,
+                        df["Fuzzy_Import"].values,
+                        holding_cost,
+                        import_cost,
+                        int(max_stock),
+                        int(initial_stock),
+                        block=block
+                    ))
+
+                comparison = st.session_state.get("hierarchical_comparison")
+                if comparison is not None and comparison[0] == params_key:
+                    result = comparison[1]
+                    col_gap, col_full, col_hier = st.columns(3)
+                    col_gap.metric("Cost gap", f"{result['cost_gap'] * 100:.3f}%")
+                    col_full.metric("Full solve", f"{result['full_seconds']:.3f} s")
+                    col_hier.metric(
+                        "Hierarchical solve",
+                        f"{result['hierarchical_seconds']:.3f} s",
+                        delta=f"{result['speedup']:.2f}x",
+                        delta_color="off"
+                    )
+
+        if block is None:
+            with st.expander("🔮 What-if (reuses the solved policy)"):
+                st.caption(
+                    "The solved value function covers every starting stock, so a new "
+                    "initial stock is only a forward rollout. A demand spike or an "
+                    "import cap re-solves just the periods up to the last one it affects."
+                )
+                show_what_if(df, dp_params, results_dp)
+
         # =================================================
         # COMPARISON PLOT
         # =================================================
         st.subheader("📈 Fuzzy Import vs Optimal Import (DP)")
 
-        fig, ax = plt.subplots(figsize=(10, 4))
-
-        ax.plot(
-            results_dp["Month"],
-            results_dp["Fuzzy_Import"],
-            marker="o",
-            label="Fuzzy Import"
+        show_time_series(
+            plot_import_comparison,
+            results_dp["Month"].values,
+            results_dp["Fuzzy_Import"].values,
+            results_dp["Optimal_Import"].values,
+            zoom_key="dp_comparison"
         )
 
-        ax.plot(
-            results_dp["Month"],
-            results_dp["Optimal_Import"],
-            marker="s",
-            label="Optimal Import (DP)"
+        # =================================================
+        # DOWNLOAD RESULTS
+        # =================================================
+        download_artifact(
+            label="⬇️ Download DP Results (Excel)",
+            name="dp_excel",
+            key=content_key(results_dp),
+            factory=lambda: export_single_sheet(results_dp, sheet_name="DP_Results"),
+            file_name="dp_optimization_results.xlsx",
+            mime=EXCEL_MIME
         )
 
-        ax.set_xlabel("Month")
-        ax.set_ylabel("Import Quantity")
-        ax.set_title("Comparison of Import Decisions")
-        ax.legend()
-        ax.grid(True)
-
-        st.pyplot(fig)
-
         # =================================================
-        # DOWNLOAD RESULTS
+        # DISTRIBUTION NETWORK (MIN-COST FLOW)
         # =================================================
-        output = "dp_optimization_results.xlsx"
+        with st.expander("🚚 Distribution Network (min-cost flow)"):
+            st.caption(
+                "Allocates the optimal import (arriving at the ports) and the stock "
+                "(held at the plants) over the distribution network each month."
+            )
 
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            results_dp.to_excel(
-                writer,
-                index=False,
-                sheet_name="DP_Results"
+            network_file = st.file_uploader(
+                "Network configuration (JSON, optional — default: Banten example network)",
+                type=["json"]
             )
+            try:
+                network = load_network(network_file.getvalue()) if network_file else DEFAULT_NETWORK
+            except (ValueError, KeyError) as e:
+                st.error(f"❌ Invalid network configuration: {e}")
+                st.stop()
+
+            dist_col1, dist_col2 = st.columns(2)
+            with dist_col1:
+                distribution_mode = st.radio(
+                    "Formulation",
+                    MODES,
+                    format_func=lambda m: {"period": "Per month", "time_expanded": "Time-expanded"}[m],
+                    horizontal=True,
+                    help="Per month: independent problems (parallel). "
+                         "Time-expanded: one network where plant stock carries over."
+                )
+            with dist_col2:
+                distribution_workers = st.number_input(
+                    "Worker processes",
+                    min_value=1,
+                    max_value=os.cpu_count() or 1,
+                    value=1,
+                    disabled=distribution_mode != "period"
+                )
+
+            distribution_key = content_key(results_dp, network, distribution_mode)
+
+            if st.button("🚚 Optimize Distribution"):
+                submit_job(
+                    "distribution",
+                    f"Distribution min-cost flow ({len(network['nodes'])} nodes, {distribution_mode})",
+                    optimize_distribution,
+                    results_dp,
+                    network=network,
+                    mode=distribution_mode,
+                    workers=int(distribution_workers),
+                    meta={"distribution_key": distribution_key}
+                )
+
+            show_job_status(latest_job("distribution"))
+
+            if st.session_state.get("distribution_key") == distribution_key:
+                flows, summary = st.session_state["distribution_result"]
+
+                st.metric(
+                    label="🚚 Total Distribution Cost",
+                    value=f"{summary['Distribution Cost'].sum():,.2f}"
+                )
+                if "Shortage Units" in summary:
+                    st.warning(
+                        f"⚠️ {int(summary['Shortage Units'].sum()):,} units could not be "
+                        "delivered within the network capacities"
+                    )
+                if "Unlanded Import Units" in summary:
+                    st.warning(
+                        f"⚠️ {int(summary['Unlanded Import Units'].sum()):,} imported units "
+                        "exceed the port capacities"
+                    )
+
+                st.dataframe(summary, use_container_width=True)
+                st.line_chart(summary, x="Month", y="Distribution Cost")
+
+                flow_month = st.selectbox("Flows in month", summary["Month"])
+                st.dataframe(
+                    flows[flows["Month"] == flow_month],
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+                download_artifact(
+                    label="⬇️ Download Distribution Plan (Excel)",
+                    name="distribution_excel",
+                    key=distribution_key,
+                    factory=lambda: export_multi_sheet({"Summary": summary, "Flows": flows}),
+                    file_name="distribution_plan.xlsx",
+                    mime=EXCEL_MIME
+                )
 
-        with open(output, "rb") as f:
-            st.download_button(
-                label="⬇️ Download DP Results (Excel)",
-                data=f,
-                file_name=output,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    # =====================================================
+    # PARAMETER SWEEP
+    # =====================================================
+    with st.expander("📉 Parameter Sweep (background job)"):
+        sweep_col1, sweep_col2, sweep_col3, sweep_col4 = st.columns(4)
+
+        with sweep_col1:
+            sweep_parameter = st.selectbox("Parameter", SWEEP_PARAMETERS)
+        with sweep_col2:
+            sweep_start = st.number_input("From", min_value=0.0, value=float(dp_params[sweep_parameter]) / 2)
+        with sweep_col3:
+            sweep_stop = st.number_input("To", min_value=0.0, value=float(dp_params[sweep_parameter]) * 2)
+        with sweep_col4:
+            sweep_steps = st.number_input("Steps", min_value=2, max_value=200, value=10)
+
+        if st.button("▶️ Run Sweep"):
+            values = np.linspace(sweep_start, sweep_stop, int(sweep_steps))
+            if sweep_parameter in ("max_stock", "initial_stock"):
+                values = np.unique(values.round().astype(int))
+
+            submit_job(
+                "sweep",
+                f"DP sweep over {sweep_parameter} ({len(values)} runs)",
+                run_dp_sweep,
+                df,
+                dp_params,
+                sweep_parameter,
+                values.tolist(),
+                run_store=get_run_store(),
+                meta={"parameter": sweep_parameter}
             )
+
+        show_job_status(latest_job("sweep"))
+
+        if "dp_sweep" in st.session_state:
+            df_sweep = st.session_state["dp_sweep"]
+            parameter = st.session_state["dp_sweep_parameter"]
+
+            st.dataframe(df_sweep, use_container_width=True)
+            st.line_chart(df_sweep, x=parameter, y="Total Cost")
+
+show_stage_status(graph)
+show_instrumentation_panel()
+show_memory_panel()
+show_jobs_sidebar()
@@ -1,22 +1,37 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from scipy.stats import f_oneway
 
 # ==========================================================
 # INTERNAL MODULES
 # ==========================================================
-from modules.export_excel import export_multi_sheet
-from modules.export_pdf import export_summary_pdf
-from modules.kpi_metrics import (
-    calculate_kpis,
-    validation_summary
+from modules.pipeline import report_sheets, report_metrics, build_report_pack
+from modules.pipeline_ui import (
+    session_stage_graph,
+    show_stage_status,
+    show_instrumentation_panel,
+    show_memory_panel,
+    attach_finished_jobs,
+    show_jobs_sidebar,
+    submit_job,
+    latest_job,
+    show_job_status
+)
+from modules.artifact_store import (
+    content_key,
+    download_artifact,
+    download_file,
+    EXCEL_MIME,
+    PDF_MIME
 )
 from modules.kpi_visuals import (
     show_kpi_metrics,
-    plot_inventory_profile
+    plot_inventory_profile,
+    absolute_error_figure
 )
+from modules.compact_results import load_result, was_evicted
+from modules.figure_cache import show_figure, show_time_series
+from modules.run_store import PARAMETER_COLUMNS, KPI_COLUMNS, get_run_store
+from modules.visualization import plot_replication_band, plot_import_comparison
 
 # ==========================================================
 # CONFIG & STYLING
@@ -54,29 +69,237 @@ including **performance KPIs, statistical validation, and final reporting**.
 # ==========================================================
 st.header("📥 Loading Simulation Data")
 
-if "fuzzy_result" not in st.session_state or "dp_result" not in st.session_state:
-    st.warning("⚠️ Fuzzy or DP data is not available. Please run Page 1 and Page 2 first.")
-    st.stop()
+attach_finished_jobs()
+show_jobs_sidebar()
+show_instrumentation_panel()
+show_memory_panel()
+
+# ==========================================================
+# MULTIPLE REPLICATIONS (MEAN ± CONFIDENCE INTERVAL)
+# ==========================================================
+replication_stats = st.session_state.get("replication_stats")
+
+if replication_stats is not None:
+    st.header("🔁 Replication Analysis")
+    st.markdown(
+        f"KPI means across **{replication_stats.count} replications** "
+        "with 95% confidence intervals (Student t)."
+    )
+    st.dataframe(replication_stats.kpi_table(), hide_index=True, use_container_width=True)
+
+    band_column = st.selectbox(
+        "Per-period series",
+        options=["Ending_Stock", "Optimal_Import", "Fuzzy_Import", "Demand", "Total_Cost"]
+    )
+    band = replication_stats.band(band_column)
+    show_figure(
+        plot_replication_band,
+        band["Month"].values,
+        band["Mean"].values,
+        band["CI Low"].values,
+        band["CI High"].values,
+        title=f"{band_column.replace('_', ' ')} Across Replications",
+        ylabel=band_column.replace("_", " ")
+    )
+
+# ==========================================================
+# RUN HISTORY (ALL STORED DP RUNS AND SWEEPS)
+# ==========================================================
+PARAMETER_LABELS = {
+    "holding_cost": "Holding cost",
+    "import_cost": "Import cost",
+    "max_stock": "Max stock",
+    "initial_stock": "Initial stock"
+}
+
+
+@st.fragment
+def show_run_history():
+    # Fragment: filter/sort hanya menjalankan ulang bagian ini (query SQL)
+    store = get_run_store()
+    total = store.count()
+
+    if total == 0:
+        st.info("No runs recorded yet. Every finished DP run and sweep on Page 2 is stored here.")
+        return
+
+    st.caption(f"{total:,} runs stored in `{store.path}`")
+    ranges = store.ranges()
+    filters = {}
+
+    for column, name in zip(st.columns(len(PARAMETER_COLUMNS)), PARAMETER_COLUMNS):
+        low, high = ranges[name]
+        if low == high:
+            column.caption(f"{PARAMETER_LABELS[name]}: {low:g}")
+            continue
+        cast = int if name in ("max_stock", "initial_stock") else float
+        selected = column.slider(
+            PARAMETER_LABELS[name],
+            cast(low),
+            cast(high),
+            (cast(low), cast(high)),
+            key=f"history_{name}"
+        )
+        if selected != (cast(low), cast(high)):
+            filters[name] = selected
+
+    col_date, col_sort, col_order, col_limit = st.columns(4)
+    first_day = pd.Timestamp(ranges["created_at"][0]).date()
+    last_day = pd.Timestamp(ranges["created_at"][1]).date()
+    days = col_date.date_input(
+        "Recorded between",
+        value=(first_day, last_day),
+        min_value=first_day,
+        max_value=last_day
+    )
+    if len(days) == 2 and (days[0], days[1]) != (first_day, last_day):
+        filters["created_at"] = (f"{days[0]} 00:00:00", f"{days[1]} 23:59:59")
+
+    order_by = col_sort.selectbox(
+        "Sort by",
+        options=["created_at"] + list(KPI_COLUMNS.values()),
+        format_func=lambda c: c.replace("_", " ").capitalize()
+    )
+    descending = col_order.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Descending"
+    limit = col_limit.selectbox("Rows", options=[50, 200, 1000], index=1)
+
+    df_runs = store.query(filters, order_by=order_by, descending=descending, limit=limit)
+    st.markdown(f"**{store.count(filters):,}** matching runs (showing {len(df_runs):,})")
+
+    selection = st.dataframe(
+        df_runs.drop(columns=["input_hash", "params_hash"]),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key="history_table"
+    )
 
-df_fuzzy = st.session_state["fuzzy_result"].copy()
-df_dp = st.session_state["dp_result"].copy()
+    selected_ids = df_runs["id"].iloc[selection.selection.rows].tolist()
+    if selected_ids:
+        series = st.selectbox(
+            "Per-period series",
+            options=["Ending_Stock", "Optimal_Import", "Total_Cost", "Fuzzy_Import", "Demand"]
+        )
+        periods = store.periods(selected_ids)
+        st.line_chart(periods.pivot_table(index="Month", columns="Run ID", values=series))
+    else:
+        st.caption("Select rows to compare their per-period results.")
+
+    # Report pack: run terpilih, atau semua run yang tampil di tabel.
+    # Dibuat di background job -> halaman tetap responsif.
+    pack_ids = selected_ids or df_runs["id"].tolist()
+    col_pack, col_download = st.columns(2)
+    if col_pack.button(
+        f"📑 Build PDF report pack ({len(pack_ids)} {'selected' if selected_ids else 'shown'} runs)",
+        disabled=not pack_ids,
+        use_container_width=True
+    ):
+        submit_job(
+            "report_pack",
+            f"PDF report pack ({len(pack_ids)} scenarios)",
+            build_report_pack,
+            pack_ids,
+            meta={"runs": len(pack_ids)}
+        )
+    show_job_status(latest_job("report_pack"))
+
+    pack = st.session_state.get("report_pack")
+    if pack is not None and not pack.closed:
+        with col_download:
+            download_file(
+                label=f"📥 Download Report Pack ({st.session_state['report_pack_runs']} scenarios)",
+                fileobj=pack,
+                file_name="Fuzzy_DP_Report_Pack.pdf",
+                mime=PDF_MIME,
+                use_container_width=True
+            )
+
+    group_by = st.selectbox(
+        "Compare by parameter",
+        options=PARAMETER_COLUMNS,
+        format_func=PARAMETER_LABELS.get
+    )
+    df_groups = store.aggregate(group_by, filters)
+    st.dataframe(df_groups, hide_index=True, use_container_width=True)
+    if len(df_groups) > 1:
+        st.line_chart(df_groups, x=group_by, y=["mean_cost", "min_cost", "max_cost"])
+
+
+st.header("🗂️ Run History")
+show_run_history()
+
+# Shallow views of the compact session results (copy-on-write, no copy
+# per rerun)
+evicted = was_evicted("fuzzy_result") or was_evicted("dp_result")
+df_fuzzy = load_result("fuzzy_result")
+df_dp = load_result("dp_result")
+
+if df_fuzzy is None or df_dp is None:
+    if evicted:
+        st.warning("⚠️ Results were released to free server memory. Please re-run Page 1 and Page 2.")
+    else:
+        st.warning("⚠️ Fuzzy or DP data is not available. Please run Page 1 and Page 2 first.")
+    st.stop()
 
 st.success("✅ Fuzzy and DP data successfully loaded")
 
+# ==========================================================
+# ANALYSIS STAGE (KPI, VALIDATION, ANOVA)
+# ==========================================================
+with st.expander("⚙️ Diebold–Mariano Test Options"):
+    col_dm1, col_dm2 = st.columns(2)
+
+    dm_variance = col_dm1.radio(
+        "DM variance",
+        options=["sample", "hac"],
+        format_func=lambda v: "Sample variance" if v == "sample" else "Newey–West (HAC)",
+        horizontal=True
+    )
+    hac_lag = col_dm1.number_input(
+        "HAC lag (0 = automatic)",
+        min_value=0,
+        value=0,
+        disabled=dm_variance != "hac"
+    )
+    bootstrap_resamples = col_dm2.selectbox(
+        "Block bootstrap resamples",
+        options=[0, 10_000, 100_000, 1_000_000],
+        format_func=lambda n: "Off" if n == 0 else f"{n:,}"
+    )
+    block_length = col_dm2.number_input(
+        "Block length (0 = automatic)",
+        min_value=0,
+        value=0,
+        disabled=bootstrap_resamples == 0
+    )
+
+# Hanya opsi non-default, agar key stage sama dengan laporan default
+validation_options = {}
+if dm_variance == "hac":
+    validation_options["dm_variance"] = "hac"
+    if hac_lag > 0:
+        validation_options["hac_lag"] = int(hac_lag)
+if bootstrap_resamples:
+    validation_options["bootstrap_resamples"] = bootstrap_resamples
+    if block_length > 0:
+        validation_options["block_length"] = int(block_length)
+
+graph = session_stage_graph()
+report_inputs = {
+    "fuzzy": df_fuzzy,
+    "dp": df_dp,
+    "validation_options": validation_options
+}
+
+analysis = graph.run("analysis", inputs=report_inputs)["analysis"]
+
 # ==========================================================
 # KPI DASHBOARD
 # ==========================================================
 st.header("📊 System Performance KPIs")
 
-kpi = calculate_kpis(
-    df_policy=df_dp,
-    demand=df_dp["Demand"].values,
-    import_cost=df_dp["Import_Cost"].mean(),
-    holding_cost=df_dp["Holding_Cost"].mean(),
-    max_stock=df_dp["Ending_Stock"].max()
-)
-
-show_kpi_metrics(kpi)
+show_kpi_metrics(analysis["kpi"])
 plot_inventory_profile(df_dp)
 
 # ==========================================================
@@ -84,24 +307,14 @@ plot_inventory_profile(df_dp)
 # ==========================================================
 st.header("📊 Fuzzy Prediction Validation & DM Test")
 
-df_validation = validation_summary(
-    actual=df_dp["Demand"].values,
-    fuzzy=df_dp["Fuzzy_Import"].values,
-    baseline=df_dp["Optimal_Import"].values
-)
-
-st.dataframe(df_validation, use_container_width=True)
+st.dataframe(analysis["validation"], use_container_width=True)
 
 # ==========================================================
 # ANOVA TEST
 # ==========================================================
 st.header("📊 ANOVA Test: Fuzzy vs DP vs Actual Demand")
 
-anova_stat, anova_p = f_oneway(
-    df_dp["Fuzzy_Import"].values,
-    df_dp["Optimal_Import"].values,
-    df_dp["Demand"].values
-)
+anova_stat, anova_p = analysis["anova_stat"], analysis["anova_p"]
 
 st.markdown(f"""
 - **F-statistic:** {anova_stat:.4f}  
@@ -114,121 +327,80 @@ st.markdown(f"""
 # ==========================================================
 st.header("📌 Performance Summary")
 
-total_fuzzy_import = df_dp["Fuzzy_Import"].sum()
-total_dp_import = df_dp["Optimal_Import"].sum()
-total_cost = df_dp["Total_Cost"].sum()
-
 col1, col2, col3 = st.columns(3)
-col1.metric("Total Import (Fuzzy)", f"{int(total_fuzzy_import):,}")
-col2.metric("Total Import (DP)", f"{int(total_dp_import):,}")
-col3.metric("Total System Cost", f"{int(total_cost):,}")
+col1.metric("Total Import (Fuzzy)", f"{int(analysis['total_fuzzy_import']):,}")
+col2.metric("Total Import (DP)", f"{int(analysis['total_dp_import']):,}")
+col3.metric("Total System Cost", f"{int(analysis['total_cost']):,}")
 
 # ==========================================================
 # MONTHLY ANALYSIS
 # ==========================================================
 st.header("📋 Monthly Analysis")
 
-df_analysis = pd.DataFrame({
-    "Month": df_dp["Month"].astype(str),
-    "Demand": df_dp["Demand"],
-    "Initial Stock": df_dp["Starting_Stock"],
-    "Import (Fuzzy)": df_dp["Fuzzy_Import"],
-    "Optimal Import (DP)": df_dp["Optimal_Import"],
-    "Final Stock": df_dp["Ending_Stock"],
-    "Total Cost": df_dp["Total_Cost"]
-})
-
-st.dataframe(df_analysis, use_container_width=True)
+st.dataframe(analysis["analysis"], use_container_width=True)
 
 # ==========================================================
 # IMPORT COMPARISON VISUALIZATION
 # ==========================================================
 st.header("📈 Import Comparison Visualizations")
 
+# Argumen sama dengan report_charts: tanpa zoom gambar diambil dari cache
+# yang sama dengan laporan PDF
+df_analysis = analysis["analysis"]
 col_fig1, col_fig2 = st.columns(2)
 
 with col_fig1:
-    fig1, ax1 = plt.subplots(figsize=(10, 5))
-    ax1.plot(
-        df_analysis["Month"],
-        df_analysis["Import (Fuzzy)"],
-        marker="o",
-        label="Fuzzy Import"
+    show_time_series(
+        plot_import_comparison,
+        df_analysis["Month"].values,
+        df_analysis["Import (Fuzzy)"].values,
+        df_analysis["Optimal Import (DP)"].values,
+        title="Fuzzy vs Dynamic Programming Import Comparison",
+        optimal_label="DP Import",
+        figsize=(10, 5),
+        zoom_key="analysis_comparison"
     )
-    ax1.plot(
-        df_analysis["Month"],
-        df_analysis["Optimal Import (DP)"],
-        marker="s",
-        label="DP Import"
-    )
-    ax1.set_xlabel("Month")
-    ax1.set_ylabel("Import Quantity")
-    ax1.set_title("Fuzzy vs Dynamic Programming Import Comparison")
-    ax1.legend()
-    ax1.grid(True)
-    st.pyplot(fig1)
 
 with col_fig2:
-    fig2, ax2 = plt.subplots(figsize=(10, 5))
-    errors_fuzzy = np.abs(df_dp["Demand"] - df_dp["Fuzzy_Import"])
-    errors_dp = np.abs(df_dp["Demand"] - df_dp["Optimal_Import"])
-    x = np.arange(len(df_dp))
-
-    ax2.bar(x - 0.2, errors_fuzzy, 0.4, label="Fuzzy Error")
-    ax2.bar(x + 0.2, errors_dp, 0.4, label="DP Error")
-    ax2.set_xticks(x)
-    ax2.set_xticklabels(df_dp["Month"].astype(str), rotation=45)
-    ax2.set_title("Absolute Error Comparison")
-    ax2.legend()
-    ax2.grid(True, axis="y")
-    st.pyplot(fig2)
+    show_time_series(
+        absolute_error_figure,
+        df_dp["Month"].astype(str).values,
+        df_dp["Demand"].values,
+        df_dp["Fuzzy_Import"].values,
+        df_dp["Optimal_Import"].values,
+        zoom_key="analysis_abs_error"
+    )
 
 # ==========================================================
 # DOWNLOAD REPORTS
 # ==========================================================
 st.header("⬇️ Download Reports")
 
-excel_buffer = export_multi_sheet({
-    "Fuzzy_Result": df_fuzzy,
-    "DP_Result": df_dp,
-    "Final_Analysis": df_analysis,
-    "Validation_Fuzzy": df_validation,
-    "ANOVA_Test": pd.DataFrame({
-        "F-statistic": [anova_stat],
-        "p-value": [anova_p],
-        "Significant (α=0.05)": ["Yes" if anova_p < 0.05 else "No"]
-    })
-})
-
-st.download_button(
+report_key = content_key(
+    report_sheets(df_fuzzy, df_dp, analysis),
+    report_metrics(analysis)
+)
+
+download_artifact(
     label="📥 Download Excel Report (Multi-Sheet)",
-    data=excel_buffer,
+    name="report_excel",
+    key=report_key,
+    factory=lambda: graph.run("excel_report", inputs=report_inputs)["excel_report"],
     file_name="Fuzzy_DP_Report.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    mime=EXCEL_MIME,
     use_container_width=True
 )
 
-pdf_buffer = export_summary_pdf(
-    title="Final Import Decision Support System Report",
-    metrics={
-        "Total Fuzzy Import": f"{int(total_fuzzy_import):,}",
-        "Total DP Import": f"{int(total_dp_import):,}",
-        "Total Cost": f"{int(total_cost):,}"
-    },
-    conclusion=(
-        "The integration of fuzzy logic and dynamic programming "
-        "successfully generates an optimal import policy with "
-        "minimum cost and improved inventory control. "
-        "Statistical validation confirms performance differences."
-    )
-)
-
-st.download_button(
+download_artifact(
     label="📥 Download PDF Summary Report",
-    data=pdf_buffer,
+    name="report_pdf",
+    key=report_key,
+    factory=lambda: graph.run("pdf_report", inputs=report_inputs)["pdf_report"],
     file_name="Fuzzy_DP_Summary.pdf",
-    mime="application/pdf",
+    mime=PDF_MIME,
     use_container_width=True
 )
 
 st.success("✅ Analysis and reporting completed successfully.")
+
+show_stage_status(graph)
@@ -0,0 +1,284 @@
+"""
+Differential tests: every faster backend against the reference
+implementation it replaces, on small synthetic inputs over a few seeds.
+
+    pytest tests/test_differential.py
+    python -m benchmarks.differential      (largest deviation per check)
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generators import (
+    make_anylogic_frame,
+    make_dp_like_frame,
+    make_fuzzy_frame,
+    make_policy_batch,
+    make_seasonal_fuzzy_frame,
+    synthetic_fuzzy_system,
+    synthetic_rule_base
+)
+
+SEEDS = [0, 1]
+
+
+# ======================================================
+# REFERENCE IMPLEMENTATIONS
+# ======================================================
+def reference_kpis(df_policy, demand, max_stock):
+    """
+    The original per-policy KPI computation (before calculate_kpis_batch)
+    """
+    total_cost = df_policy["Import_Cost"].sum() + df_policy["Holding_Cost"].sum()
+    avg_inventory = df_policy["Ending_Stock"].mean()
+    stockout_rate = (df_policy["Ending_Stock"] <= 0).mean()
+    total_demand = np.sum(demand)
+
+    return {
+        "Total Import": df_policy["Optimal_Import"].sum(),
+        "Total Cost": total_cost,
+        "Average Inventory": avg_inventory,
+        "Stockout Rate": stockout_rate,
+        "Overstock Rate": (df_policy["Ending_Stock"] >= 0.9 * max_stock).mean(),
+        "Service Level": 1 - stockout_rate,
+        "Cost per Unit Demand": total_cost / total_demand if total_demand > 0 else 0,
+        "Inventory Turnover": total_demand / avg_inventory if avg_inventory > 0 else 0
+    }
+
+
+def reference_rolling(y_true, y_pred, window):
+    from modules.kpi_metrics import mae, mape, rmse, smape
+
+    rows = [
+        [f(y_true[i - window + 1:i + 1], y_pred[i - window + 1:i + 1]) for f in (mae, rmse, mape, smape)]
+        for i in range(window - 1, len(y_true))
+    ]
+    return np.array(rows)
+
+
+# ======================================================
+# CHECKS: each returns the largest deviation for one seed
+# ======================================================
+def check_predict_import(seed, rules=None):
+    from modules.fuzzy_system import (
+        build_fuzzy_system,
+        compile_fuzzy_tables,
+        predict_import,
+        predict_import_batch
+    )
+
+    system = build_fuzzy_system()[0] if rules is None else synthetic_fuzzy_system(rules)[0]
+    rng = np.random.default_rng(seed)
+    df = make_anylogic_frame(24, seed=seed)
+    md = df["Demand"].to_numpy(dtype=float) + rng.uniform(-0.5, 0.5, 24)
+    ps = df["Stock"].to_numpy(dtype=float)
+    pc = df["Production"].to_numpy(dtype=float)
+
+    # Tepi universe dan nilai di luar universe (di-clip oleh kedua backend)
+    md[:3], ps[:3], pc[:3] = [200, 400, 450], [100, 250, 90], [0, 210, 300]
+
+    expected = np.array([predict_import(system, *row) for row in zip(md, ps, pc)])
+    actual = predict_import_batch(compile_fuzzy_tables(system), md, ps, pc)
+    return np.max(np.abs(actual - expected))
+
+
+def check_predict_import_rules(seed):
+    return max(check_predict_import(seed, rules) for rules in (8, 64))
+
+
+def check_rule_base(seed):
+    from modules.rule_base import load_rule_base, validate_rule_base, verify_rule_base
+
+    # Rule base bawaan dari file + rule base jarang 4 input (aturan tanpa sebagian input)
+    specs = [load_rule_base(), validate_rule_base(synthetic_rule_base(4, 4, 60, seed=seed))]
+    return max(verify_rule_base(spec, n=20, seed=seed)["max_abs_error"] for spec in specs)
+
+
+def check_kpis(seed):
+    from modules.kpi_metrics import calculate_kpis_batch
+
+    batch = make_policy_batch(20, 36, seed=seed)
+    batch["ending_stock"][0] = 0
+    kpi = calculate_kpis_batch(**batch)
+
+    worst = 0.0
+    for i in range(20):
+        df_policy = pd.DataFrame({
+            "Ending_Stock": batch["ending_stock"][i],
+            "Optimal_Import": batch["optimal_import"][i],
+            "Import_Cost": batch["period_import_cost"][i],
+            "Holding_Cost": batch["period_holding_cost"][i]
+        })
+        expected = reference_kpis(df_policy, batch["demand"], batch["max_stock"])
+        for name, value in expected.items():
+            worst = max(worst, abs(kpi[name][i] - value) / max(1.0, abs(value)))
+    return worst
+
+
+def check_error_accumulators(seed):
+    from modules.kpi_metrics import (
+        ErrorAccumulator,
+        RollingErrorAccumulator,
+        rolling_error_metrics,
+        validation_summary
+    )
+
+    rng = np.random.default_rng(seed)
+    y_true = rng.uniform(150, 400, 5_000)
+    y_pred = y_true + rng.normal(0, 25, 5_000)
+    # Nol di y_true (MAPE memakai 1e-8), di luar jendela rolling di bawah
+    y_true[[1_234, 4_321]] = 0.0
+    y_pred[[1_234, 4_321]] = 0.5
+    expected = validation_summary(y_true, y_pred).iloc[0]
+
+    parts = [ErrorAccumulator().update(y_true[i:i + 700], y_pred[i:i + 700]) for i in range(0, 5_000, 700)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    worst = max(
+        abs(merged.result()[k] - expected[k]) / max(1.0, abs(expected[k]))
+        for k in ("MAE", "RMSE", "MAPE (%)", "sMAPE (%)")
+    )
+
+    window = 50
+    reference = reference_rolling(y_true[:600], y_pred[:600], window)
+    rolling = rolling_error_metrics(y_true[:600], y_pred[:600], window).to_numpy()[window - 1:]
+    worst = max(worst, np.max(np.abs(rolling - reference)))
+
+    acc = RollingErrorAccumulator(window)
+    for i in range(0, 600, 37):
+        acc.update(y_true[i:min(i + 37, 600)], y_pred[i:min(i + 37, 600)])
+    last = list(acc.result().values())
+    return max(worst, np.max(np.abs(np.array(last) - reference[-1])))
+
+
+def check_export(seed):
+    from modules.export_excel import export_multi_sheet
+
+    df = make_dp_like_frame(1_200, seed=seed)
+    frames = {"DP_Result": df, "Small": df.head(10)}
+    in_memory = pd.read_excel(io.BytesIO(export_multi_sheet(frames, streaming=False).getvalue()), sheet_name=None)
+    streaming = pd.read_excel(io.BytesIO(export_multi_sheet(frames, streaming=True).getvalue()), sheet_name=None)
+
+    if list(in_memory) != list(streaming):
+        return np.inf
+    worst = 0.0
+    for name in in_memory:
+        a, b = in_memory[name], streaming[name]
+        if list(a.columns) != list(b.columns) or len(a) != len(b):
+            return np.inf
+        numeric = a.select_dtypes("number").columns
+        worst = max(worst, np.max(np.abs(a[numeric].to_numpy() - b[numeric].to_numpy()), initial=0.0))
+        if not a.drop(columns=numeric).equals(b.drop(columns=numeric)):
+            return np.inf
+    return worst
+
+
+def check_distribution(seed):
+    from modules.distribution import optimize_distribution, synthetic_network
+    from modules.pipeline import run_dp_stage
+
+    df_dp = run_dp_stage(make_fuzzy_frame(12, seed=seed), 2.0, 5.0, 500, 150)
+    network = synthetic_network(3, 5, 12, seed=seed)
+    serial, _ = optimize_distribution(df_dp, network=network, workers=1)
+    parallel, _ = optimize_distribution(df_dp, network=network, workers=2)
+    return abs(serial["Cost"].sum() - parallel["Cost"].sum()) + (0.0 if serial.equals(parallel) else np.inf)
+
+
+def check_dp_backends(seed):
+    from modules.dp_model import dp_deterministic_horizon
+
+    df = make_fuzzy_frame(36, seed=seed)
+    args = (df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy(), 2.0, 5.0, 300, 150)
+    loop, loop_cost = dp_deterministic_horizon(*args, backend="loop")
+    vector, vector_cost = dp_deterministic_horizon(*args, backend="numpy", precision="float64")
+    return abs(loop_cost - vector_cost) + (0.0 if loop.equals(vector) else np.inf)
+
+
+def check_precision(seed):
+    from modules.precision import verify_dp
+
+    df = make_fuzzy_frame(120, seed=seed)
+    check = verify_dp(df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy(), 2.0, 5.0, 500, 150)
+    return check["rel_error"] + (0.0 if check["policy_equal"] else np.inf)
+
+
+def check_hierarchical(seed):
+    from modules.hierarchical_dp import compare_hierarchical
+
+    df = make_seasonal_fuzzy_frame(156, seed=seed)
+    result = compare_hierarchical(
+        df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy(), 1.0, 5.0, 700, 300, block=13, workers=1
+    )
+    # Aproksimasi: tidak boleh lebih murah dari solusi penuh
+    gap = result["cost_gap"]
+    return gap if gap >= -1e-12 else np.inf
+
+
+def check_what_if(seed):
+    from modules.dp_model import dp_deterministic_horizon, solve_value_function
+    from modules.what_if import PolicyCache, what_if_scenario
+
+    df = make_fuzzy_frame(36, seed=seed)
+    demand, fuzzy_import = df["Demand"].to_numpy(), df["Fuzzy_Import"].to_numpy()
+    rng = np.random.default_rng(seed)
+    cache = PolicyCache()
+
+    worst = 0.0
+    for _ in range(6):
+        initial_stock = int(rng.integers(0, 300))
+        spike = (int(rng.integers(36)), int(rng.integers(0, 150))) if rng.random() < 0.7 else None
+        first = int(rng.integers(36))
+        cap = (int(rng.integers(250, 450)), first, int(rng.integers(first, 36))) if rng.random() < 0.5 else None
+
+        scenario = what_if_scenario(
+            demand, fuzzy_import, 2.0, 5.0, 500, initial_stock, spike=spike, cap=cap, cache=cache
+        )
+
+        # Referensi: DP penuh pada input yang sudah diubah
+        changed = demand.copy()
+        import_cap = None
+        if spike is not None:
+            changed[spike[0]] += spike[1]
+        if cap is not None:
+            import_cap = np.full(36, np.inf)
+            import_cap[cap[1]:cap[2] + 1] = cap[0]
+        V, _ = solve_value_function(changed, fuzzy_import, 2.0, 5.0, 500, import_cap=import_cap)
+        if not np.isfinite(V[0, initial_stock]) or not scenario["feasible"]:
+            worst = max(worst, 0.0 if np.isfinite(V[0, initial_stock]) == scenario["feasible"] else np.inf)
+            continue
+
+        df_full, cost = dp_deterministic_horizon(
+            changed, fuzzy_import, 2.0, 5.0, 500, initial_stock, import_cap=import_cap
+        )
+        worst = max(worst, abs(scenario["cost"] - cost))
+        if not df_full.equals(scenario["result"]):
+            worst = np.inf
+    return worst
+
+
+# name -> (check, tolerance)
+CHECKS = {
+    "predict_import": (check_predict_import, 1e-9),
+    "predict_import_rules": (check_predict_import_rules, 1e-9),
+    "rule_base": (check_rule_base, 1e-9),
+    "kpis": (check_kpis, 1e-12),
+    "error_accumulators": (check_error_accumulators, 1e-9),
+    "export": (check_export, 1e-9),
+    "distribution": (check_distribution, 0.0),
+    "dp_backends": (check_dp_backends, 0.0),
+    "precision": (check_precision, 1e-5),
+    "hierarchical": (check_hierarchical, 1e-2),
+    "what_if": (check_what_if, 0.0)
+}
+
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("name", list(CHECKS))
+def test_matches_reference(name, seed):
+    check, tolerance = CHECKS[name]
+    worst = check(seed)
+    assert worst <= tolerance, f"{name}: max deviation {worst:.3e} (tolerance {tolerance:.0e})"